@@ -0,0 +1,60 @@
+import csv
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from ingestao_assincrona import listar_arquivos
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+# Funções comuns aos benchmarks (benchmark_ocr, benchmark_rosto, benchmark_extratores):
+# carregamento da amostra e do gabarito, normalização de texto e resumo de latências.
+
+CSV_GABARITO = "dados_fakes_identidade.csv"
+
+# Número do registro no nome do arquivo (rg-frente_0001.jpg, aug_rg-tras_0042.jpg, ...)
+PADRAO_ID = re.compile(r"_(\d+)\.\w+$")
+
+
+def carregar_gabarito(caminho_csv=CSV_GABARITO):
+    """Registros do CSV de gabarito (o registro i corresponde às imagens de número i + 1)."""
+    with open(caminho_csv, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def listar_imagens(pasta, limite=None):
+    """Caminhos das imagens da pasta, ordenados pelo nome (no máximo `limite`)."""
+    return [caminho for _, caminho in listar_arquivos(pasta)][:limite]
+
+
+def carregar_amostra(pastas, caminho_csv=CSV_GABARITO, limite=None):
+    """Lista (caminho, lado, registro) das imagens de {lado: pasta} com registro correspondente no gabarito."""
+    registros = carregar_gabarito(caminho_csv)
+
+    amostra = []
+    for lado, pasta in pastas.items():
+        if not os.path.isdir(pasta):
+            continue
+        for caminho in listar_imagens(pasta):
+            match = PADRAO_ID.search(caminho)
+            if match and 1 <= int(match.group(1)) <= len(registros):
+                amostra.append((caminho, lado, registros[int(match.group(1)) - 1]))
+    return amostra[:limite]
+
+
+def normalizar(texto):
+    """Maiúsculas, sem acentos e só letras/dígitos separados por um espaço."""
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", texto.upper()).split())
+
+
+def resumo_latencias(tempos):
+    tempos_ms = np.asarray(tempos) * 1000
+    return {
+        "media_ms": round(float(tempos_ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(tempos_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(tempos_ms, 95)), 2),
+    }
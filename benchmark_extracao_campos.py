@@ -0,0 +1,138 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from extracao_campos import contar_palavras_chave, extrair_campos_rg, extrair_campos_rg_antigo, tokenizar
+from extracao_rg_antigo import PALAVRAS_CHAVE_RG
+
+CSV_DADOS = "dados_fakes_identidade.csv"
+JSON_SAIDA = "benchmark_extracao_campos.json"
+REPETICOES = 5
+
+
+# =========================
+# IMPLEMENTAÇÕES ANTERIORES (REFERÊNCIA)
+# =========================
+def _legado_rg_antigo(texto):
+    dados = {"nome_completo": "N/A", "numero_rg": "N/A", "data_nascimento": "N/A",
+             "data_emissao": "N/A", "filiacao": "N/A", "sucesso_regex_rg_antigo": 0}
+    match_rg = re.search(r'\b(\d{1,2}[\.\s]?\d{3}[\.\s]?\d{3}[\-\s]?[a-zA-Z0-9])\b', texto, re.IGNORECASE)
+    if match_rg:
+        dados["numero_rg"] = match_rg.group(1).strip()
+        dados["sucesso_regex_rg_antigo"] = 1
+    match_datas = re.findall(r'(\d{2}[/\-\.]\d{2}[/\-\.]\d{4})', texto)
+    if len(match_datas) >= 1:
+        dados["data_nascimento"] = match_datas[0]
+        if len(match_datas) > 1:
+            dados["data_emissao"] = match_datas[-1]
+    bow = {f"bow_{p}": texto.lower().split().count(p) for p in PALAVRAS_CHAVE_RG}
+    return dados, bow, len(texto.split())
+
+
+def _legado_rg(texto):
+    dados = {"nome_completo": "N/A", "numero_rg": "N/A", "data_nascimento": "N/A",
+             "data_emissao": "N/A", "filiacao": "N/A"}
+    rg_match = re.search(r'\b\d{9,11}\b', texto)
+    if rg_match:
+        dados["numero_rg"] = rg_match.group()
+    datas = re.findall(r'\d{2}/\d{2}/\d{4}', texto)
+    if len(datas) >= 1:
+        dados["data_nascimento"] = datas[0]
+    if len(datas) >= 2:
+        dados["data_emissao"] = datas[1]
+    for linha in texto.split("\n"):
+        if len(linha.split()) >= 2 and linha.isupper():
+            dados["nome_completo"] = linha.strip()
+            break
+    return dados
+
+
+def _novo_rg_antigo(texto):
+    tokens = tokenizar(texto)
+    return extrair_campos_rg_antigo(texto), contar_palavras_chave(tokens, PALAVRAS_CHAVE_RG), len(tokens)
+
+
+# =========================
+# TEXTOS DE TESTE
+# =========================
+def textos_de_teste(caminho_csv=CSV_DADOS, quantidade=2000):
+    """Textos no formato de saída do OCR, montados a partir dos registros sintéticos."""
+    if os.path.exists(caminho_csv):
+        with open(caminho_csv, newline='', encoding='utf-8-sig') as f:
+            registros = list(csv.DictReader(f))[:quantidade]
+    else:
+        from gera_dados_sinteticos import construir_pools, gerar_lote
+        rng = np.random.default_rng(0)
+        lote = gerar_lote(rng, np.arange(quantidade), np.arange(4, dtype=np.uint64), construir_pools(0, 500))
+        registros = [dict(zip(lote, valores)) for valores in zip(*lote.values())]
+
+    textos = []
+    for r in registros:
+        cpf = r["cpf"]
+        textos.append(
+            "REPUBLICA FEDERATIVA DO BRASIL\nSECRETARIA DE SEGURANCA PUBLICA\n"
+            f"REGISTRO GERAL {cpf[:10].replace('.', '', 1)}-{cpf[-1]} DATA DE EXPEDICAO {r['data_emissao']}\n"
+            f"NOME\n{r['nome_completo'].upper()}\nFILIACAO\n{r['filiacao_pai']}\n{r['filiacao_mae']}\n"
+            f"NATURALIDADE {r['naturalidade']} DATA DE NASCIMENTO {r['data_nascimento']}\n"
+            f"CPF {cpf.replace('.', '').replace('-', '')} {r['orgao_emissor']}\n"
+            "Identidade valida em todo o territorio nacional registro cpf pai mae"
+        )
+    return textos
+
+
+def _medir(funcao, textos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for texto in textos:
+            funcao(texto)
+        tempos.append((time.perf_counter() - inicio) / len(textos))
+    return tempos
+
+
+def _resumo_us(tempos):
+    tempos_us = np.asarray(tempos) * 1e6
+    return {"media_us": round(float(tempos_us.mean()), 2), "min_us": round(float(tempos_us.min()), 2)}
+
+
+def executar_benchmark(textos, repeticoes=REPETICOES):
+    pares = {
+        "rg_antigo": (_legado_rg_antigo, _novo_rg_antigo),
+        "rg": (_legado_rg, extrair_campos_rg),
+    }
+
+    relatorio = {"textos": len(textos), "extratores": {}}
+    for nome, (legado, novo) in pares.items():
+        tempos_legado = _medir(legado, textos, repeticoes)
+        tempos_novo = _medir(novo, textos, repeticoes)
+        concordancia = sum(legado(t) == novo(t) for t in textos) / len(textos)
+        relatorio["extratores"][nome] = {
+            "legado": _resumo_us(tempos_legado),
+            "novo": _resumo_us(tempos_novo),
+            "aceleracao": round(float(np.mean(tempos_legado) / np.mean(tempos_novo)), 2),
+            "concordancia": round(concordancia, 4),
+        }
+    return relatorio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    relatorio = executar_benchmark(textos_de_teste(quantidade=quantidade))
+
+    print(f"\nTextos avaliados: {relatorio['textos']}")
+    for nome, r in relatorio["extratores"].items():
+        print(f"{nome:>10}: legado {r['legado']['media_us']:7.1f} us/texto | novo {r['novo']['media_us']:7.1f} us/texto "
+              f"| {r['aceleracao']}x | concordância {r['concordancia']:.1%}")
+
+    with open(JSON_SAIDA, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\nRelatório salvo em '{JSON_SAIDA}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import metricas
+from benchmark_comum import CSV_GABARITO, carregar_gabarito, normalizar, resumo_latencias
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Amostra fixa: mesma semente e tamanho => mesmos registros e mesmas imagens
+SEMENTE = 2024
+TAMANHO_AMOSTRA = 50
+PASTA_AMOSTRA = "benchmark_amostra"
+JSON_SAIDA = "benchmark_extratores.json"
+
+# Aplica a aumentação de gerar_imagens_albumentation (com a semente do registro) nos cards da amostra
+AUMENTAR = False
+
+# Extratores avaliados: módulo e o tipo de documento (pasta) de cada lado
+EXTRATORES = {
+    "rg_antigo": ("extracao_rg_antigo", {"frente": "RG_FRENTE_ANTIGO", "verso": "RG_VERSO_ANTIGO"}),
+    "rg_face_ocr": ("features_rg_face_ocr", {"frente": "RG_FRENTE", "verso": "RG_VERSO"}),
+}
+
+# Campo extraído -> coluna do gabarito, por lado do card (filiação = "pai / mãe", como no modo template)
+CAMPOS_AVALIADOS = {
+    "frente": {"nome_completo": "nome_completo", "numero_rg": "cpf", "data_nascimento": "data_nascimento"},
+    "verso": {"data_emissao": "data_emissao", "filiacao": ("filiacao_pai", "filiacao_mae")},
+}
+
+
+# =========================
+# MÉTRICAS
+# =========================
+def distancia_edicao(a, b):
+    """Distância de Levenshtein (inserção, remoção e troca custam 1)."""
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        atual = [i]
+        for j, cb in enumerate(b, start=1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        anterior = atual
+    return anterior[-1]
+
+
+def cer(previsto, esperado):
+    """Character error rate sobre os textos normalizados (campo não extraído conta como vazio)."""
+    previsto = "" if previsto in (None, "N/A") else normalizar(str(previsto))
+    esperado = normalizar(esperado)
+    if not esperado:
+        return float(bool(previsto))
+    return distancia_edicao(previsto, esperado) / len(esperado)
+
+
+def valor_gabarito(registro, coluna):
+    if isinstance(coluna, tuple):
+        return " / ".join(registro[c] for c in coluna)
+    return registro[coluna]
+
+
+def pico_memoria_mb():
+    """Pico de memória residente (RSS) do processo atual, em MB; None onde não há o módulo resource."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / 1024 ** (2 if sys.platform == "darwin" else 1), 1)
+
+
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =========================
+# AMOSTRA RENDERIZADA
+# =========================
+def _verificar_arquivos(caminhos):
+    faltando = [caminho for caminho in caminhos if not os.path.exists(caminho)]
+    if faltando:
+        raise FileNotFoundError(f"Arquivos necessários para renderizar a amostra não encontrados: {', '.join(faltando)}")
+
+
+def renderizar_amostra(tamanho=TAMANHO_AMOSTRA, semente=SEMENTE, pasta=PASTA_AMOSTRA, aumentar=AUMENTAR,
+                       csv_arquivo=CSV_GABARITO, imagem_frente="rg_frente.png",
+                       imagem_verso="rg_atras.png", json_frente="posicoes_frente.json",
+                       json_verso="posicoes_atras.json"):
+    """
+    Sorteia (com a semente) `tamanho` registros do gabarito e renderiza frente e verso de cada um em PNG.
+    A amostra fica em disco e é reaproveitada enquanto semente, tamanho e aumentação forem os mesmos.
+    Devolve [(caminho, lado, registro), ...].
+    FileNotFoundError (com a lista dos arquivos) se faltar o gabarito ou, quando for preciso renderizar,
+    algum template/JSON de posições.
+    """
+    import gerar_imagens_sinteticas as renderizador
+
+    _verificar_arquivos([csv_arquivo])
+    registros = carregar_gabarito(csv_arquivo)
+
+    rng = np.random.default_rng(semente)
+    indices = sorted(int(i) for i in rng.choice(len(registros), min(tamanho, len(registros)), replace=False))
+    descricao = {"semente": semente, "indices": indices, "aumentar": aumentar}
+
+    caminho_descricao = os.path.join(pasta, "amostra.json")
+    amostra = [
+        (os.path.join(pasta, f"{lado}_{i + 1:05d}.png"), lado, registros[i])
+        for i in indices for lado in ("frente", "verso")
+    ]
+
+    if os.path.exists(caminho_descricao):
+        with open(caminho_descricao, encoding="utf-8") as f:
+            if json.load(f) == descricao and all(os.path.exists(c) for c, _, _ in amostra):
+                return amostra
+
+    _verificar_arquivos([imagem_frente, imagem_verso, json_frente, json_verso])
+    with open(json_frente, encoding='utf-8') as f:
+        posicoes_frente = json.load(f)
+    with open(json_verso, encoding='utf-8') as f:
+        posicoes_verso = json.load(f)
+    renderizador.inicializar_renderizador(imagem_frente, imagem_verso, posicoes_frente, posicoes_verso)
+
+    if aumentar:
+        from gerar_imagens_albumentation import criar_transformacao
+        transformacao = criar_transformacao()
+
+    os.makedirs(pasta, exist_ok=True)
+    for posicao, (caminho, lado, registro) in enumerate(amostra):
+        card = renderizador.renderizar_frente(registro) if lado == "frente" else renderizador.renderizar_verso(registro)
+        card = cv2.cvtColor(np.asarray(card), cv2.COLOR_RGB2BGR)
+        if aumentar:
+            # albumentations sorteia via random/np.random: semente própria de cada card
+            random.seed(semente + posicao)
+            np.random.seed((semente + posicao) % 2 ** 32)
+            card = transformacao(image=card)["image"]
+        cv2.imwrite(caminho, card)
+
+    with open(caminho_descricao, "w", encoding="utf-8") as f:
+        json.dump(descricao, f)
+    return amostra
+
+
+# =========================
+# EXECUÇÃO DE UM EXTRATOR
+# =========================
+class _MotorCronometrado:
+    """Envolve o motor de OCR do extrator para medir só o tempo gasto no OCR."""
+
+    def __init__(self, motor):
+        self._motor = motor
+        self.tempos = []
+
+    def __getattr__(self, nome):
+        return getattr(self._motor, nome)
+
+    def reconhecer_lote(self, imgs):
+        inicio = time.perf_counter()
+        resultado = self._motor.reconhecer_lote(imgs)
+        self.tempos.append((time.perf_counter() - inicio, len(imgs)))
+        return resultado
+
+
+def _processar_antigo(modulo, lote, tipos):
+    from classificador_lado import carregar_face_cascade_padrao
+    face_cascade = getattr(modulo, "_face_cascade_benchmark", None) or carregar_face_cascade_padrao()
+    modulo._face_cascade_benchmark = face_cascade
+
+    resultados = []
+    for caminho, lado, _ in lote:
+        doc = {"caminho": caminho, "tipo_documento": tipos[lado], "nome_arquivo": os.path.basename(caminho)}
+        resultados.append(modulo.processar_imagem_rg(doc, face_cascade))
+    return resultados
+
+
+def _processar_features(modulo, lote, tipos):
+    itens = [(caminho, tipos[lado], cv2.imread(caminho)) for caminho, lado, _ in lote]
+    return modulo.extrair_features_lote(itens)
+
+
+def executar_extrator(nome, amostra, motor=None, usar_cache=False):
+    """
+    Roda o extrator sobre a amostra (no processo atual) e mede latência por etapa,
+    vazão, acerto por campo e pico de memória.
+    Etapas: decodificação (imread isolado), OCR (tempo dentro do motor) e total por imagem;
+    o detalhamento interno vem das métricas do extrator.
+    """
+    nome_modulo, tipos = EXTRATORES[nome]
+    modulo = importlib.import_module(nome_modulo)
+    if motor is not None:
+        modulo.selecionar_motor_ocr(motor)
+    modulo.USAR_CACHE_OCR = usar_cache
+    cronometro = _MotorCronometrado(modulo.motor_ocr)
+    modulo.motor_ocr = cronometro
+    metricas.ativar()
+
+    processar = _processar_antigo if nome == "rg_antigo" else _processar_features
+    tamanho_lote = getattr(modulo, "TAMANHO_LOTE_OCR", 1)
+
+    etapas = {"decodificacao": [], "ocr": [], "total": []}
+    for caminho, _, _ in amostra:
+        inicio = time.perf_counter()
+        cv2.imread(caminho)
+        etapas["decodificacao"].append(time.perf_counter() - inicio)
+
+    acertos = {}
+    erros_caractere = {}
+    inicio_execucao = time.perf_counter()
+    for i in range(0, len(amostra), tamanho_lote):
+        lote = amostra[i:i + tamanho_lote]
+        ocr_antes = len(cronometro.tempos)
+
+        inicio = time.perf_counter()
+        resultados = processar(modulo, lote, tipos)
+        decorrido = time.perf_counter() - inicio
+
+        tempo_ocr = sum(t for t, _ in cronometro.tempos[ocr_antes:])
+        etapas["total"] += [decorrido / len(lote)] * len(lote)
+        etapas["ocr"] += [tempo_ocr / len(lote)] * len(lote)
+
+        for (_, lado, registro), resultado in zip(lote, resultados):
+            for campo, coluna in CAMPOS_AVALIADOS[lado].items():
+                esperado = valor_gabarito(registro, coluna)
+                previsto = (resultado or {}).get(campo)
+                taxa = cer(previsto, esperado)
+                acertos.setdefault(campo, []).append(taxa == 0.0)
+                erros_caractere.setdefault(campo, []).append(taxa)
+    tempo_execucao = time.perf_counter() - inicio_execucao
+
+    return {
+        "motor_ocr": cronometro.nome,
+        "imagens": len(amostra),
+        "imagens_por_s": round(len(amostra) / tempo_execucao, 2) if tempo_execucao else None,
+        "etapas": {etapa: resumo_latencias(tempos) for etapa, tempos in etapas.items()},
+        "campos": {
+            campo: {
+                "acerto_exato": round(float(np.mean(acertos[campo])), 4),
+                "cer": round(float(np.mean(erros_caractere[campo])), 4),
+            }
+            for campo in acertos
+        },
+        "pico_rss_mb": pico_memoria_mb(),
+        # Etapas internas instrumentadas pelo próprio extrator (ver metricas.py)
+        "metricas": metricas.resumo(),
+    }
+
+
+def _executar_com_tratamento(nome, amostra, motor):
+    """Falhas viram erro no relatório ainda no processo filho (nem toda exceção de OCR é serializável)."""
+    try:
+        return executar_extrator(nome, amostra, motor)
+    except Exception as e:
+        return {"erro": f"{type(e).__name__}: {e}"}
+
+
+def executar_benchmark(extratores=tuple(EXTRATORES), tamanho=TAMANHO_AMOSTRA, semente=SEMENTE, motor=None,
+                       aumentar=AUMENTAR):
+    """Cada extrator roda num processo novo (spawn), para que o pico de RSS medido seja só dele."""
+    amostra = renderizar_amostra(tamanho, semente, aumentar=aumentar)
+    relatorio = {
+        "versao": versao_codigo(),
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "semente": semente,
+        "registros": len(amostra) // 2,
+        "aumentar": aumentar,
+        "extratores": {},
+    }
+
+    contexto = multiprocessing.get_context("spawn")
+    for nome in extratores:
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            relatorio["extratores"][nome] = executor.submit(_executar_com_tratamento, nome, amostra, motor).result()
+    return relatorio
+
+
+def comparar(caminho_base, caminho_novo):
+    """Imprime a variação de vazão, latência total e acerto por campo entre dois relatórios."""
+    with open(caminho_base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(caminho_novo, encoding="utf-8") as f:
+        novo = json.load(f)
+
+    print(f"Base: {base.get('versao')} ({base.get('data')})  ->  Novo: {novo.get('versao')} ({novo.get('data')})")
+    for nome, r_novo in novo["extratores"].items():
+        r_base = base["extratores"].get(nome)
+        if not r_base or "erro" in r_base or "erro" in r_novo:
+            continue
+        print(f"\n{nome}:")
+        print(f"   img/s: {r_base['imagens_por_s']} -> {r_novo['imagens_por_s']}")
+        for etapa in r_novo["etapas"]:
+            print(f"   {etapa} p95: {r_base['etapas'][etapa]['p95_ms']} -> {r_novo['etapas'][etapa]['p95_ms']} ms")
+        for campo, m in r_novo["campos"].items():
+            m_base = r_base["campos"].get(campo, {})
+            print(f"   {campo}: acerto {m_base.get('acerto_exato')} -> {m['acerto_exato']} | "
+                  f"CER {m_base.get('cer')} -> {m['cer']}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--comparar":
+        comparar(sys.argv[2], sys.argv[3])
+        return
+
+    # Uso: python benchmark_extratores.py [tamanho_amostra] [motor_ocr] [extratores separados por vírgula]
+    tamanho = int(sys.argv[1]) if len(sys.argv) > 1 else TAMANHO_AMOSTRA
+    motor = sys.argv[2] if len(sys.argv) > 2 else None
+    extratores = sys.argv[3].split(",") if len(sys.argv) > 3 else tuple(EXTRATORES)
+
+    try:
+        relatorio = executar_benchmark(extratores, tamanho, motor=motor)
+    except FileNotFoundError as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+
+    print(f"\nAmostra: {relatorio['registros']} registros (semente {relatorio['semente']}), frente e verso")
+    for nome, r in relatorio["extratores"].items():
+        if "erro" in r:
+            print(f"{nome:>12}: {r['erro']}")
+            continue
+        etapas = " | ".join(f"{e} p50 {v['p50_ms']:.1f}/p95 {v['p95_ms']:.1f} ms" for e, v in r["etapas"].items())
+        print(f"{nome:>12} ({r['motor_ocr']}): {r['imagens_por_s']} img/s | pico RSS {r['pico_rss_mb']} MB")
+        print(f"{'':>12}  {etapas}")
+        for campo, m in r["campos"].items():
+            print(f"{'':>12}  {campo}: acerto {m['acerto_exato']:.1%} | CER {m['cer']:.3f}")
+
+    with open(JSON_SAIDA, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\nRelatório salvo em '{JSON_SAIDA}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from benchmark_comum import carregar_amostra, normalizar, resumo_latencias
+from gerar_imagens_sinteticas import CAMPOS_FRENTE, CAMPOS_VERSO
+from motores_ocr import MOTORES, criar_motor
+
+PASTAS_PADRAO = {"frente": "RGFRENTE", "verso": "RGTRAS"}
+JSON_SAIDA = "benchmark_ocr.json"
+TAMANHO_LOTE = 8
+
+
+def avaliar_campos(texto, lado, registro):
+    """Acerto por campo: o valor do gabarito aparece (normalizado) no texto reconhecido."""
+    texto_normalizado = f" {normalizar(texto)} "
+    campos = CAMPOS_FRENTE if lado == "frente" else CAMPOS_VERSO
+    return {campo: f" {normalizar(registro[campo])} " in texto_normalizado for campo in campos}
+
+
+def avaliar_motor(nome, amostra, tamanho_lote=TAMANHO_LOTE):
+    motor = criar_motor(nome)
+
+    # Carregamento do modelo medido à parte (só acontece no primeiro uso)
+    inicio = time.perf_counter()
+    motor.modelo
+    tempo_carga = time.perf_counter() - inicio
+
+    latencias = []
+    acertos = {}
+    tempo_total = 0.0
+    for i in range(0, len(amostra), tamanho_lote):
+        lote = amostra[i:i + tamanho_lote]
+        imgs = [cv2.imread(caminho) for caminho, _, _ in lote]
+
+        inicio = time.perf_counter()
+        resultados = motor.reconhecer_lote(imgs)
+        decorrido = time.perf_counter() - inicio
+
+        tempo_total += decorrido
+        latencias += [decorrido / len(lote)] * len(lote)
+        for (_, lado, registro), (linhas, _, _) in zip(lote, resultados):
+            for campo, acertou in avaliar_campos("\n".join(linhas), lado, registro).items():
+                acertos.setdefault(campo, []).append(acertou)
+
+    return {
+        "carregamento_s": round(tempo_carga, 3),
+        **resumo_latencias(latencias),
+        "imagens_por_s": round(len(amostra) / tempo_total, 2) if tempo_total else None,
+        "acuracia_campos": {campo: round(float(np.mean(v)), 4) for campo, v in acertos.items()},
+        "acuracia_media": round(float(np.mean([a for v in acertos.values() for a in v])), 4),
+    }
+
+
+def executar_benchmark(motores, amostra):
+    relatorio = {"imagens": len(amostra), "motores": {}}
+    for nome in motores:
+        # Um motor não instalado (ou que falhe) não interrompe a comparação dos demais
+        try:
+            relatorio["motores"][nome] = avaliar_motor(nome, amostra)
+        except Exception as e:
+            relatorio["motores"][nome] = {"erro": f"{type(e).__name__}: {e}"}
+    return relatorio
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python benchmark_ocr.py [motores separados por vírgula] [limite] [pasta_frente] [pasta_verso]")
+        sys.exit(0)
+
+    motores = sys.argv[1].split(",") if len(sys.argv) > 1 else list(MOTORES)
+    limite = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    pastas = dict(PASTAS_PADRAO)
+    if len(sys.argv) > 4:
+        pastas = {"frente": sys.argv[3], "verso": sys.argv[4]}
+
+    amostra = carregar_amostra(pastas, limite=limite)
+    if not amostra:
+        print(f"Nenhuma imagem com gabarito em {list(pastas.values())}")
+        return
+
+    relatorio = executar_benchmark(motores, amostra)
+
+    print(f"\nImagens avaliadas: {relatorio['imagens']}")
+    for nome, r in relatorio["motores"].items():
+        if "erro" in r:
+            print(f"{nome:>10}: {r['erro']}")
+            continue
+        print(f"{nome:>10}: carga {r['carregamento_s']:6.2f} s | média {r['media_ms']:8.2f} ms | "
+              f"p95 {r['p95_ms']:8.2f} ms | {r['imagens_por_s']} img/s | acurácia {r['acuracia_media']:.1%}")
+
+    with open(JSON_SAIDA, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\nRelatório salvo em '{JSON_SAIDA}'")
+
+
+if __name__ == "__main__":
+    main()
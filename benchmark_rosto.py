@@ -0,0 +1,239 @@
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from benchmark_comum import listar_imagens, resumo_latencias
+from deteccao_rosto import LIMIAR_CONFIANCA, detectar_rosto_rapido, regiao_foto
+
+# Configurações atuais dos extratores, usadas como referência
+REFERENCIAS = {
+    "antigo_1.05": dict(scaleFactor=1.05, minNeighbors=3, minSize=(30, 30)),
+    "features_1.1": dict(scaleFactor=1.1, minNeighbors=4),
+}
+
+JSON_SAIDA = "benchmark_rosto.json"
+JSON_CALIBRACAO = "calibracao_limiar_rosto.json"
+
+# Calibração de LIMIAR_CONFIANCA (deteccao_rosto): limiares avaliados e a busca na imagem
+# inteira medida junto como comparação
+LIMIARES_CALIBRACAO = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0]
+REFERENCIA_CALIBRACAO = "antigo_1.05"
+
+
+def _primeiro_rosto(face_cascade, img_gray, parametros):
+    faces = face_cascade.detectMultiScale(img_gray, **parametros)
+    return tuple(int(v) for v in faces[0]) if len(faces) > 0 else None
+
+
+def _rapido(face_cascade, img_gray, limiar=LIMIAR_CONFIANCA):
+    x, y, w, h = detectar_rosto_rapido(img_gray, face_cascade, limiar=limiar)
+    return None if w is None else (x, y, w, h)
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    largura = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    altura = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersecao = largura * altura
+    uniao = aw * ah + bw * bh - intersecao
+    return intersecao / uniao if uniao else 0.0
+
+
+def executar_benchmark(pasta, limite=None):
+    """Compara a detecção rápida com as configurações atuais em latência e concordância."""
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    arquivos = listar_imagens(pasta, limite)
+
+    detectores = {nome: (lambda g, p=p: _primeiro_rosto(face_cascade, g, p)) for nome, p in REFERENCIAS.items()}
+    detectores["rapido"] = lambda g: _rapido(face_cascade, g)
+
+    tempos = {nome: [] for nome in detectores}
+    deteccoes = {nome: [] for nome in detectores}
+
+    for arquivo in arquivos:
+        img = cv2.imread(arquivo)
+        if img is None:
+            continue
+        img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        for nome, detector in detectores.items():
+            inicio = time.perf_counter()
+            face = detector(img_gray)
+            tempos[nome].append(time.perf_counter() - inicio)
+            deteccoes[nome].append(face)
+
+    if not tempos["rapido"]:
+        print(f"Nenhuma imagem lida em {pasta}")
+        return None
+
+    relatorio = {"pasta": pasta, "imagens": len(tempos["rapido"]), "detectores": {}}
+    for nome in detectores:
+        relatorio["detectores"][nome] = {
+            **resumo_latencias(tempos[nome]),
+            "taxa_deteccao": round(sum(f is not None for f in deteccoes[nome]) / len(deteccoes[nome]), 4),
+        }
+
+    # Concordância do detector rápido com cada referência
+    for nome in REFERENCIAS:
+        pares = list(zip(deteccoes[nome], deteccoes["rapido"]))
+        concordancia = sum((a is None) == (b is None) for a, b in pares) / len(pares)
+        ious = [iou(a, b) for a, b in pares if a is not None and b is not None]
+        relatorio["detectores"][nome]["concordancia_com_rapido"] = round(concordancia, 4)
+        relatorio["detectores"][nome]["iou_medio_com_rapido"] = round(float(np.mean(ious)), 4) if ious else None
+        relatorio["detectores"][nome]["aceleracao_rapido"] = round(
+            float(np.mean(tempos[nome]) / np.mean(tempos["rapido"])), 2
+        )
+
+    return relatorio
+
+
+def _dentro_da_foto(face, largura, altura):
+    """O centro do rosto cai na região da foto do card (sem folga)?"""
+    x0, y0, x1, y1 = regiao_foto(largura, altura, folga=0)
+    x, y, w, h = face
+    return x0 <= x + w / 2 <= x1 and y0 <= y + h / 2 <= y1
+
+
+def _ler_cinzas(pasta, limite):
+    imagens = []
+    for arquivo in listar_imagens(pasta, limite):
+        img = cv2.imread(arquivo, cv2.IMREAD_GRAYSCALE)
+        if img is not None:
+            imagens.append(img)
+    return imagens
+
+
+def _taxas(detector, com_foto, sem_rosto):
+    """Acerto/erro de um detector sobre cards com foto e imagens sem rosto, mais a latência."""
+    tempos = []
+    acertos = fora_da_foto = perdidos = falsos_positivos = 0
+    for img in com_foto:
+        inicio = time.perf_counter()
+        face = detector(img)
+        tempos.append(time.perf_counter() - inicio)
+        if face is None:
+            perdidos += 1
+        elif _dentro_da_foto(face, img.shape[1], img.shape[0]):
+            acertos += 1
+        else:
+            fora_da_foto += 1
+    for img in sem_rosto:
+        inicio = time.perf_counter()
+        falsos_positivos += detector(img) is not None
+        tempos.append(time.perf_counter() - inicio)
+
+    taxas = {
+        "acerto": round(acertos / len(com_foto), 4),
+        "fora_da_foto": round(fora_da_foto / len(com_foto), 4),
+        "perdido": round(perdidos / len(com_foto), 4),
+    }
+    if sem_rosto:
+        taxas["falso_positivo"] = round(falsos_positivos / len(sem_rosto), 4)
+    return {**resumo_latencias(tempos), **taxas}
+
+
+def calibrar_limiar(pasta_com_foto, pasta_sem_rosto=None, limiares=LIMIARES_CALIBRACAO,
+                    referencia=REFERENCIA_CALIBRACAO, limite=None):
+    """
+    Varre o LIMIAR_CONFIANCA da detecção rápida sobre cards com foto (saída de script_fotos),
+    cujo gabarito é a própria posição da foto: acerto = centro do rosto dentro da região da foto.
+    pasta_sem_rosto (opcional, ex.: versos) mede os falsos positivos.
+    A busca na imagem inteira (referência) é medida junto, como comparação.
+    Limiares maiores levam a busca a mais etapas (mais lenta); o sugerido é o menor limiar
+    com o maior número de acertos (cards com rosto na foto + imagens sem rosto sem detecção).
+    """
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    com_foto = _ler_cinzas(pasta_com_foto, limite)
+    sem_rosto = _ler_cinzas(pasta_sem_rosto, limite) if pasta_sem_rosto else []
+    if not com_foto:
+        print(f"Nenhuma imagem lida em {pasta_com_foto}")
+        return None
+
+    relatorio = {
+        "pasta_com_foto": pasta_com_foto, "imagens_com_foto": len(com_foto),
+        "pasta_sem_rosto": pasta_sem_rosto, "imagens_sem_rosto": len(sem_rosto),
+        "referencia": {
+            "nome": referencia,
+            **_taxas(lambda g: _primeiro_rosto(face_cascade, g, REFERENCIAS[referencia]), com_foto, sem_rosto),
+        },
+        "limiares": {},
+    }
+    for limiar in limiares:
+        relatorio["limiares"][str(limiar)] = _taxas(
+            lambda g, limiar=limiar: _rapido(face_cascade, g, limiar), com_foto, sem_rosto
+        )
+
+    def corretos(r):
+        return r["acerto"] * len(com_foto) + (1 - r.get("falso_positivo", 0)) * len(sem_rosto)
+
+    melhor = max(corretos(r) for r in relatorio["limiares"].values())
+    relatorio["limiar_sugerido"] = min(
+        limiar for limiar in limiares if corretos(relatorio["limiares"][str(limiar)]) >= melhor - 1e-6
+    )
+    return relatorio
+
+
+def _linha_calibracao(rotulo, r):
+    linha = (f"{rotulo:>14}: média {r['media_ms']:8.2f} ms | acerto {r['acerto']:.1%} | "
+             f"fora da foto {r['fora_da_foto']:.1%} | perdido {r['perdido']:.1%}")
+    if "falso_positivo" in r:
+        linha += f" | falso positivo {r['falso_positivo']:.1%}"
+    return linha
+
+
+def main_calibracao(pasta_com_foto, pasta_sem_rosto=None, limite=None):
+    relatorio = calibrar_limiar(pasta_com_foto, pasta_sem_rosto, limite=limite)
+    if relatorio is None:
+        return
+
+    print(f"\nCards com foto: {relatorio['imagens_com_foto']} | imagens sem rosto: {relatorio['imagens_sem_rosto']}")
+    print(_linha_calibracao(relatorio["referencia"]["nome"], relatorio["referencia"]))
+    for limiar, r in relatorio["limiares"].items():
+        print(_linha_calibracao(f"limiar {limiar}", r))
+    print(f"Limiar sugerido: {relatorio['limiar_sugerido']} (atual: {LIMIAR_CONFIANCA})")
+
+    with open(JSON_CALIBRACAO, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\nRelatório salvo em '{JSON_CALIBRACAO}'")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--calibrar":
+        if len(sys.argv) < 3:
+            print("Uso: python benchmark_rosto.py --calibrar <pasta_cards_com_foto> [pasta_sem_rosto] [limite]")
+            sys.exit(1)
+        pasta_sem_rosto = sys.argv[3] if len(sys.argv) > 3 else None
+        main_calibracao(sys.argv[2], pasta_sem_rosto, int(sys.argv[4]) if len(sys.argv) > 4 else None)
+        return
+
+    if len(sys.argv) < 2:
+        print("Uso: python benchmark_rosto.py <pasta_imagens> [limite]")
+        print("     python benchmark_rosto.py --calibrar <pasta_cards_com_foto> [pasta_sem_rosto] [limite]")
+        sys.exit(1)
+
+    limite = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    relatorio = executar_benchmark(sys.argv[1], limite)
+    if relatorio is None:
+        return
+
+    print(f"\nImagens avaliadas: {relatorio['imagens']}")
+    for nome, r in relatorio["detectores"].items():
+        linha = f"{nome:>14}: média {r['media_ms']:8.2f} ms | p95 {r['p95_ms']:8.2f} ms | detecção {r['taxa_deteccao']:.1%}"
+        if "concordancia_com_rapido" in r:
+            linha += f" | concordância {r['concordancia_com_rapido']:.1%} | {r['aceleracao_rapido']}x o tempo do rápido"
+        print(linha)
+
+    with open(JSON_SAIDA, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\nRelatório salvo em '{JSON_SAIDA}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Textos inteiros guardados prontos (sexo, UF, órgão emissor, datas e nomes repetidos do pool);
+# depois de cheio o cache só consulta, não cresce mais
+MAX_TEXTOS_CACHE = 20_000
+
+
+def _mascara_array(mascara):
+    largura, altura = mascara.size
+    return np.asarray(mascara, dtype=np.uint8).reshape(altura, largura)
+
+
+def _sobrepor(destino, origem):
+    """Soma de coberturas igual à do FreeType do Pillow ao juntar glifos: a + b - a*b/255 (MULDIV255)."""
+    a = destino.astype(np.int32)
+    b = origem.astype(np.int32)
+    produto = a * b + 128
+    destino[...] = a + b - (((produto >> 8) + produto) >> 8)
+
+
+class RenderizadorTexto:
+    """
+    Desenha texto de uma linha com uma fonte TrueType reaproveitando os bitmaps:
+    cada glifo é rasterizado uma vez por fração de pixel (1/64) da posição da caneta, e a
+    máscara do texto é montada juntando os glifos com os avanços e o kerning da fonte.
+    O resultado é idêntico, pixel a pixel, a ImageDraw.text no layout básico do Pillow;
+    com o layout raqm (shaping completo) ou posições fracionárias volta para ImageDraw.text.
+
+    Com raqm (o padrão do Pillow quando a libraqm está instalada) exato é False e todo texto
+    vai para ImageDraw.text: não há cache nem ganho de velocidade. Para o ganho, carregue a fonte
+    com layout_engine=ImageFont.Layout.BASIC.
+    """
+
+    def __init__(self, fonte):
+        self.fonte = fonte
+        self._avancos = {}
+        self._kerning = {}
+        self._glifos = {}
+        self._textos = {}
+        self.exato = fonte.layout_engine == ImageFont.Layout.BASIC
+
+    def _avanco(self, caractere):
+        # Em unidades 26.6 (1/64 de pixel), como o layout do FreeType
+        if caractere not in self._avancos:
+            self._avancos[caractere] = round(self.fonte.getlength(caractere) * 64)
+        return self._avancos[caractere]
+
+    def _ajuste_kerning(self, anterior, caractere):
+        par = anterior + caractere
+        if par not in self._kerning:
+            self._kerning[par] = round(self.fonte.getlength(par) * 64) - self._avanco(anterior) - self._avanco(caractere)
+        return self._kerning[par]
+
+    def _glifo(self, caractere, fracao):
+        chave = (caractere, fracao)
+        if chave not in self._glifos:
+            mascara, (dx, dy) = self.fonte.getmask2(caractere, "L", start=(fracao / 64, 0))
+            self._glifos[chave] = (dx, dy, _mascara_array(mascara))
+        return self._glifos[chave]
+
+    def mascara(self, texto):
+        """Máscara (cobertura 0-255) do texto e seu deslocamento (dx, dy) em relação à posição de desenho."""
+        if texto in self._textos:
+            return self._textos[texto]
+
+        pecas = []
+        caneta = 0
+        anterior = None
+        for caractere in texto:
+            if anterior is not None:
+                caneta += self._ajuste_kerning(anterior, caractere)
+            dx, dy, glifo = self._glifo(caractere, caneta % 64)
+            if glifo.size:
+                pecas.append((caneta // 64 + dx, dy, glifo))
+            caneta += self._avanco(caractere)
+            anterior = caractere
+
+        if not pecas:
+            resultado = (0, 0, np.zeros((0, 0), np.uint8))
+        else:
+            x0 = min(x for x, _, _ in pecas)
+            y0 = min(y for _, y, _ in pecas)
+            x1 = max(x + g.shape[1] for x, _, g in pecas)
+            y1 = max(y + g.shape[0] for _, y, g in pecas)
+            montada = np.zeros((y1 - y0, x1 - x0), np.uint8)
+            for x, y, glifo in pecas:
+                regiao = montada[y - y0:y - y0 + glifo.shape[0], x - x0:x - x0 + glifo.shape[1]]
+                if regiao.any():
+                    _sobrepor(regiao, glifo)
+                else:
+                    regiao[...] = glifo
+            resultado = (x0, y0, montada)
+
+        if len(self._textos) < MAX_TEXTOS_CACHE:
+            self._textos[texto] = resultado
+        return resultado
+
+    def desenhar(self, img, xy, texto, cor):
+        """Equivalente a ImageDraw.Draw(img).text(xy, texto, font=fonte, fill=cor)."""
+        x, y = xy
+        if not self.exato or "\n" in texto or x != int(x) or y != int(y):
+            ImageDraw.Draw(img).text(xy, texto, font=self.fonte, fill=cor)
+            return
+
+        dx, dy, mascara = self.mascara(texto)
+        if not mascara.size:
+            return
+        x, y = int(x) + dx, int(y) + dy
+        altura, largura = mascara.shape
+        # Mesma mistura com a cor que o draw_bitmap usado por ImageDraw.text
+        img.paste(cor, (x, y, x + largura, y + altura), Image.fromarray(mascara))
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+CAMINHO_CACHE_PADRAO = os.path.join(os.path.expanduser("~"), ".cache", "projeto_rg", "cache_ocr.sqlite")
+
+# Tamanho máximo do cache em disco (texto + caixas + confianças), em bytes
+TAMANHO_MAXIMO_PADRAO = 2 * 1024 ** 3
+
+# A cada quantas gravações o tamanho total é conferido para despejo (LRU)
+INTERVALO_VERIFICACAO = 200
+
+# Ao despejar, reduz o cache até esta fração do tamanho máximo
+FRACAO_APOS_DESPEJO = 0.9
+
+
+def hash_imagem(img):
+    """Hash do conteúdo da imagem decodificada (pixels + formato do array)."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{img.shape}|{img.dtype}".encode())
+    h.update(memoryview(img).cast("B") if img.flags["C_CONTIGUOUS"] else img.tobytes())
+    return h.hexdigest()
+
+
+def gerar_chave(hash_img, motor, idioma, parametros=None):
+    """Chave do cache: conteúdo da imagem + motor de OCR + idioma + parâmetros do motor."""
+    descricao = json.dumps([hash_img, motor, idioma, parametros or {}], sort_keys=True)
+    return hashlib.sha256(descricao.encode()).hexdigest()
+
+
+class CacheOCR:
+    """
+    Cache persistente (SQLite) dos resultados brutos de OCR, endereçado pelo conteúdo da imagem.
+    Guarda o texto, as caixas e as confianças; quando passa do tamanho máximo,
+    remove as entradas usadas há mais tempo (LRU).
+    Pode ser compartilhado entre processos: cada processo abre a própria conexão.
+    """
+
+    def __init__(self, caminho=CAMINHO_CACHE_PADRAO, tamanho_maximo_bytes=TAMANHO_MAXIMO_PADRAO):
+        self.caminho = caminho
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self._conexao = None
+        self._pid = None
+        self._gravacoes = 0
+
+    def _conectar(self):
+        # Conexões SQLite não podem atravessar fork: reabre no processo filho
+        if self._conexao is None or self._pid != os.getpid():
+            pasta = os.path.dirname(self.caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, timeout=30)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.execute(
+                """CREATE TABLE IF NOT EXISTS ocr (
+                       chave TEXT PRIMARY KEY,
+                       texto TEXT NOT NULL,
+                       caixas TEXT,
+                       confiancas TEXT,
+                       tamanho INTEGER NOT NULL,
+                       ultimo_acesso REAL NOT NULL
+                   )"""
+            )
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_ocr_acesso ON ocr (ultimo_acesso)")
+            self._conexao.commit()
+            self._pid = os.getpid()
+        return self._conexao
+
+    def obter(self, chave):
+        """Retorna {"texto", "caixas", "confiancas"} ou None se a chave não estiver no cache."""
+        conexao = self._conectar()
+        linha = conexao.execute(
+            "SELECT texto, caixas, confiancas FROM ocr WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            return None
+
+        conexao.execute("UPDATE ocr SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+        conexao.commit()
+
+        texto, caixas, confiancas = linha
+        return {
+            "texto": texto,
+            "caixas": json.loads(caixas) if caixas else [],
+            "confiancas": json.loads(confiancas) if confiancas else [],
+        }
+
+    def salvar(self, chave, texto, caixas=None, confiancas=None):
+        """Grava (ou substitui) o resultado de OCR de uma chave."""
+        conexao = self._conectar()
+        caixas_json = json.dumps(caixas) if caixas else None
+        confiancas_json = json.dumps(confiancas) if confiancas else None
+        tamanho = len(texto.encode()) + len(caixas_json or "") + len(confiancas_json or "")
+
+        conexao.execute(
+            "INSERT OR REPLACE INTO ocr (chave, texto, caixas, confiancas, tamanho, ultimo_acesso) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (chave, texto, caixas_json, confiancas_json, tamanho, time.time())
+        )
+        conexao.commit()
+
+        self._gravacoes += 1
+        if self._gravacoes % INTERVALO_VERIFICACAO == 0:
+            self.despejar()
+
+    def tamanho_total(self):
+        return self._conectar().execute("SELECT COALESCE(SUM(tamanho), 0) FROM ocr").fetchone()[0]
+
+    def despejar(self):
+        """Remove as entradas menos usadas recentemente até caber no tamanho máximo."""
+        conexao = self._conectar()
+        total = self.tamanho_total()
+        if total <= self.tamanho_maximo_bytes:
+            return 0
+
+        alvo = self.tamanho_maximo_bytes * FRACAO_APOS_DESPEJO
+        removidas = []
+        for chave, tamanho in conexao.execute("SELECT chave, tamanho FROM ocr ORDER BY ultimo_acesso"):
+            if total <= alvo:
+                break
+            removidas.append((chave,))
+            total -= tamanho
+
+        conexao.executemany("DELETE FROM ocr WHERE chave = ?", removidas)
+        conexao.commit()
+        return len(removidas)
+
+    def fechar(self):
+        if self._conexao is not None and self._pid == os.getpid():
+            self._conexao.close()
+        self._conexao = None
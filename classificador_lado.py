@@ -0,0 +1,222 @@
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from contexto_imagem import como_contexto
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Modelo treinado (centróides), um por extrator: cada um tem o próprio conjunto de rótulos
+# (RG_FRENTE/RG_VERSO em features_rg_face_ocr, os tipos de MAPEAR_PASTAS em extracao_rg_antigo).
+# Sem modelo os extratores continuam usando o tipo da pasta.
+CAMINHO_MODELO_RG = "modelo_lado_rg.json"
+CAMINHO_MODELO_RG_ANTIGO = "modelo_lado_rg_antigo.json"
+
+# Fração de cada rótulo separada para avaliar o classificador no treino (treinar_de_pastas)
+FRACAO_VALIDACAO = 0.2
+
+# Tamanho (largura, altura) da miniatura usada nos perfis de layout
+TAMANHO_MINIATURA = (32, 48)
+
+# Largura da imagem reduzida usada na textura por região e na busca de rosto
+LARGURA_REDUZIDA = 256
+
+# Grade de regiões para a energia de textura (impressão digital, blocos de texto)
+GRADE_TEXTURA = (4, 4)
+
+TIPOS_FRENTE = {"RG_FRENTE", "RG_FRENTE_ANTIGO"}
+
+# Lado que traz o quadro da impressão digital no RG antigo
+TIPOS_COM_DIGITAL = {"RG_VERSO_ANTIGO"}
+
+
+def eh_frente(tipo_documento):
+    return tipo_documento in TIPOS_FRENTE
+
+
+def extrair_assinatura(img, face_cascade=None):
+    """
+    Vetor barato de features calculado só sobre pixels reduzidos:
+    perfis de linhas/colunas (layout), histograma de intensidade, energia de alta
+    frequência por região (quadro da digital, blocos de texto), presença de rosto
+    e proporção da imagem.
+    img pode ser a matriz ou o ContextoImagem do documento (cinza e reduzida ficam para as próximas etapas).
+    """
+    contexto = como_contexto(img)
+    altura, largura = contexto.altura, contexto.largura
+
+    reduzida = contexto.reduzida(LARGURA_REDUZIDA)
+    miniatura = cv2.resize(reduzida, TAMANHO_MINIATURA, interpolation=cv2.INTER_AREA).astype(np.float32) / 255
+
+    perfil_linhas = miniatura.mean(axis=1)
+    perfil_colunas = miniatura.mean(axis=0)
+    histograma = np.histogram(reduzida, bins=16, range=(0, 256))[0].astype(np.float32) / reduzida.size
+
+    # Energia de alta frequência por célula da grade
+    energia = np.abs(cv2.Laplacian(reduzida, cv2.CV_16S, ksize=3)).astype(np.float32) / 255
+    linhas_grade, colunas_grade = GRADE_TEXTURA
+    h_celula = energia.shape[0] // linhas_grade
+    w_celula = energia.shape[1] // colunas_grade
+    celulas = energia[:h_celula * linhas_grade, :w_celula * colunas_grade]
+    textura = celulas.reshape(linhas_grade, h_celula, colunas_grade, w_celula).mean(axis=(1, 3)).ravel()
+
+    rosto = 0.0
+    if face_cascade is not None:
+        faces = face_cascade.detectMultiScale(reduzida, scaleFactor=1.2, minNeighbors=3, minSize=(16, 16))
+        rosto = float(len(faces) > 0)
+
+    return np.concatenate([
+        perfil_linhas, perfil_colunas, histograma, textura,
+        [rosto, largura / altura]
+    ]).astype(np.float32)
+
+
+class ClassificadorLado:
+    """
+    Classificador de centróide mais próximo sobre as assinaturas de extrair_assinatura.
+    Decide frente/verso e RG antigo/novo antes de qualquer OCR ou detecção de rosto.
+    """
+
+    def __init__(self, rotulos, centroides, media, desvio, face_cascade=None):
+        self.rotulos = list(rotulos)
+        self.centroides = np.asarray(centroides, dtype=np.float32)
+        self.media = np.asarray(media, dtype=np.float32)
+        self.desvio = np.asarray(desvio, dtype=np.float32)
+        self.face_cascade = face_cascade
+
+    @classmethod
+    def treinar(cls, assinaturas, rotulos, face_cascade=None):
+        """Calcula um centróide (padronizado) por rótulo."""
+        x = np.asarray(assinaturas, dtype=np.float32)
+        rotulos = np.asarray(rotulos)
+        media = x.mean(axis=0)
+        desvio = x.std(axis=0) + 1e-6
+        z = (x - media) / desvio
+
+        classes = sorted(set(rotulos.tolist()))
+        centroides = [z[rotulos == c].mean(axis=0) for c in classes]
+        return cls(classes, centroides, media, desvio, face_cascade)
+
+    def prever_assinatura(self, assinatura):
+        z = (assinatura - self.media) / self.desvio
+        distancias = np.linalg.norm(self.centroides - z, axis=1)
+        return self.rotulos[int(np.argmin(distancias))]
+
+    def prever(self, img):
+        return self.prever_assinatura(extrair_assinatura(img, self.face_cascade))
+
+    def salvar(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({
+                "rotulos": self.rotulos,
+                "centroides": self.centroides.tolist(),
+                "media": self.media.tolist(),
+                "desvio": self.desvio.tolist(),
+            }, f)
+
+    @classmethod
+    def carregar(cls, caminho, face_cascade=None, rotulos_validos=None):
+        """
+        Carrega o modelo salvo; devolve None se ele ainda não foi treinado ou se prevê
+        rótulos fora de rotulos_validos (modelo treinado para o outro extrator).
+        """
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, encoding="utf-8") as f:
+            dados = json.load(f)
+
+        desconhecidos = set(dados["rotulos"]) - set(rotulos_validos or dados["rotulos"])
+        if desconhecidos:
+            print(f"AVISO: O modelo '{caminho}' prevê tipos que este extrator não conhece "
+                  f"({', '.join(sorted(desconhecidos))}). Ignorando o modelo.")
+            return None
+        return cls(dados["rotulos"], dados["centroides"], dados["media"], dados["desvio"], face_cascade)
+
+
+def carregar_face_cascade_padrao():
+    return cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def separar_validacao(rotulos, fracao=FRACAO_VALIDACAO, semente=0):
+    """
+    Índices (treino, validação) estratificados: de cada rótulo, `fracao` das imagens
+    (ao menos uma, se o rótulo tiver duas ou mais) vai para a validação.
+    """
+    rng = np.random.default_rng(semente)
+    rotulos = np.asarray(rotulos)
+    treino, validacao = [], []
+    for rotulo in sorted(set(rotulos.tolist())):
+        indices = rng.permutation(np.flatnonzero(rotulos == rotulo))
+        n_validacao = max(1, int(round(len(indices) * fracao))) if len(indices) > 1 else 0
+        validacao.extend(indices[:n_validacao].tolist())
+        treino.extend(indices[n_validacao:].tolist())
+    return sorted(treino), sorted(validacao)
+
+
+def treinar_de_pastas(pasta_raiz, mapeamento_pastas, caminho_modelo, fracao_validacao=FRACAO_VALIDACAO):
+    """
+    Treina o classificador com imagens rotuladas pelo nome da pasta
+    (o mesmo formato de MAPEAR_PASTAS / PASTAS) e salva o modelo.
+    As pastas só são usadas aqui; na extração o tipo vem da imagem.
+
+    A acurácia informada é a de uma validação separada antes do treino (fracao_validacao
+    de cada rótulo), não a do próprio treino; o modelo salvo é depois treinado com todas as imagens.
+    """
+    face_cascade = carregar_face_cascade_padrao()
+    assinaturas, rotulos = [], []
+
+    for tipo_doc, nome_pasta in mapeamento_pastas.items():
+        caminho_pasta = os.path.join(pasta_raiz, nome_pasta)
+        if not os.path.isdir(caminho_pasta):
+            print(f"AVISO: Pasta não encontrada: {caminho_pasta}. Pulando.")
+            continue
+
+        for arquivo in sorted(os.listdir(caminho_pasta)):
+            if not arquivo.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
+                continue
+            img = cv2.imread(os.path.join(caminho_pasta, arquivo))
+            if img is None:
+                continue
+            assinaturas.append(extrair_assinatura(img, face_cascade))
+            rotulos.append(tipo_doc)
+
+    if not assinaturas:
+        print("Nenhuma imagem encontrada para treinar o classificador.")
+        return None
+
+    treino, validacao = separar_validacao(rotulos, fracao_validacao)
+    if validacao:
+        modelo_validacao = ClassificadorLado.treinar(
+            [assinaturas[i] for i in treino], [rotulos[i] for i in treino], face_cascade
+        )
+        acertos = sum(modelo_validacao.prever_assinatura(assinaturas[i]) == rotulos[i] for i in validacao)
+        print(f"Acurácia na validação: {acertos / len(validacao):.1%} "
+              f"({acertos}/{len(validacao)} imagens separadas, treino com {len(treino)})")
+    else:
+        print("AVISO: Imagens insuficientes para separar uma validação; acurácia não avaliada.")
+
+    modelo = ClassificadorLado.treinar(assinaturas, rotulos, face_cascade)
+    modelo.salvar(caminho_modelo)
+    print(f"Classificador salvo em '{caminho_modelo}' ({len(rotulos)} imagens)")
+    return modelo
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Uso: python classificador_lado.py <pasta_raiz> <modelo.json> TIPO=PASTA [TIPO=PASTA ...]")
+        print(f"Ex.: python classificador_lado.py ./dados {CAMINHO_MODELO_RG} RG_FRENTE=RGFRENTE_AUG RG_VERSO=RGTRAS_AUG")
+        print(f"O modelo de cada extrator: {CAMINHO_MODELO_RG} (features_rg_face_ocr), "
+              f"{CAMINHO_MODELO_RG_ANTIGO} (extracao_rg_antigo)")
+        sys.exit(1)
+
+    mapeamento = dict(arg.split("=", 1) for arg in sys.argv[3:])
+    treinar_de_pastas(sys.argv[1], mapeamento, sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
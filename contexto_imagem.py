@@ -0,0 +1,67 @@
+import cv2
+
+import metricas
+
+# =========================
+# CONTEXTO DA IMAGEM
+# =========================
+# Um documento passa por várias etapas (classificação, rosto, qualidade, OCR) que usam
+# as mesmas versões derivadas da imagem. O contexto calcula cada versão uma única vez,
+# na primeira etapa que pedir, e as demais recebem a mesma matriz (recortes são views, sem cópia).
+
+
+class ContextoImagem:
+    """
+    Imagem decodificada de um documento e as versões derivadas dela, calculadas sob demanda:
+      cinza                      tons de cinza (cv2.COLOR_BGR2GRAY)
+      reduzida(largura)          cinza reduzida para a largura dada, mantendo a proporção
+      recorte(x0, y0, x1, y1)    região da cinza (view) ou, com fator != 1, essa região redimensionada
+    As matrizes devolvidas são compartilhadas entre as etapas: quem as usa não deve alterá-las.
+    """
+
+    def __init__(self, img):
+        self.img = img
+        self.altura, self.largura = img.shape[:2]
+        self._cinza = img if img.ndim == 2 else None
+        self._reduzidas = {}
+        self._recortes = {}
+
+    @property
+    def shape(self):
+        return self.img.shape
+
+    @property
+    def cinza(self):
+        if self._cinza is None:
+            with metricas.medir("cinza"):
+                self._cinza = cv2.cvtColor(self.img, cv2.COLOR_BGR2GRAY)
+        return self._cinza
+
+    def reduzida(self, largura):
+        """Cinza com a largura dada e a altura proporcional (INTER_AREA)."""
+        if largura not in self._reduzidas:
+            altura = max(1, int(self.altura * (largura / self.largura)))
+            with metricas.medir("reducao"):
+                self._reduzidas[largura] = cv2.resize(self.cinza, (largura, altura), interpolation=cv2.INTER_AREA)
+        return self._reduzidas[largura]
+
+    def recorte(self, x0, y0, x1, y1, fator=1.0):
+        """Região [y0:y1, x0:x1] da cinza; com fator != 1 redimensionada por ele (INTER_AREA) e guardada."""
+        regiao = self.cinza[y0:y1, x0:x1]
+        if fator == 1.0:
+            return regiao
+
+        chave = (x0, y0, x1, y1, fator)
+        if chave not in self._recortes:
+            with metricas.medir("reducao"):
+                self._recortes[chave] = cv2.resize(regiao, None, fx=fator, fy=fator, interpolation=cv2.INTER_AREA)
+        return self._recortes[chave]
+
+    def para_ocr(self, motor):
+        """Imagem entregue ao motor de OCR: a cinza já calculada se o motor trabalha em cinza, senão a original."""
+        return self.cinza if motor.entrada_cinza else self.img
+
+
+def como_contexto(img):
+    """Aceita tanto uma matriz (BGR ou cinza) quanto um ContextoImagem já criado."""
+    return img if isinstance(img, ContextoImagem) else ContextoImagem(img)
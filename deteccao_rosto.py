@@ -0,0 +1,102 @@
+from contexto_imagem import como_contexto
+from extracao_por_template import TAMANHO_BASE
+from script_fotos import ALTURA_FOTO, LARGURA_FOTO, POS_X, POS_Y
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Etapas tentadas em ordem, da mais barata para a mais cara: (região, fator de escala).
+# "foto" = região onde script_fotos cola a foto (com folga); "imagem" = documento inteiro.
+# A busca para na primeira etapa com um rosto confiável.
+ETAPAS_PADRAO = [
+    ("foto", 0.5),
+    ("foto", 1.0),
+    ("imagem", 0.35),
+]
+
+# Folga em volta da região da foto (fração do tamanho da foto), para documentos tortos/deslocados
+FOLGA_FOTO = 0.5
+
+# Parâmetros do cascade na busca rápida (passos maiores que 1.05, pois a região é pequena)
+SCALE_FACTOR = 1.1
+MIN_NEIGHBORS = 4
+TAMANHO_MINIMO = 24
+
+# Peso mínimo no último estágio do cascade para aceitar o rosto e encerrar a busca.
+# Calibrado com "benchmark_rosto.py --calibrar" (160 cards com foto, de 0,35x a 1x do tamanho base,
+# e 80 imagens sem rosto): de 0.0 a 5.0 o resultado é o mesmo (95,6% com o rosto na foto, 4,4% sem
+# rosto em nenhuma etapa, nenhum falso positivo; a busca na imagem inteira com 1.05 fica em 86,2%
+# e 57,5% de falsos positivos). Limiares maiores só levam mais imagens às etapas seguintes
+# (54 ms/imagem em 0.0, 125 ms em 5.0), então fica 0.0: vale o primeiro rosto encontrado.
+LIMIAR_CONFIANCA = 0.0
+
+
+def regiao_foto(largura_img, altura_img, folga=FOLGA_FOTO, tamanho_base=TAMANHO_BASE):
+    """Região (x0, y0, x1, y1) da foto no documento real, a partir das posições de script_fotos."""
+    escala_x = largura_img / tamanho_base[0]
+    escala_y = altura_img / tamanho_base[1]
+    folga_x = LARGURA_FOTO * folga
+    folga_y = ALTURA_FOTO * folga
+
+    x0 = max(0, int((POS_X - folga_x) * escala_x))
+    y0 = max(0, int((POS_Y - folga_y) * escala_y))
+    x1 = min(largura_img, int((POS_X + LARGURA_FOTO + folga_x) * escala_x))
+    y1 = min(altura_img, int((POS_Y + ALTURA_FOTO + folga_y) * escala_y))
+    return x0, y0, x1, y1
+
+
+def _detectar(face_cascade, img_gray):
+    """Roda o cascade e devolve (retângulo, peso) do rosto mais confiável, ou (None, None)."""
+    faces, _, pesos = face_cascade.detectMultiScale3(
+        img_gray,
+        scaleFactor=SCALE_FACTOR,
+        minNeighbors=MIN_NEIGHBORS,
+        minSize=(TAMANHO_MINIMO, TAMANHO_MINIMO),
+        outputRejectLevels=True
+    )
+    if len(faces) == 0:
+        return None, None
+
+    melhor = max(range(len(faces)), key=lambda i: float(pesos[i]))
+    return faces[melhor], float(pesos[melhor])
+
+
+def detectar_rosto_rapido(img_gray, face_cascade, etapas=ETAPAS_PADRAO, limiar=LIMIAR_CONFIANCA):
+    """
+    Detecção de rosto em múltiplas resoluções com saída antecipada.
+    Procura primeiro na região da foto em baixa resolução e só amplia a busca
+    (resolução maior, depois o documento inteiro) se não achar um rosto confiável.
+    Devolve (x, y, w, h) em coordenadas da imagem original, ou (None, None, None, None).
+    img_gray pode ser a matriz cinza ou o ContextoImagem do documento.
+    """
+    contexto = como_contexto(img_gray)
+    altura, largura = contexto.altura, contexto.largura
+    candidato = None
+
+    for regiao, fator in etapas:
+        if regiao == "foto":
+            x0, y0, x1, y1 = regiao_foto(largura, altura)
+        else:
+            x0, y0, x1, y1 = 0, 0, largura, altura
+
+        recorte = contexto.recorte(x0, y0, x1, y1, fator)
+        if min(recorte.shape[:2]) < TAMANHO_MINIMO:
+            continue
+
+        face, peso = _detectar(face_cascade, recorte)
+        if face is None:
+            continue
+
+        # Volta para as coordenadas da imagem original
+        x, y, w, h = (int(round(v / fator)) for v in face)
+        face_original = (x0 + x, y0 + y, w, h)
+
+        if peso >= limiar:
+            return face_original
+        if candidato is None or peso > candidato[1]:
+            candidato = (face_original, peso)
+
+    if candidato is not None:
+        return candidato[0]
+    return None, None, None, None
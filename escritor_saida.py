@@ -0,0 +1,342 @@
+import csv
+import os
+import time
+
+import pandas as pd
+
+# Quantidade padrão de linhas por row group (Parquet) / record batch (Arrow IPC)
+TAMANHO_GRUPO_PADRAO = 5000
+
+
+def _cabecalho_csv(caminho_csv, encoding):
+    with open(caminho_csv, newline="", encoding=encoding) as f:
+        return next(csv.reader(f), [])
+
+
+def anexar_linhas_csv(linhas, caminho_csv, encoding="utf-8"):
+    """
+    Acrescenta linhas ao CSV de saída, escrevendo o cabeçalho só na criação.
+    linhas: lista de dicts ou dict coluna -> valores.
+    Num CSV já existente as colunas seguem a ordem do cabeçalho gravado (as ausentes ficam vazias);
+    uma coluna que não está no cabeçalho gera ValueError em vez de cair sob o cabeçalho errado.
+    """
+    if len(linhas) == 0:
+        return
+
+    tabela = pd.DataFrame(linhas)
+    novo = not os.path.exists(caminho_csv) or os.path.getsize(caminho_csv) == 0
+    if not novo:
+        cabecalho = _cabecalho_csv(caminho_csv, encoding)
+        desconhecidas = [coluna for coluna in tabela.columns if coluna not in cabecalho]
+        if desconhecidas:
+            raise ValueError(
+                f"Colunas ausentes do cabeçalho de '{caminho_csv}': {', '.join(map(str, desconhecidas))}. "
+                f"Grave numa saída nova (ou apague esta e o manifesto dela)."
+            )
+        tabela = tabela.reindex(columns=cabecalho)
+
+    with open(caminho_csv, "a", newline="", encoding=encoding) as f:
+        tabela.to_csv(f, index=False, header=novo)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class EscritorCSV:
+    """Acumula linhas e as acrescenta ao CSV a cada grupo ou checkpoint."""
+
+    def __init__(self, caminho, tamanho_grupo=TAMANHO_GRUPO_PADRAO, encoding="utf-8"):
+        self.caminho = caminho
+        self.tamanho_grupo = tamanho_grupo
+        self.encoding = encoding
+        self.buffer = []
+
+    def escrever(self, linha):
+        self.buffer.append(linha)
+        if len(self.buffer) >= self.tamanho_grupo:
+            self.descarregar()
+
+    def escrever_lote(self, colunas):
+        """Grava direto um lote já em colunas (dict coluna -> array)."""
+        self.descarregar()
+        anexar_linhas_csv(colunas, self.caminho, self.encoding)
+
+    def descarregar(self):
+        anexar_linhas_csv(self.buffer, self.caminho, self.encoding)
+        self.buffer = []
+
+    def checkpoint(self):
+        self.descarregar()
+
+    def intervalo_checkpoint(self, checkpoint_a_cada):
+        """No CSV cada checkpoint só acrescenta linhas: qualquer intervalo serve."""
+        return checkpoint_a_cada
+
+    def fechar(self):
+        self.descarregar()
+
+
+class _EscritorColunar:
+    """
+    Base dos escritores colunares. A saída é uma pasta com um arquivo por checkpoint
+    (cada arquivo é fechado, e portanto legível, antes do manifesto ser gravado),
+    e cada arquivo recebe grupos de no máximo tamanho_grupo linhas.
+    Só um grupo fica em memória por vez, independentemente do tamanho do corpus.
+
+    tipos: dict coluna -> alias de tipo do Arrow ("bool", "int16", "float32", "string"...).
+    Chaves terminadas em "*" valem como prefixo (ex.: {"bow_*": "int16"}).
+    As demais colunas têm o tipo inferido do primeiro grupo e fixado para toda a execução.
+    O esquema (colunas e tipos) é a união das chaves das linhas do primeiro grupo; nos grupos
+    seguintes campos ausentes ficam nulos e colunas novas geram ValueError.
+    """
+
+    extensao = None
+
+    def __init__(self, caminho, tipos=None, tamanho_grupo=TAMANHO_GRUPO_PADRAO):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.caminho = caminho
+        self.tipos = tipos or {}
+        self.tamanho_grupo = tamanho_grupo
+        self.buffer = []
+        self.esquema = None
+        self._arquivo = None
+        self._sequencia = 0
+        # Prefixo único por execução: retomar uma extração nunca sobrescreve partes anteriores
+        self._prefixo = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        os.makedirs(caminho, exist_ok=True)
+
+    def _tipo_declarado(self, coluna):
+        if coluna in self.tipos:
+            return self._pa.type_for_alias(self.tipos[coluna])
+        for chave, alias in self.tipos.items():
+            if chave.endswith("*") and coluna.startswith(chave[:-1]):
+                return self._pa.type_for_alias(alias)
+        return None
+
+    def _montar_tabela(self, linhas):
+        # União das chaves de todas as linhas (não só da primeira), depois das colunas do esquema já fixado
+        nomes = list(self.esquema.names) if self.esquema is not None else []
+        nomes += [coluna for linha in linhas for coluna in linha]
+        return self._montar_tabela_colunas(
+            {coluna: [linha.get(coluna) for linha in linhas] for coluna in dict.fromkeys(nomes)}
+        )
+
+    def _montar_tabela_colunas(self, colunas):
+        """
+        Tabela no esquema da execução. Colunas do esquema ausentes no grupo ficam nulas;
+        colunas fora do esquema geram ValueError (o esquema é fixado pelo primeiro grupo).
+        """
+        pa = self._pa
+        arrays = {nome: pa.array(valores) for nome, valores in colunas.items()}
+
+        if self.esquema is not None:
+            desconhecidas = [nome for nome in arrays if nome not in self.esquema.names]
+            if desconhecidas:
+                raise ValueError(
+                    f"Colunas fora do esquema da saída '{self.caminho}': {', '.join(desconhecidas)}. "
+                    f"Declare-as no primeiro grupo ou grave numa saída nova."
+                )
+            quantidade = len(next(iter(arrays.values()))) if arrays else 0
+            for campo in self.esquema:
+                if campo.name not in arrays:
+                    arrays[campo.name] = pa.nulls(quantidade, campo.type)
+        else:
+            campos = []
+            for nome, array in arrays.items():
+                tipo = self._tipo_declarado(nome) or array.type
+                if pa.types.is_null(tipo):
+                    tipo = pa.string()
+                campos.append(pa.field(nome, tipo))
+            self.esquema = pa.schema(campos)
+
+        return pa.Table.from_arrays(
+            [arrays[campo.name].cast(campo.type) for campo in self.esquema], schema=self.esquema
+        )
+
+    def escrever(self, linha):
+        self.buffer.append(linha)
+        if len(self.buffer) >= self.tamanho_grupo:
+            self.descarregar()
+
+    def escrever_lote(self, colunas):
+        """Grava direto um lote já em colunas (dict coluna -> array), sem passar por dicts por linha."""
+        self.descarregar()
+        self._gravar_tabela(self._montar_tabela_colunas(colunas))
+
+    def descarregar(self):
+        if not self.buffer:
+            return
+
+        tabela = self._montar_tabela(self.buffer)
+        self.buffer = []
+        self._gravar_tabela(tabela)
+
+    def _gravar_tabela(self, tabela):
+        if self._arquivo is None:
+            # Duas execuções no mesmo processo e no mesmo segundo têm o mesmo prefixo: pula nomes já usados
+            caminho_arquivo = self._proximo_arquivo()
+            while os.path.exists(caminho_arquivo):
+                caminho_arquivo = self._proximo_arquivo()
+            self._arquivo = self._abrir(caminho_arquivo)
+
+        self._escrever_tabela(tabela)
+
+    def _proximo_arquivo(self):
+        nome = f"part-{self._prefixo}-{self._sequencia:05d}.{self.extensao}"
+        self._sequencia += 1
+        return os.path.join(self.caminho, nome)
+
+    def checkpoint(self):
+        """Grava o grupo pendente e fecha o arquivo atual, deixando-o completo em disco."""
+        self.descarregar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def intervalo_checkpoint(self, checkpoint_a_cada):
+        """
+        Intervalo efetivo entre checkpoints: um múltiplo de tamanho_grupo, nunca menor que ele.
+        Cada checkpoint fecha o arquivo (Parquet/Arrow só são legíveis depois do rodapé gravado),
+        então checkpoints menores que um grupo gerariam muitos arquivos de um grupo pequeno.
+        Em troca, uma execução interrompida reprocessa até esse número de imagens.
+        """
+        grupos = max(1, -(-checkpoint_a_cada // self.tamanho_grupo))
+        return grupos * self.tamanho_grupo
+
+    def fechar(self):
+        self.checkpoint()
+
+
+class EscritorParquet(_EscritorColunar):
+    extensao = "parquet"
+
+    def _abrir(self, caminho_arquivo):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(caminho_arquivo, self.esquema, compression="zstd")
+
+    def _escrever_tabela(self, tabela):
+        self._arquivo.write_table(tabela, row_group_size=self.tamanho_grupo)
+
+
+class EscritorArrow(_EscritorColunar):
+    extensao = "arrow"
+
+    def _abrir(self, caminho_arquivo):
+        sink = self._pa.OSFile(caminho_arquivo, "wb")
+        return _ArquivoArrow(self._pa.ipc.new_file(sink, self.esquema), sink)
+
+    def _escrever_tabela(self, tabela):
+        self._arquivo.escritor.write_table(tabela, max_chunksize=self.tamanho_grupo)
+
+
+class _ArquivoArrow:
+    """Fecha o escritor IPC e o arquivo subjacente juntos."""
+
+    def __init__(self, escritor, sink):
+        self.escritor = escritor
+        self.sink = sink
+
+    def close(self):
+        self.escritor.close()
+        self.sink.close()
+
+
+def _linhas_a_manter(valores, chaves, ja_vistas):
+    """
+    Máscara das linhas a manter percorrendo de trás para frente: de cada chave em `chaves`
+    fica só a última ocorrência; ja_vistas acumula as chaves encontradas nos arquivos seguintes.
+    """
+    manter = []
+    for valor in reversed(valores):
+        if valor in chaves and valor in ja_vistas:
+            manter.append(False)
+        else:
+            manter.append(True)
+            ja_vistas.add(valor)
+    return manter[::-1]
+
+
+def _substituir_arquivo(caminho, gravar):
+    temporario = caminho + ".tmp"
+    gravar(temporario)
+    os.replace(temporario, caminho)
+
+
+def remover_linhas_substituidas(caminho_saida, coluna, chaves, tamanho_grupo=TAMANHO_GRUPO_PADRAO,
+                                encoding_csv="utf-8"):
+    """
+    Arquivos reprocessados numa execução incremental (conteúdo alterado) ganham uma linha nova
+    no fim da saída; esta função apaga as linhas antigas deles, mantendo só a última de cada
+    valor de `coluna` que estiver em `chaves`. A coluna deve identificar o arquivo de origem de forma
+    única (o caminho completo, não só o nome). Partes gravadas sem a coluna não são alteradas.
+    Só os arquivos com linhas removidas são regravados (num arquivo temporário que substitui o original).
+    Devolve a quantidade de linhas removidas.
+    """
+    chaves = set(chaves)
+    if not chaves or not os.path.exists(caminho_saida):
+        return 0
+
+    extensao = os.path.splitext(caminho_saida)[1].lower()
+    if extensao not in (".parquet", ".arrow"):
+        # Lido como texto para regravar os valores exatamente como estavam
+        tabela = pd.read_csv(caminho_saida, dtype=str, keep_default_na=False, encoding=encoding_csv)
+        if coluna not in tabela.columns:
+            return 0
+        manter = _linhas_a_manter(tabela[coluna].tolist(), chaves, set())
+        if all(manter):
+            return 0
+        _substituir_arquivo(
+            caminho_saida,
+            lambda destino: tabela[manter].to_csv(destino, index=False, encoding=encoding_csv)
+        )
+        return len(manter) - sum(manter)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def ler(caminho):
+        if extensao == ".parquet":
+            return pq.read_table(caminho)
+        with pa.memory_map(caminho) as origem:
+            return pa.ipc.open_file(origem).read_all()
+
+    def gravador(tabela):
+        def gravar(destino):
+            if extensao == ".parquet":
+                pq.write_table(tabela, destino, row_group_size=tamanho_grupo, compression="zstd")
+                return
+            with pa.OSFile(destino, "wb") as sink, pa.ipc.new_file(sink, tabela.schema) as escritor:
+                escritor.write_table(tabela, max_chunksize=tamanho_grupo)
+        return gravar
+
+    # Os nomes das partes começam com data/hora da execução: a ordem dos nomes é a ordem de escrita
+    partes = sorted(
+        os.path.join(caminho_saida, nome) for nome in os.listdir(caminho_saida)
+        if nome.startswith("part-") and nome.endswith("." + extensao[1:])
+    )
+    removidas = 0
+    ja_vistas = set()
+    for caminho in reversed(partes):
+        tabela = ler(caminho)
+        if coluna not in tabela.column_names:
+            continue
+        manter = _linhas_a_manter(tabela.column(coluna).to_pylist(), chaves, ja_vistas)
+        if all(manter):
+            continue
+        _substituir_arquivo(caminho, gravador(tabela.filter(pa.array(manter))))
+        removidas += len(manter) - sum(manter)
+    return removidas
+
+
+def abrir_escritor(caminho_saida, tipos=None, tamanho_grupo=TAMANHO_GRUPO_PADRAO, encoding_csv="utf-8"):
+    """
+    Escolhe o escritor pela extensão da saída:
+    .parquet -> pasta de arquivos Parquet, .arrow -> pasta de arquivos Arrow IPC, demais -> CSV.
+    """
+    extensao = os.path.splitext(caminho_saida)[1].lower()
+    if extensao == ".parquet":
+        return EscritorParquet(caminho_saida, tipos, tamanho_grupo)
+    if extensao == ".arrow":
+        return EscritorArrow(caminho_saida, tipos, tamanho_grupo)
+    return EscritorCSV(caminho_saida, tamanho_grupo, encoding_csv)
@@ -0,0 +1,141 @@
+import re
+from collections import Counter
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Padrões de cada extrator, um grupo nomeado por campo. No modo combinado todos viram uma única regex
+# varrida uma vez só; dois campos nunca casam na mesma posição (se casarem, vale o primeiro), e todos
+# começam por um dígito.
+PADROES_RG_ANTIGO = {
+    "data": r"\d{2}[/\-\.]\d{2}[/\-\.]\d{4}",                              # dd/mm/aaaa, dd-mm-aaaa, dd.mm.aaaa
+    "numero_rg": r"\b\d{1,2}[\.\s]?\d{3}[\.\s]?\d{3}[\-\s]?[a-zA-Z0-9]\b",   # 00.000.000-0 ou similar
+}
+
+PADROES_RG = {
+    "data": r"\d{2}/\d{2}/\d{4}",     # DD/MM/AAAA
+    "numero_rg": r"\b\d{9,11}\b",     # RG ou CPF (mínimo 9 dígitos)
+}
+
+CAMPOS_VAZIOS = {
+    "nome_completo": "N/A",
+    "numero_rg": "N/A",
+    "data_nascimento": "N/A",
+    "data_emissao": "N/A",
+    "filiacao": "N/A",
+}
+
+
+class ExtratorCampos:
+    """
+    Compila os padrões de um perfil numa regex única e devolve, numa passada, as ocorrências
+    de cada campo — as mesmas de re.findall com o padrão isolado.
+
+    A alternância fica dentro de um lookahead: nenhum caractere é consumido, então um campo
+    não "engole" uma ocorrência de outro campo que a sobreponha; a sobreposição entre
+    ocorrências do mesmo campo é descartada aqui, como faria o findall.
+
+    combinar=False busca cada campo com a própria regex: re.search para os campos em `primeira`
+    (devolve só a primeira ocorrência), re.findall para os demais. A regex única testa todas as
+    alternativas em cada dígito do texto; com dois padrões simples e um campo que só precisa da
+    primeira ocorrência, as buscas separadas saem mais baratas (perfil rg em
+    benchmark_extracao_campos.py: ~18,4 us/texto separadas contra ~19,9 us/texto combinada).
+    """
+
+    def __init__(self, padroes, flags=0, combinar=True, primeira=()):
+        self.campos = list(padroes)
+        self.combinar = combinar
+        if combinar:
+            alternativas = "|".join(f"(?P<{campo}>{padrao})" for campo, padrao in padroes.items())
+            self.regex = re.compile(rf"(?=\d)(?={alternativas})", flags)
+        else:
+            self.buscas = [
+                (campo, re.compile(padrao, flags), campo in primeira) for campo, padrao in padroes.items()
+            ]
+
+    def varrer(self, texto):
+        if not self.combinar:
+            return self._varrer_separado(texto)
+
+        ocorrencias = {campo: [] for campo in self.campos}
+        fim_anterior = dict.fromkeys(self.campos, 0)
+        for match in self.regex.finditer(texto):
+            campo = match.lastgroup
+            if match.start() >= fim_anterior[campo]:
+                ocorrencias[campo].append(match.group(campo))
+                fim_anterior[campo] = match.end(campo)
+        return ocorrencias
+
+    def _varrer_separado(self, texto):
+        ocorrencias = {}
+        for campo, regex, so_primeira in self.buscas:
+            if so_primeira:
+                match = regex.search(texto)
+                ocorrencias[campo] = [match.group()] if match else []
+            else:
+                ocorrencias[campo] = regex.findall(texto)
+        return ocorrencias
+
+
+EXTRATOR_RG_ANTIGO = ExtratorCampos(PADROES_RG_ANTIGO, re.IGNORECASE)
+# No perfil rg só o primeiro número interessa: buscas separadas ganham da regex única
+EXTRATOR_RG = ExtratorCampos(PADROES_RG, combinar=False, primeira=("numero_rg",))
+
+
+def tokenizar(texto):
+    """Tokeniza uma única vez (minúsculas, separado por espaços); serve para contagem e bag of words."""
+    return texto.lower().split()
+
+
+def contar_palavras_chave(tokens, palavras_chave):
+    """Bag of words das palavras-chave com um único Counter sobre os tokens."""
+    contagem = Counter(tokens)
+    return {f"bow_{palavra}": contagem[palavra] for palavra in palavras_chave}
+
+
+def primeira_linha_maiuscula(texto):
+    """Heurística de nome: primeira linha com 2+ palavras toda em maiúsculo."""
+    for linha in texto.split("\n"):
+        if len(linha.split()) >= 2 and linha.isupper():
+            return linha.strip()
+    return None
+
+
+def extrair_campos_rg_antigo(texto):
+    """Campos do extrator Tesseract: primeiro RG encontrado, primeira e última data."""
+    ocorrencias = EXTRATOR_RG_ANTIGO.varrer(texto)
+    dados = {**CAMPOS_VAZIOS, "sucesso_regex_rg_antigo": 0}
+
+    if ocorrencias["numero_rg"]:
+        dados["numero_rg"] = ocorrencias["numero_rg"][0].strip()
+        dados["sucesso_regex_rg_antigo"] = 1
+
+    datas = ocorrencias["data"]
+    if len(datas) >= 1:
+        dados["data_nascimento"] = datas[0]
+        if len(datas) > 1:
+            dados["data_emissao"] = datas[-1]
+
+    return dados
+
+
+def extrair_campos_rg(texto):
+    """Campos do extrator PaddleOCR: primeiro número com 9 a 11 dígitos, duas primeiras datas e o nome."""
+    ocorrencias = EXTRATOR_RG.varrer(texto)
+    dados = dict(CAMPOS_VAZIOS)
+
+    if ocorrencias["numero_rg"]:
+        dados["numero_rg"] = ocorrencias["numero_rg"][0]
+
+    datas = ocorrencias["data"]
+    if len(datas) >= 1:
+        dados["data_nascimento"] = datas[0]
+    if len(datas) >= 2:
+        dados["data_emissao"] = datas[1]
+
+    nome = primeira_linha_maiuscula(texto)
+    if nome is not None:
+        dados["nome_completo"] = nome
+
+    return dados
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Tamanho (largura, altura) das imagens-base usadas pelo gerador (rg_frente.png / rg_atras.png).
+# As posições dos JSONs estão nesse sistema de coordenadas.
+TAMANHO_BASE = (1200, 1600)
+
+# Arquivos de posições usados por gerar_imagens_sinteticas.gerar_imagens
+TEMPLATES_PADRAO = {
+    "RG_FRENTE": "posicoes_frente.json",
+    "RG_VERSO": "posicoes_atras.json",
+}
+
+# Largura (px, no tamanho base) da região de cada campo a partir da posição do texto.
+# local_tirou_cidade divide a linha com data_emissao, por isso é mais estreito.
+LARGURA_CAMPOS = {
+    "nome_completo": 560,
+    "filiacao_pai": 560,
+    "filiacao_mae": 560,
+    "cpf": 220,
+    "data_nascimento": 160,
+    "data_emissao": 160,
+    "validade_identidade": 160,
+    "local_tirou_cidade": 215,
+    "orgao_emissor": 480,
+}
+LARGURA_PADRAO = 400
+
+# Altura de uma linha de texto (fonte 17) e folga em volta da região
+ALTURA_LINHA = 24
+MARGEM = 6
+
+# Campo de saída -> campos do template que o compõem (na ordem em que são concatenados)
+CAMPOS_SAIDA = {
+    "nome_completo": ["nome_completo"],
+    "numero_rg": ["cpf"],
+    "data_nascimento": ["data_nascimento"],
+    "data_emissao": ["data_emissao"],
+    "filiacao": ["filiacao_pai", "filiacao_mae"],
+}
+
+PADRAO_DATA = re.compile(r"\d{2}[/\-\.]\d{2}[/\-\.]\d{4}")
+
+
+def carregar_template(caminho_json):
+    """Lê o JSON de posições; devolve None se o arquivo não existir."""
+    if not os.path.exists(caminho_json):
+        return None
+    with open(caminho_json, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def carregar_templates(templates=TEMPLATES_PADRAO):
+    """Carrega os templates existentes, por tipo de documento."""
+    carregados = {}
+    for tipo, caminho in templates.items():
+        template = carregar_template(caminho)
+        if template is None:
+            print(f"AVISO: Template de posições não encontrado: {caminho}. {tipo} usará OCR completo.")
+            continue
+        carregados[tipo] = template
+    return carregados
+
+
+def regiao_campo(campo, posicao, largura_img, altura_img, tamanho_base=TAMANHO_BASE):
+    """Converte a posição do texto no template em (x0, y0, x1, y1) na imagem real."""
+    # Campos com várias posições repetem o mesmo texto: basta ler a primeira
+    x, y = posicao[0] if isinstance(posicao[0], list) else posicao
+
+    escala_x = largura_img / tamanho_base[0]
+    escala_y = altura_img / tamanho_base[1]
+    largura = LARGURA_CAMPOS.get(campo, LARGURA_PADRAO)
+
+    x0 = max(0, int((x - MARGEM) * escala_x))
+    y0 = max(0, int((y - MARGEM) * escala_y))
+    x1 = min(largura_img, int((x + largura + MARGEM) * escala_x))
+    y1 = min(altura_img, int((y + ALTURA_LINHA + MARGEM) * escala_y))
+    return x0, y0, x1, y1
+
+
+def recortar_campos(img, template, tamanho_base=TAMANHO_BASE):
+    """
+    Recorta da imagem só as regiões dos campos usados na saída.
+    Devolve (nomes_campos, recortes); os recortes são views da imagem, sem cópia.
+    """
+    altura_img, largura_img = img.shape[:2]
+    nomes, recortes = [], []
+
+    for campos_template in CAMPOS_SAIDA.values():
+        for campo in campos_template:
+            if campo not in template:
+                continue
+            x0, y0, x1, y1 = regiao_campo(campo, template[campo], largura_img, altura_img, tamanho_base)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            nomes.append(campo)
+            recortes.append(img[y0:y1, x0:x1])
+
+    return nomes, recortes
+
+
+def _normalizar(campo, texto):
+    texto = " ".join(texto.split())
+    if campo.startswith("data_") or campo == "validade_identidade":
+        match = PADRAO_DATA.search(texto)
+        if match:
+            return match.group()
+    return texto
+
+
+def montar_dados_template(nomes, textos):
+    """Atribui o texto de cada recorte diretamente ao campo de saída correspondente."""
+    por_campo = {nome: _normalizar(nome, texto) for nome, texto in zip(nomes, textos)}
+
+    dados = {}
+    for saida, campos_template in CAMPOS_SAIDA.items():
+        partes = [por_campo[c] for c in campos_template if por_campo.get(c)]
+        dados[saida] = " / ".join(partes) if partes else "N/A"
+    return dados
+
+
+def extrair_campos_por_template(img, template, ocr_recortes, tamanho_base=TAMANHO_BASE):
+    """
+    Extração guiada por template: recorta as regiões dos campos, roda o OCR só nelas
+    e devolve o mesmo dicionário de campos da extração por regex
+    (nome_completo, numero_rg, data_nascimento, data_emissao, filiacao).
+
+    ocr_recortes: função que recebe uma lista de recortes e devolve uma lista de textos.
+    """
+    nomes, recortes = recortar_campos(img, template, tamanho_base)
+    textos = ocr_recortes(recortes) if recortes else []
+    return montar_dados_template(nomes, textos)
@@ -1,19 +1,56 @@
 import cv2
-import pytesseract
 import os
-import pandas as pd
-import re
+import sys
+import multiprocessing
+import time
+from collections import deque
 import requests
 from requests.exceptions import RequestException
+from cache_ocr import CacheOCR
+from contexto_imagem import ContextoImagem, como_contexto
+from manifesto import CHECKPOINT_A_CADA, Manifesto, caminho_manifesto, salvar_checkpoint
+from escritor_saida import TAMANHO_GRUPO_PADRAO, abrir_escritor, remover_linhas_substituidas
+from deteccao_rosto import detectar_rosto_rapido
+from qualidade_imagem import calcular_qualidade
+from gate_qualidade import LIMIARES_PADRAO, EstatisticasGate, avaliar_qualidade
+from classificador_lado import CAMINHO_MODELO_RG_ANTIGO, TIPOS_COM_DIGITAL, ClassificadorLado, eh_frente
+from extracao_campos import contar_palavras_chave, extrair_campos_rg_antigo, tokenizar
+from motores_ocr import criar_motor, reconhecer_com_cache
+from ingestao_assincrona import carregar_assincrono, decodificar_bytes
+from shards_imagens import ler_conteudo, ler_imagem, listar_imagens_pasta
+import metricas
 
 # --- 1. CONFIGURAÇÕES E MAPAS ---
 
 # Caminho base: Ajuste se a pasta "Projeto_documentos" não estiver em Downloads
 PASTA_RAIZ = "C:\\Projeto_documentos"
 
-# NOME DO ARQUIVO CSV DE SAÍDA
+# NOME DO ARQUIVO CSV DE SAÍDA (.parquet ou .arrow gravam em formato colunar)
 CSV_SAIDA = "features1.csv"
 
+# Número de processos usados no processamento (1 = execução serial)
+NUM_WORKERS = os.cpu_count() or 1
+
+# Leituras de arquivo simultâneas (PASTA_RAIZ pode estar num compartilhamento de rede lento)
+# e documentos enviados a cada worker antes de ele terminar os anteriores
+LEITURAS_SIMULTANEAS = 32
+DOCUMENTOS_EM_VOO_POR_WORKER = 2
+
+# Motor de OCR ("tesseract", "paddleocr" ou "nulo"), trocável por execução (ver main_antigo)
+MOTOR_OCR = "tesseract"
+IDIOMA_TESSERACT = "por"
+CONFIG_TESSERACT = ""
+OPCOES_MOTORES = {"tesseract": {"idioma": IDIOMA_TESSERACT, "config": CONFIG_TESSERACT}}
+motor_ocr = criar_motor(MOTOR_OCR, **OPCOES_MOTORES.get(MOTOR_OCR, {}))
+
+# Cache em disco do OCR: evita repetir o OCR quando só a lógica de regex/BoW muda
+USAR_CACHE_OCR = True
+cache_ocr = CacheOCR()
+
+# Instrumentação por etapa (tempos e contadores, resumo no fim); ARQUIVO_METRICAS exporta em JSON
+USAR_METRICAS = False
+ARQUIVO_METRICAS = None
+
 # Mapeamento das pastas do RG Antigo
 MAPEAR_PASTAS = {
     "RG_FRENTE_ANTIGO": "RG_Frente_Antigo",
@@ -27,10 +64,39 @@ PALAVRAS_CHAVE_RG = [
     "republica", "seguranca", "publica"
 ]
 
+# Detecção de rosto em múltiplas resoluções, começando pela região da foto (ver deteccao_rosto.py).
+# False volta à busca original na imagem inteira com scaleFactor=1.05.
+DETECCAO_ROSTO_RAPIDA = True
+
+# Gate de qualidade antes do OCR (ver gate_qualidade.py): imagens rejeitadas
+# saem com os campos "N/A" e o código em motivo_rejeicao
+USAR_GATE_QUALIDADE = True
+LIMIARES_GATE = LIMIARES_PADRAO
+
+# Classificador de lado/modelo do documento (ver classificador_lado.py).
+# Enquanto não houver modelo treinado, vale o tipo indicado pela pasta.
+classificador_lado = None
+
+# Tipos das colunas nas saídas colunares (Parquet/Arrow)
+TIPOS_COLUNAS = {
+    "caminho": "string",
+    "face_detectada": "bool",
+    "area_digital_detectada": "bool",
+    "x_face_norm": "float32",
+    "y_face_norm": "float32",
+    "area_face_norm": "float32",
+    "quantidade_palavras": "int32",
+    "sucesso_regex_rg_antigo": "int8",
+    "bow_*": "int16",
+}
+
 # --- 2. FUNÇÕES DE SUPORTE E EXTRAÇÃO DE FEATURES ---
 
 def carregar_caminhos_documentos(pasta_raiz, mapeamento_pastas):
-    """Lê os caminhos das imagens a partir dos nomes de pasta definidos."""
+    """
+    Lê os caminhos das imagens a partir dos nomes de pasta definidos.
+    Uma pasta com shards (ver shards_imagens) fornece as imagens dos shards, com o rótulo do índice.
+    """
     caminhos_imagens = []
     print(f"Buscando imagens na pasta raiz: {pasta_raiz}")
     
@@ -43,14 +109,12 @@ def carregar_caminhos_documentos(pasta_raiz, mapeamento_pastas):
             
         print(f"Encontrado tipo de documento: {tipo_doc} na pasta '{nome_pasta}'.")
 
-        for arquivo in os.listdir(caminho_completo):
-            if arquivo.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
-                caminho = os.path.join(caminho_completo, arquivo)
-                caminhos_imagens.append({
-                    "caminho": caminho,
-                    "tipo_documento": tipo_doc,
-                    "nome_arquivo": arquivo
-                })
+        for caminho, rotulo in listar_imagens_pasta(caminho_completo, tipo_doc):
+            caminhos_imagens.append({
+                "caminho": caminho,
+                "tipo_documento": rotulo,
+                "nome_arquivo": os.path.basename(caminho)
+            })
             
     return caminhos_imagens
 
@@ -84,13 +148,16 @@ def carregar_face_cascade_acessivel(caminho_local_base):
     return face_cascade
 
 def detectar_rosto(img, face_cascade):
-    """Detecta o primeiro rosto encontrado na imagem e retorna suas coordenadas."""
+    """Detecta o primeiro rosto encontrado na imagem (matriz ou ContextoImagem) e retorna suas coordenadas."""
     if img is None:
         return None, None, None, None
         
-    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    contexto = como_contexto(img)
+    if DETECCAO_ROSTO_RAPIDA:
+        return detectar_rosto_rapido(contexto, face_cascade)
+
     faces = face_cascade.detectMultiScale(
-        img_gray, 
+        contexto.cinza, 
         scaleFactor=1.05, 
         minNeighbors=3, 
         minSize=(30, 30)
@@ -101,73 +168,105 @@ def detectar_rosto(img, face_cascade):
         return x, y, w, h
     return None, None, None, None
 
+def classificar_documento(img, tipo_pasta):
+    """Tipo do documento decidido pela própria imagem; sem modelo, usa o tipo da pasta."""
+    if classificador_lado is None:
+        return tipo_pasta
+    return classificador_lado.prever(img)
+
 def detectar_impressao_digital(img, tipo_documento):
-    """FEATURE DE DISTINÇÃO: Heurística para detectar a área da impressão digital (polegar)."""
-    if tipo_documento == "RG_VERSO_ANTIGO":
-        return True 
-        
-    return False
+    """FEATURE DE DISTINÇÃO: o quadro da impressão digital (polegar) só existe em um dos lados."""
+    return tipo_documento in TIPOS_COM_DIGITAL
 
 def gerar_features_bag_palavras(texto):
     """Conta a frequência das palavras-chave no texto (Bag of Words)."""
-    features_bow = {}
-    texto_lower = texto.lower()
-    
-    for palavra in PALAVRAS_CHAVE_RG:
-        features_bow[f"bow_{palavra}"] = texto_lower.split().count(palavra)
-        
-    return features_bow
+    return contar_palavras_chave(tokenizar(texto), PALAVRAS_CHAVE_RG)
+
+def selecionar_motor_ocr(nome):
+    """Troca o motor de OCR usado nesta execução (o modelo só carrega na primeira imagem)."""
+    global motor_ocr
+    if nome != motor_ocr.nome:
+        motor_ocr = criar_motor(nome, **OPCOES_MOTORES.get(nome, {}))
+
+def executar_ocr(img):
+    """Roda o motor de OCR na imagem, reaproveitando o resultado do cache quando existir."""
+    img_ocr = como_contexto(img).para_ocr(motor_ocr)
+    linhas, _, _ = reconhecer_com_cache(motor_ocr, [img_ocr], cache_ocr if USAR_CACHE_OCR else None)[0]
+    return "\n".join(linhas)
+
+def extrair_dados_do_texto(texto_completo):
+    """Tenta localizar campos específicos (IE) no texto do OCR, numa única passada de regex."""
+    return extrair_campos_rg_antigo(texto_completo)
 
 def extrair_texto_e_dados(img, tipo_documento):
     """Extrai o texto completo e tenta localizar campos específicos (IE)."""
-    texto_completo = pytesseract.image_to_string(img, lang='por')
-    
-    dados_extraidos = {
-        "nome_completo": "N/A",
-        "numero_rg": "N/A",
-        "data_nascimento": "N/A",
-        "data_emissao": "N/A",
-        "filiacao": "N/A",
-        "sucesso_regex_rg_antigo": 0 
-    }
-    
-    # Tenta extrair o RG (padrão 00.000.000-0 ou similar)
-    match_rg = re.search(r'\b(\d{1,2}[\.\s]?\d{3}[\.\s]?\d{3}[\-\s]?[a-zA-Z0-9])\b', texto_completo, re.IGNORECASE)
-    
-    if match_rg:
-        dados_extraidos["numero_rg"] = match_rg.group(1).strip()
-        dados_extraidos["sucesso_regex_rg_antigo"] = 1
-        
-    # Tenta extrair Datas (dd/mm/aaaa)
-    match_datas = re.findall(r'(\d{2}[/\-\.]\d{2}[/\-\.]\d{4})', texto_completo)
-    if len(match_datas) >= 1:
-        dados_extraidos["data_nascimento"] = match_datas[0]
-        if len(match_datas) > 1:
-            dados_extraidos["data_emissao"] = match_datas[-1]
-            
-    return texto_completo.strip(), dados_extraidos
+    with metricas.medir("ocr"):
+        texto_completo = executar_ocr(img)
+    with metricas.medir("regex"):
+        dados = extrair_dados_do_texto(texto_completo)
+    return texto_completo.strip(), dados
 
-def processar_imagem_rg(doc, face_cascade):
-    """Processa uma única imagem e retorna um dicionário com todas as features."""
-    caminho = doc["caminho"]
-    tipo_documento = doc["tipo_documento"]
-    
-    img = cv2.imread(caminho)
+def processar_imagem_rg(doc, face_cascade, dados=None):
+    """
+    Processa uma única imagem e retorna um dicionário com todas as features.
+    dados: imagem já decodificada ou bytes do arquivo já lidos; se None, lê do disco (ou do shard).
+    """
+    if dados is None:
+        with metricas.medir("decodificacao"):
+            img = ler_imagem(doc["caminho"])
+    elif isinstance(dados, bytes):
+        img = decodificar_bytes(dados)
+    else:
+        img = dados
     
     if img is None or img.size == 0:
+        metricas.contar("imagens_ilegiveis")
         return None
+    metricas.contar("imagens")
+
+    # Cinza, reduções e recortes calculados uma vez e compartilhados pelas etapas abaixo
+    contexto = ContextoImagem(img)
+
+    # Lado/modelo decidido pelos pixels, antes de qualquer OCR ou detecção de rosto
+    with metricas.medir("classificacao"):
+        tipo_documento = classificar_documento(contexto, doc["tipo_documento"])
+
+    # Extração de Features (o verso não tem foto: pula o Haar cascade)
+    if eh_frente(tipo_documento):
+        with metricas.medir("rosto"):
+            x_face, y_face, w_face, h_face = detectar_rosto(contexto, face_cascade)
+    else:
+        x_face, y_face, w_face, h_face = None, None, None, None
+
+    # Gate de qualidade: imagens ilegíveis não pagam o custo do OCR
+    motivo_rejeicao = None
+    if USAR_GATE_QUALIDADE:
+        with metricas.medir("qualidade"):
+            qualidade = calcular_qualidade(contexto.cinza)
+            motivo_rejeicao = avaliar_qualidade(qualidade, LIMIARES_GATE)
+        if motivo_rejeicao is not None:
+            metricas.contar("rejeitadas_gate")
+
+    tempo_ocr = 0.0
+    if motivo_rejeicao is None:
+        inicio_ocr = time.perf_counter()
+        texto_extraido, dados_ie = extrair_texto_e_dados(contexto, tipo_documento)
+        tempo_ocr = time.perf_counter() - inicio_ocr
+    else:
+        texto_extraido, dados_ie = "", extrair_dados_do_texto("")
 
-    # Extração de Features
-    x_face, y_face, w_face, h_face = detectar_rosto(img, face_cascade)
-    texto_extraido, dados_ie = extrair_texto_e_dados(img, tipo_documento)
     digital_detectada = detectar_impressao_digital(img, tipo_documento)
-    quantidade_palavras = len(texto_extraido.split())
-    features_bow = gerar_features_bag_palavras(texto_extraido)
+    with metricas.medir("bow"):
+        tokens = tokenizar(texto_extraido)
+        quantidade_palavras = len(tokens)
+        features_bow = contar_palavras_chave(tokens, PALAVRAS_CHAVE_RG)
     
     # Montagem do dicionário de resultados
     resultado = {
         "tipo_documento": tipo_documento,
         "nome_arquivo": doc["nome_arquivo"],
+        # Caminho completo: identifica a linha de cada arquivo (nomes iguais em pastas diferentes)
+        "caminho": doc["caminho"],
         
         # Features de Visão Computacional
         "face_detectada": w_face is not None,
@@ -177,22 +276,109 @@ def processar_imagem_rg(doc, face_cascade):
         
         # Features de Distinção e OCR
         "area_digital_detectada": digital_detectada, 
+        "motivo_rejeicao": motivo_rejeicao or "",
         "quantidade_palavras": quantidade_palavras,
         **dados_ie, # Inclui 'sucesso_regex_rg_antigo', numero_rg, datas, etc.
         
         # Features de Linguagem Natural (BOW)
         **features_bow,
         
-        "texto_completo_ocr": texto_extraido 
+        "texto_completo_ocr": texto_extraido,
+
+        # Só para as estatísticas do gate; main_antigo remove antes de gravar
+        "_tempo_ocr_s": tempo_ocr
     }
     
     return resultado
 
 
-# --- 3. FUNÇÃO PRINCIPAL ---
+# --- 3. EXECUÇÃO PARALELA ---
+
+# Cascade carregado uma única vez por processo do pool (ver _inicializar_worker)
+_face_cascade_worker = None
+
+def _inicializar_worker(caminho_local_base, nome_motor_ocr=MOTOR_OCR, usar_metricas=False):
+    """Executado uma vez em cada processo do pool: carrega o próprio CascadeClassifier."""
+    global _face_cascade_worker, classificador_lado
+
+    # Cada worker já é um processo: evita que Tesseract/OpenCV abram threads extras
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    cv2.setNumThreads(1)
+
+    _face_cascade_worker = carregar_face_cascade_acessivel(caminho_local_base)
+    classificador_lado = ClassificadorLado.carregar(CAMINHO_MODELO_RG_ANTIGO, _face_cascade_worker, MAPEAR_PASTAS)
+    selecionar_motor_ocr(nome_motor_ocr)
+    metricas.ativar(usar_metricas)
+
+def _processar_com_tratamento(doc, face_cascade, dados=None):
+    """Processa um documento sem deixar que uma imagem ruim interrompa o lote."""
+    try:
+        with metricas.medir("documento"):
+            return doc, processar_imagem_rg(doc, face_cascade, dados), None
+    except Exception as e:
+        return doc, None, f"{type(e).__name__}: {e}"
+
+def _processar_no_worker(doc, conteudo):
+    # As métricas do worker seguem junto com o resultado para o processo principal
+    return _processar_com_tratamento(doc, _face_cascade_worker, conteudo), metricas.coletar()
+
+def _proximo_resultado(em_voo):
+    """Resultado da tarefa mais antiga da janela (espera o worker terminar, se preciso)."""
+    tarefa = em_voo.popleft()
+    if isinstance(tarefa, tuple):
+        doc, erro = tarefa
+        return doc, None, erro
+    resultado, metricas_worker = tarefa.get()
+    metricas.mesclar(metricas_worker)
+    return resultado
+
+def processar_documentos(documentos, face_cascade, num_workers=1):
+    """
+    Processa os documentos e devolve tuplas (doc, resultado, erro) na ordem da lista de entrada.
+    Os arquivos são lidos de forma assíncrona (ver ingestao_assincrona), que já os entrega em ordem.
+    Com num_workers > 1 usa um pool de processos, cada um com seu próprio cascade, que recebe
+    os bytes lidos e decodifica a imagem (bytes comprimidos são bem menores que o array para
+    enviar entre processos); com um worker a decodificação roda nas threads da ingestão.
+    """
+    leituras = carregar_assincrono(
+        documentos, caminho_de=lambda doc: doc["caminho"], ler=ler_conteudo, decodificar=num_workers <= 1,
+        max_leituras=LEITURAS_SIMULTANEAS
+    )
+
+    if num_workers <= 1:
+        for doc, img, erro in leituras:
+            yield (doc, None, erro) if erro else _processar_com_tratamento(doc, face_cascade, img)
+        return
+
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_inicializar_worker,
+        initargs=(PASTA_RAIZ, motor_ocr.nome, metricas.esta_ativo())
+    ) as pool:
+        # Janela limitada de tarefas no pool (pool.imap consumiria toda a entrada de uma vez);
+        # a fila da ingestão fica cheia e a leitura espera os workers liberarem espaço
+        em_voo = deque()
+        max_em_voo = num_workers * DOCUMENTOS_EM_VOO_POR_WORKER
+
+        for doc, conteudo, erro in leituras:
+            # Falhas de leitura também entram na janela, para a saída seguir a ordem da entrada
+            em_voo.append((doc, erro) if erro else pool.apply_async(_processar_no_worker, (doc, conteudo)))
+            while len(em_voo) >= max_em_voo:
+                yield _proximo_resultado(em_voo)
 
-def main_antigo():
+        while em_voo:
+            yield _proximo_resultado(em_voo)
+
+
+# --- 4. FUNÇÃO PRINCIPAL ---
+
+def main_antigo(num_workers=NUM_WORKERS, checkpoint_a_cada=CHECKPOINT_A_CADA,
+                caminho_saida=CSV_SAIDA, tamanho_grupo=TAMANHO_GRUPO_PADRAO, motor=MOTOR_OCR):
+    global classificador_lado
     print("Iniciando extração de features para RG Antigo (Frente e Verso)...")
+    selecionar_motor_ocr(motor)
+    if USAR_METRICAS:
+        metricas.ativar()
     
     # NOVO CARREGAMENTO: Tenta carregar o cascade do caminho local.
     face_cascade = carregar_face_cascade_acessivel(PASTA_RAIZ)
@@ -200,33 +386,89 @@ def main_antigo():
     if face_cascade is None:
         print("Finalizando execução devido à falha no carregamento do haarcascade.")
         return
+
+    classificador_lado = ClassificadorLado.carregar(CAMINHO_MODELO_RG_ANTIGO, face_cascade, MAPEAR_PASTAS)
+    if classificador_lado is None:
+        print(f"Classificador de lado não encontrado ({CAMINHO_MODELO_RG_ANTIGO}): usando o tipo das pastas.")
         
-    documentos_para_processar = carregar_caminhos_documentos(PASTA_RAIZ, MAPEAR_PASTAS)
+    documentos_encontrados = carregar_caminhos_documentos(PASTA_RAIZ, MAPEAR_PASTAS)
     
-    if not documentos_para_processar:
+    if not documentos_encontrados:
         print(f"Nenhuma imagem encontrada nas pastas mapeadas: {MAPEAR_PASTAS.values()}")
         return
 
-    print(f"\nTotal de {len(documentos_para_processar)} documentos encontrados. Processando...")
+    # Execução incremental: só o que é novo ou mudou desde a última execução
+    manifesto = Manifesto(caminho_manifesto(caminho_saida))
+    documentos_para_processar = [
+        doc for doc in documentos_encontrados if manifesto.precisa_processar(doc["caminho"])
+    ]
+    puladas = len(documentos_encontrados) - len(documentos_para_processar)
+    if puladas:
+        print(f"{puladas} documento(s) já processados anteriormente foram pulados.")
 
-    resultados_finais = []
-    for doc in documentos_para_processar:
-        print(f"-> Processando {doc['nome_arquivo']} ({doc['tipo_documento']})...")
-        resultado = processar_imagem_rg(doc, face_cascade)
-        if resultado:
-            resultados_finais.append(resultado)
+    if not documentos_para_processar:
+        manifesto.salvar()
+        print("\nNenhum documento novo para processar.")
+        return
 
-    if resultados_finais:
-        df = pd.DataFrame(resultados_finais)
-        df['face_detectada'] = df['face_detectada'].astype(int)
-        df['area_digital_detectada'] = df['area_digital_detectada'].astype(int)
-        
-        df.to_csv(CSV_SAIDA, index=False, encoding="utf-8")
-        print(f"\n✅ CSV RG Antigo gerado com features: {CSV_SAIDA}")
-        print(f"Shape do DataFrame de Features: {df.shape}")
+    print(f"\nTotal de {len(documentos_para_processar)} documentos a processar com {num_workers} worker(s)...")
+
+    escritor = abrir_escritor(caminho_saida, TIPOS_COLUNAS, tamanho_grupo)
+    intervalo = escritor.intervalo_checkpoint(checkpoint_a_cada)
+    if intervalo != checkpoint_a_cada:
+        print(f"Checkpoint a cada {intervalo} imagens (múltiplo do grupo de {tamanho_grupo} linhas da saída colunar).")
+        checkpoint_a_cada = intervalo
+    estatisticas_gate = EstatisticasGate()
+    processados = 0
+    falhas = 0
+    for doc, resultado, erro in processar_documentos(documentos_para_processar, face_cascade, num_workers):
+        if not erro and resultado is None:
+            erro = "imagem ilegível (não foi possível decodificar)"
+        if erro:
+            # Não entra no manifesto: será tentado de novo na próxima execução
+            falhas += 1
+            print(f"-> ERRO em {doc['nome_arquivo']} ({doc['tipo_documento']}): {erro}")
+            continue
+        print(f"-> Processado {doc['nome_arquivo']} ({doc['tipo_documento']})")
+        manifesto.registrar(doc["caminho"])
+        tempo_ocr = resultado.pop("_tempo_ocr_s")
+        estatisticas_gate.registrar(resultado["motivo_rejeicao"] or None)
+        if not resultado["motivo_rejeicao"]:
+            estatisticas_gate.registrar_ocr(tempo_ocr)
+        resultado['face_detectada'] = int(resultado['face_detectada'])
+        resultado['area_digital_detectada'] = int(resultado['area_digital_detectada'])
+        escritor.escrever(resultado)
+        processados += 1
+
+        if len(manifesto.pendentes) >= checkpoint_a_cada:
+            salvar_checkpoint(escritor, manifesto)
+            print(f"Checkpoint: {processados} documento(s) gravados em {caminho_saida}")
+
+    salvar_checkpoint(escritor, manifesto)
+    escritor.fechar()
+
+    # Arquivos alterados desde a última execução ganharam uma linha nova: a antiga sai da saída
+    removidas = remover_linhas_substituidas(caminho_saida, "caminho", manifesto.substituidos, tamanho_grupo)
+    if removidas:
+        print(f"{removidas} linha(s) de versões anteriores de arquivos alterados removida(s) da saída.")
+
+    if falhas:
+        print(f"\nAVISO: {falhas} documento(s) falharam e foram ignorados.")
+
+    estatisticas_gate.imprimir_resumo()
+    metricas.imprimir_resumo()
+    if ARQUIVO_METRICAS and metricas.esta_ativo():
+        metricas.exportar(ARQUIVO_METRICAS)
+
+    if processados:
+        print(f"\n✅ Saída RG Antigo atualizada com features: {caminho_saida}")
+        print(f"Documentos processados nesta execução: {processados}")
     else:
         print("\nNenhuma feature processada com sucesso.")
 
-
 if __name__ == "__main__":
-    main_antigo()
\ No newline at end of file
+    # Uso: python extracao_rg_antigo.py [num_workers] [motor_ocr]
+    main_antigo(
+        int(sys.argv[1]) if len(sys.argv) > 1 else NUM_WORKERS,
+        motor=sys.argv[2] if len(sys.argv) > 2 else MOTOR_OCR
+    )
\ No newline at end of file
@@ -1,9 +1,21 @@
 import cv2
 import os
-import pandas as pd
-import numpy as np
-import re
-from paddleocr import PaddleOCR
+import sys
+import time
+from cache_ocr import CacheOCR
+from contexto_imagem import ContextoImagem, como_contexto
+from manifesto import CHECKPOINT_A_CADA, Manifesto, caminho_manifesto, salvar_checkpoint
+from escritor_saida import TAMANHO_GRUPO_PADRAO, abrir_escritor, remover_linhas_substituidas
+from deteccao_rosto import detectar_rosto_rapido
+from qualidade_imagem import calcular_qualidade, calcular_qualidade_imagens
+from gate_qualidade import LIMIARES_PADRAO, EstatisticasGate, avaliar_qualidade
+from classificador_lado import CAMINHO_MODELO_RG, ClassificadorLado, eh_frente
+from extracao_por_template import TEMPLATES_PADRAO, carregar_templates, extrair_campos_por_template
+from extracao_campos import extrair_campos_rg
+from motores_ocr import criar_motor, reconhecer_com_cache
+from ingestao_assincrona import carregar_assincrono
+from shards_imagens import ler_conteudo, ler_imagem, listar_imagens_pasta
+import metricas
 
 
 
@@ -14,24 +26,85 @@ PASTAS = {
     "RG_VERSO": "RGTRAS_AUG",
 }
 
+# Saída: .csv, .parquet ou .arrow (ver escritor_saida.abrir_escritor)
 CSV_SAIDA = "features_rg_face_ocr.csv"
 
-ocr = PaddleOCR(lang="pt")
+# "texto_completo": OCR da imagem inteira + regex
+# "template": OCR só das regiões dos campos (posicoes_*.json); tipos sem template usam o texto completo
+MODO_EXTRACAO = "texto_completo"
+TEMPLATES_POSICOES = TEMPLATES_PADRAO
+_templates_carregados = None
+
+# Gate de qualidade: imagens sem condição de leitura não passam pelo OCR
+# e saem com os campos "N/A" e o código em motivo_rejeicao
+USAR_GATE_QUALIDADE = True
+LIMIARES_GATE = LIMIARES_PADRAO
+estatisticas_gate = EstatisticasGate()
+
+# Tipos das colunas nas saídas colunares (Parquet/Arrow)
+TIPOS_COLUNAS = {
+    "caminho": "string",
+    "largura": "int32",
+    "altura": "int32",
+    "proporcao": "float32",
+    "brilho_medio": "float32",
+    "contraste": "float32",
+    "nitidez_blur": "float32",
+    "nitidez_min_regiao": "float32",
+    "reflexo_frac": "float32",
+    "sombra_frac": "float32",
+    "rosto_detectado": "bool",
+    "area_face_norm": "float32",
+}
 
-def extrair_texto(img):
+# Motor de OCR ("paddleocr", "tesseract" ou "nulo"); o modelo só é carregado na primeira imagem
+MOTOR_OCR = "paddleocr"
+IDIOMA_OCR = "pt"
+OPCOES_MOTORES = {"paddleocr": {"idioma": IDIOMA_OCR}}
+motor_ocr = criar_motor(MOTOR_OCR, **OPCOES_MOTORES.get(MOTOR_OCR, {}))
+
+# Cache em disco do OCR (texto, caixas e confianças), chaveado pelo conteúdo da imagem
+USAR_CACHE_OCR = True
+cache_ocr = CacheOCR()
+
+# Instrumentação por etapa (tempos e contadores, resumo no fim); ARQUIVO_METRICAS exporta em JSON
+USAR_METRICAS = False
+ARQUIVO_METRICAS = None
+
+# Lote de imagens enviado de uma vez ao motor de OCR e janela de imagens decodificadas à frente
+TAMANHO_LOTE_OCR = 8
+PREFETCH_IMAGENS = 16
+THREADS_DECODIFICACAO = 4
+
+# Leituras de arquivo simultâneas (PASTA_RAIZ pode estar num compartilhamento de rede lento)
+LEITURAS_SIMULTANEAS = 32
+
+def selecionar_motor_ocr(nome):
+    """Troca o motor de OCR usado nesta execução."""
+    global motor_ocr
+    if nome != motor_ocr.nome:
+        motor_ocr = criar_motor(nome, **OPCOES_MOTORES.get(nome, {}))
+
+def executar_ocr_lote(imgs):
     """
-    Extrai todo o texto da imagem usando PaddleOCR (versão nova).
+    Roda o motor de OCR numa lista de imagens com uma única chamada em lote
+    e devolve, na mesma ordem, uma tupla (linhas, caixas, confiancas) por imagem.
+    Imagens já presentes no cache em disco não são enviadas ao modelo.
     """
-    resultado = ocr.predict(img)
-    linhas = []
+    return reconhecer_com_cache(motor_ocr, imgs, cache_ocr if USAR_CACHE_OCR else None)
 
-    # Estrutura retornada:
-    # [[ [coords], (texto, confianca) ], ...]
-    for bloco in resultado:
-        for item in bloco:
-            texto_linha = item[1][0]
-            linhas.append(texto_linha)
+def executar_ocr(img):
+    """
+    Roda o motor de OCR e devolve (linhas, caixas, confiancas),
+    consultando antes o cache em disco.
+    """
+    return executar_ocr_lote([img])[0]
 
+def extrair_texto(img):
+    """
+    Extrai todo o texto da imagem usando o motor de OCR configurado (PaddleOCR por padrão).
+    """
+    linhas, _, _ = executar_ocr(img)
     return " ".join(linhas)
 
 # =========================
@@ -40,56 +113,47 @@ def extrair_texto(img):
 cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
 face_cascade = cv2.CascadeClassifier(cascade_path)
 
-# =========================
-# EXTRAÇÃO DOS CAMPOS DO RG
-# =========================
-def extrair_dados_textuais(texto):
-    dados = {
-        "nome_completo": "N/A",
-        "numero_rg": "N/A",
-        "data_nascimento": "N/A",
-        "data_emissao": "N/A",
-        "filiacao": "N/A",
-    }
+# Busca em múltiplas resoluções a partir da região da foto (ver deteccao_rosto.py);
+# False volta à busca original na imagem inteira
+DETECCAO_ROSTO_RAPIDA = True
 
-    # Número do RG ou CPF (mínimo 9 dígitos)
-    rg_match = re.search(r'\b\d{9,11}\b', texto)
-    if rg_match:
-        dados["numero_rg"] = rg_match.group()
+def detectar_rosto(img_gray):
+    """Primeiro rosto encontrado (x, y, w, h) ou None; aceita a imagem cinza ou o ContextoImagem."""
+    if DETECCAO_ROSTO_RAPIDA:
+        x, y, w, h = detectar_rosto_rapido(img_gray, face_cascade)
+        return None if w is None else (x, y, w, h)
 
-    # Datas no formato DD/MM/AAAA
-    datas = re.findall(r'\d{2}/\d{2}/\d{4}', texto)
-    if len(datas) >= 1:
-        dados["data_nascimento"] = datas[0]
-    if len(datas) >= 2:
-        dados["data_emissao"] = datas[1]
+    faces = face_cascade.detectMultiScale(como_contexto(img_gray).cinza, 1.1, 4)
+    return faces[0] if len(faces) > 0 else None
 
-    # Nome completo (heurística simples: linha longa em maiúsculo)
-    linhas = texto.split("\n")
-    for linha in linhas:
-        if len(linha.split()) >= 2 and linha.isupper():
-            dados["nome_completo"] = linha.strip()
-            break
+# Classificador de lado/modelo do documento; sem modelo treinado vale o tipo da pasta
+classificador_lado = ClassificadorLado.carregar(CAMINHO_MODELO_RG, face_cascade, PASTAS)
 
-    return dados
+def classificar_documento(img, tipo_pasta):
+    if classificador_lado is None:
+        return tipo_pasta
+    return classificador_lado.prever(img)
 
 # =========================
-# EXTRAÇÃO DAS FEATURES
+# EXTRAÇÃO DOS CAMPOS DO RG
 # =========================
-def extrair_features_imagem(caminho, tipo_documento):
-    img = cv2.imread(caminho)
-
-    if img is None:
-        return None
+def extrair_dados_textuais(texto):
+    return extrair_campos_rg(texto)
 
-    altura, largura, _ = img.shape
+# =========================
+# EXTRAÇÃO DAS FEATURES
+# =========================
+def extrair_features_visuais(img, tipo_documento, qualidade=None):
+    """
+    Features que dependem só dos pixels (tamanho, qualidade e rosto).
+    img pode ser a matriz ou o ContextoImagem do documento; qualidade pode vir pronta do processamento em lote.
+    """
+    contexto = como_contexto(img)
+    altura, largura = contexto.altura, contexto.largura
     proporcao = largura / altura
 
-    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    brilho_medio = np.mean(img_gray)
-    contraste = np.std(img_gray)
-    blur = cv2.Laplacian(img_gray, cv2.CV_64F).var()
+    if qualidade is None:
+        qualidade = calcular_qualidade(contexto.cinza)
 
     # =========================
     # DETECÇÃO DE ROSTO (SÓ NA FRENTE)
@@ -97,47 +161,159 @@ def extrair_features_imagem(caminho, tipo_documento):
     rosto_detectado = 0
     area_face = 0
 
-    if tipo_documento == "RG_FRENTE":
-        faces = face_cascade.detectMultiScale(img_gray, 1.1, 4)
+    if eh_frente(tipo_documento):
+        with metricas.medir("rosto"):
+            face = detectar_rosto(contexto)
 
-        if len(faces) > 0:
-            x, y, w, h = faces[0]
+        if face is not None:
+            x, y, w, h = face
             rosto_detectado = 1
             area_face = (w * h) / (largura * altura)
 
-    # =========================
-    # OCR + EXTRAÇÃO DE CAMPOS
-    # =========================
-    texto = extrair_texto(img)
-    dados_textuais = extrair_dados_textuais(texto)
-
     return {
-        "arquivo": os.path.basename(caminho),
-        "tipo_documento": tipo_documento,
-
         # FEATURES VISUAIS
         "largura": largura,
         "altura": altura,
         "proporcao": round(proporcao, 4),
-        "brilho_medio": round(brilho_medio, 2),
-        "contraste": round(contraste, 2),
-        "nitidez_blur": round(blur, 2),
+        "brilho_medio": round(float(qualidade["brilho_medio"]), 2),
+        "contraste": round(float(qualidade["contraste"]), 2),
+        "nitidez_blur": round(float(qualidade["nitidez_blur"]), 2),
+        "nitidez_min_regiao": round(float(qualidade["nitidez_min_regiao"]), 2),
+        "reflexo_frac": round(float(qualidade["reflexo_frac"]), 4),
+        "sombra_frac": round(float(qualidade["sombra_frac"]), 4),
 
         # FACE
         "rosto_detectado": rosto_detectado,
         "area_face_norm": round(area_face, 4),
+    }
+
+def montar_features(caminho, tipo_documento, features_visuais, dados_textuais):
+    """Junta features visuais e campos do RG numa linha de saída."""
+    return {
+        "arquivo": os.path.basename(caminho),
+        # Caminho completo: identifica a linha de cada arquivo (nomes iguais em pastas diferentes)
+        "caminho": caminho,
+        "tipo_documento": tipo_documento,
+        **features_visuais,
 
         # CAMPOS DO RG
         **dados_textuais
     }
 
+def _templates():
+    global _templates_carregados
+    if _templates_carregados is None:
+        _templates_carregados = carregar_templates(TEMPLATES_POSICOES)
+    return _templates_carregados
+
+def _ocr_recortes(recortes):
+    """Todos os recortes de campos de um documento vão numa única chamada ao OCR."""
+    return [" ".join(linhas) for linhas, _, _ in executar_ocr_lote(recortes)]
+
+def extrair_features_imagem(caminho, tipo_documento):
+    img = ler_imagem(caminho)
+
+    if img is None:
+        return None
+
+    return extrair_features_lote([(caminho, tipo_documento, img)])[0]
+
+def extrair_features_lote(itens):
+    """
+    Versão em lote de extrair_features_imagem.
+    itens: lista de (caminho, tipo_documento, img) com a imagem já decodificada (ou None).
+    Retorna as features na mesma ordem, com None para imagens ilegíveis.
+    """
+    validos = [i for i, (_, _, img) in enumerate(itens) if img is not None]
+    resultados = [None] * len(itens)
+    metricas.contar("imagens", len(validos))
+    metricas.contar("imagens_ilegiveis", len(itens) - len(validos))
+
+    # Um contexto por imagem: cinza, reduções e recortes calculados uma vez e reaproveitados por todas as etapas
+    contextos = {i: ContextoImagem(itens[i][2]) for i in validos}
+
+    # O tipo (frente/verso, antigo/novo) vem da imagem; a pasta é só o valor padrão
+    with metricas.medir("classificacao_lote"):
+        itens = [
+            (caminho, classificar_documento(contextos[i], tipo_pasta), img) if i in contextos else (caminho, tipo_pasta, img)
+            for i, (caminho, tipo_pasta, img) in enumerate(itens)
+        ]
+
+    # Tons de cinza uma vez por imagem (já prontos se o classificador rodou); qualidade em pilha para o lote todo
+    with metricas.medir("cinza_lote"):
+        grays = [contextos[i].cinza for i in validos]
+    with metricas.medir("qualidade_lote"):
+        qualidades = dict(zip(validos, calcular_qualidade_imagens(grays)))
+    visuais = {
+        i: extrair_features_visuais(contextos[i], itens[i][1], qualidades[i])
+        for i in validos
+    }
+
+    # =========================
+    # GATE DE QUALIDADE
+    # =========================
+    aprovados = []
+    for i in validos:
+        motivo = avaliar_qualidade(qualidades[i], LIMIARES_GATE) if USAR_GATE_QUALIDADE else None
+        estatisticas_gate.registrar(motivo)
+        visuais[i]["motivo_rejeicao"] = motivo or ""
+        if motivo is None:
+            aprovados.append(i)
+        else:
+            metricas.contar("rejeitadas_gate")
+
+    # =========================
+    # OCR + EXTRAÇÃO DE CAMPOS
+    # =========================
+    dados = {i: extrair_dados_textuais("") for i in validos if i not in aprovados}
+    inicio_ocr = time.perf_counter()
+
+    if MODO_EXTRACAO == "template":
+        templates = _templates()
+        for i in aprovados:
+            tipo_documento = itens[i][1]
+            if tipo_documento in templates:
+                img_ocr = contextos[i].para_ocr(motor_ocr)
+                dados[i] = extrair_campos_por_template(img_ocr, templates[tipo_documento], _ocr_recortes)
+
+    texto_completo = [i for i in aprovados if i not in dados]
+    with metricas.medir("ocr_lote"):
+        ocr_lote = executar_ocr_lote([contextos[i].para_ocr(motor_ocr) for i in texto_completo])
+    for i, (linhas, _, _) in zip(texto_completo, ocr_lote):
+        with metricas.medir("regex"):
+            dados[i] = extrair_dados_textuais(" ".join(linhas))
+
+    if aprovados:
+        estatisticas_gate.registrar_ocr(time.perf_counter() - inicio_ocr, len(aprovados))
+
+    for i in validos:
+        caminho, tipo_documento, _ = itens[i]
+        resultados[i] = montar_features(caminho, tipo_documento, visuais[i], dados[i])
+
+    return resultados
+
+def carregar_imagens_com_prefetch(itens, max_prefetch=PREFETCH_IMAGENS, num_threads=THREADS_DECODIFICACAO,
+                                  max_leituras=LEITURAS_SIMULTANEAS):
+    """
+    Lê as imagens com até max_leituras leituras simultâneas, decodifica em num_threads threads
+    e devolve (caminho, tipo_documento, img, erro) na ordem de itens, com no máximo
+    max_prefetch imagens decodificadas esperando o consumidor.
+    Assim a leitura/decodificação do disco se sobrepõe à inferência do OCR.
+    """
+    for (caminho, tipo_documento), img, erro in carregar_assincrono(
+            itens, caminho_de=lambda item: item[0], ler=ler_conteudo, max_leituras=max_leituras,
+            num_threads=num_threads, tamanho_fila=max_prefetch):
+        yield caminho, tipo_documento, img, erro
+
 # =========================
 # MAIN
 # =========================
-def main():
-    resultados = []
-
-    for tipo, nome_pasta in PASTAS.items():
+def listar_imagens(pastas=PASTAS):
+    """
+    Lista (caminho, tipo_documento) de todas as imagens das pastas configuradas.
+    Uma pasta com shards (ver shards_imagens) fornece as imagens dos shards, com o rótulo do índice.
+    """
+    for tipo, nome_pasta in pastas.items():
         caminho_pasta = os.path.join(PASTA_RAIZ, nome_pasta)
 
         if not os.path.isdir(caminho_pasta):
@@ -146,22 +322,91 @@ def main():
 
         print(f"📂 Lendo imagens de: {nome_pasta}")
 
-        for arquivo in os.listdir(caminho_pasta):
-            if arquivo.lower().endswith((".jpg", ".png", ".jpeg", ".webp")):
-                caminho_img = os.path.join(caminho_pasta, arquivo)
+        yield from listar_imagens_pasta(caminho_pasta, tipo)
 
-                features = extrair_features_imagem(caminho_img, tipo)
+def main(checkpoint_a_cada=CHECKPOINT_A_CADA, caminho_saida=CSV_SAIDA, tamanho_grupo=TAMANHO_GRUPO_PADRAO,
+         tamanho_lote=TAMANHO_LOTE_OCR, motor=MOTOR_OCR):
+    """
+    Processa apenas imagens novas ou alteradas (segundo o manifesto) e grava as linhas
+    em streaming na saída, com checkpoint a cada checkpoint_a_cada imagens.
+    O OCR roda em lotes de tamanho_lote imagens, lidas e decodificadas antecipadamente em threads.
+    """
+    selecionar_motor_ocr(motor)
+    if USAR_METRICAS:
+        metricas.ativar()
+    manifesto = Manifesto(caminho_manifesto(caminho_saida))
+    escritor = abrir_escritor(caminho_saida, TIPOS_COLUNAS, tamanho_grupo)
+    intervalo = escritor.intervalo_checkpoint(checkpoint_a_cada)
+    if intervalo != checkpoint_a_cada:
+        print(f"Checkpoint a cada {intervalo} imagens (múltiplo do grupo de {tamanho_grupo} linhas da saída colunar).")
+        checkpoint_a_cada = intervalo
+    processadas = 0
+    puladas = 0
+    falhas = 0
+
+    a_processar = []
+    for caminho_img, tipo in listar_imagens():
+        if manifesto.precisa_processar(caminho_img):
+            a_processar.append((caminho_img, tipo))
+        else:
+            puladas += 1
+
+    def processar_lote(lote):
+        nonlocal processadas, falhas
+        with metricas.medir("lote"):
+            features_lote = extrair_features_lote(lote)
+        for (caminho_img, _, _), features in zip(lote, features_lote):
+            if features is None:
+                # Imagem ilegível: fora do manifesto, para ser tentada de novo na próxima execução
+                falhas += 1
+                print(f"❌ Imagem ilegível: {caminho_img}")
+                continue
+            manifesto.registrar(caminho_img)
+            escritor.escrever(features)
+            processadas += 1
+
+    lote = []
+    for caminho_img, tipo, img, erro in carregar_imagens_com_prefetch(a_processar):
+        if erro:
+            # Não entra no manifesto: será tentado de novo na próxima execução
+            falhas += 1
+            print(f"❌ Falha ao ler {caminho_img}: {erro}")
+            continue
+        lote.append((caminho_img, tipo, img))
+        if len(lote) >= tamanho_lote:
+            processar_lote(lote)
+            lote = []
+
+        if len(manifesto.pendentes) >= checkpoint_a_cada:
+            salvar_checkpoint(escritor, manifesto)
+            print(f"💾 Checkpoint: {processadas} imagens novas gravadas")
+
+    processar_lote(lote)
+    salvar_checkpoint(escritor, manifesto)
+    escritor.fechar()
+
+    # Arquivos alterados desde a última execução ganharam uma linha nova: a antiga sai da saída
+    removidas = remover_linhas_substituidas(caminho_saida, "caminho", manifesto.substituidos, tamanho_grupo)
+    if removidas:
+        print(f"{removidas} linha(s) de versões anteriores de arquivos alterados removida(s) da saída.")
+
+    if processadas:
+        print(f"\n✅ Saída atualizada com sucesso: {caminho_saida}")
+        print(f"📊 Imagens processadas nesta execução: {processadas}")
+    else:
+        print("⚠️ Nenhuma imagem nova foi processada.")
 
-                if features:
-                    resultados.append(features)
+    if puladas:
+        print(f"⏭️ Imagens já processadas (puladas): {puladas}")
 
-    if resultados:
-        df = pd.DataFrame(resultados)
-        df.to_csv(CSV_SAIDA, index=False, encoding="utf-8")
-        print(f"\n✅ CSV gerado com sucesso: {CSV_SAIDA}")
-        print(f"📊 Total de imagens processadas: {len(df)}")
-    else:
-        print("⚠️ Nenhuma imagem foi processada.")
+    if falhas:
+        print(f"⚠️ {falhas} imagem(ns) falharam e serão tentadas de novo na próxima execução.")
+
+    estatisticas_gate.imprimir_resumo()
+    metricas.imprimir_resumo()
+    if ARQUIVO_METRICAS and metricas.esta_ativo():
+        metricas.exportar(ARQUIVO_METRICAS)
 
 if __name__ == "__main__":
-    main()
+    # Uso: python features_rg_face_ocr.py [motor_ocr]
+    main(motor=sys.argv[1] if len(sys.argv) > 1 else MOTOR_OCR)
@@ -0,0 +1,99 @@
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Limiares do gate de qualidade aplicado antes do OCR (None desativa o critério).
+# Valores conservadores: só barram imagens em que o OCR praticamente não lê nada.
+LIMIARES_PADRAO = {
+    "nitidez_blur_min": 20.0,   # variância do Laplaciano (MotionBlur/GaussianBlur fortes)
+    "brilho_min": 25.0,         # imagem quase preta
+    "brilho_max": 240.0,        # imagem estourada
+    "contraste_min": 10.0,      # desvio padrão dos tons de cinza (compressão pesada, névoa)
+    "reflexo_max": None,        # fração de pixels estourados (qualidade_imagem.reflexo_frac)
+    "sombra_max": None,         # fração de pixels escuros (qualidade_imagem.sombra_frac)
+}
+
+# Códigos de motivo gravados na coluna motivo_rejeicao
+MOTIVO_BLUR = "BLUR"
+MOTIVO_ESCURA = "ESCURA"
+MOTIVO_CLARA = "CLARA"
+MOTIVO_BAIXO_CONTRASTE = "BAIXO_CONTRASTE"
+MOTIVO_REFLEXO = "REFLEXO"
+MOTIVO_SOMBRA = "SOMBRA"
+
+
+def avaliar_qualidade(qualidade, limiares=LIMIARES_PADRAO):
+    """
+    Decide se a imagem vale o custo do OCR.
+    qualidade: dicionário de qualidade_imagem.calcular_qualidade.
+    Retorna None se aprovada ou o código do primeiro critério violado.
+    """
+    criterios = [
+        ("nitidez_blur_min", "nitidez_blur", lambda v, l: v < l, MOTIVO_BLUR),
+        ("brilho_min", "brilho_medio", lambda v, l: v < l, MOTIVO_ESCURA),
+        ("brilho_max", "brilho_medio", lambda v, l: v > l, MOTIVO_CLARA),
+        ("contraste_min", "contraste", lambda v, l: v < l, MOTIVO_BAIXO_CONTRASTE),
+        ("reflexo_max", "reflexo_frac", lambda v, l: v > l, MOTIVO_REFLEXO),
+        ("sombra_max", "sombra_frac", lambda v, l: v > l, MOTIVO_SOMBRA),
+    ]
+
+    for nome_limiar, feature, violou, motivo in criterios:
+        limiar = limiares.get(nome_limiar)
+        if limiar is not None and violou(float(qualidade[feature]), limiar):
+            return motivo
+    return None
+
+
+class EstatisticasGate:
+    """
+    Contabiliza o gate: imagens avaliadas, rejeições por motivo e tempo de OCR.
+    O tempo economizado é estimado pelo tempo médio de OCR das imagens aprovadas.
+    """
+
+    def __init__(self):
+        self.avaliadas = 0
+        self.rejeicoes = {}
+        self.imagens_ocr = 0
+        self.segundos_ocr = 0.0
+
+    def registrar(self, motivo):
+        self.avaliadas += 1
+        if motivo is not None:
+            self.rejeicoes[motivo] = self.rejeicoes.get(motivo, 0) + 1
+
+    def registrar_ocr(self, segundos, imagens=1):
+        self.segundos_ocr += segundos
+        self.imagens_ocr += imagens
+
+    @property
+    def rejeitadas(self):
+        return sum(self.rejeicoes.values())
+
+    @property
+    def taxa_rejeicao(self):
+        return self.rejeitadas / self.avaliadas if self.avaliadas else 0.0
+
+    @property
+    def segundos_economizados(self):
+        if not self.imagens_ocr:
+            return 0.0
+        return self.rejeitadas * self.segundos_ocr / self.imagens_ocr
+
+    def resumo(self):
+        return {
+            "avaliadas": self.avaliadas,
+            "rejeitadas": self.rejeitadas,
+            "taxa_rejeicao": round(self.taxa_rejeicao, 4),
+            "rejeicoes_por_motivo": dict(self.rejeicoes),
+            "segundos_ocr": round(self.segundos_ocr, 2),
+            "segundos_economizados_estimados": round(self.segundos_economizados, 2),
+        }
+
+    def imprimir_resumo(self):
+        if not self.avaliadas:
+            return
+        print(f"\nGate de qualidade: {self.rejeitadas}/{self.avaliadas} imagens rejeitadas "
+              f"({self.taxa_rejeicao:.1%}) antes do OCR")
+        for motivo, quantidade in sorted(self.rejeicoes.items()):
+            print(f"   {motivo}: {quantidade}")
+        print(f"   Tempo de OCR economizado (estimado): {self.segundos_economizados:.1f} s")
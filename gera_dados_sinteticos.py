@@ -1,11 +1,27 @@
 import csv
+import multiprocessing
+import os
 import random
+import shutil
+import sys
+import time
+import numpy as np
 from faker import Faker
 from datetime import date, timedelta
 # from unidecode import unidecode  # opcional: remova acentos se quiser
 
+from escritor_saida import abrir_escritor
+
 fake = Faker('pt_BR')
 
+# Geração em massa: registros por lote colunar e tamanho dos pools de nomes/cidades sorteados com o Faker
+TAMANHO_LOTE_MASSA = 100_000
+TAMANHO_POOL = 3000
+
+# Espaço de bases de CPF (9 dígitos) e rodadas da permutação que as torna únicas sem um set
+ESPACO_CPF = 10 ** 9
+RODADAS_PERMUTACAO = 4
+
 
 BR_STATE_ABBR = [
     "AC","AL","AP","AM","BA","CE","DF","ES","GO","MA","MT","MS","MG",
@@ -143,8 +159,16 @@ def gerar_registro(existing_cpfs: set):
 
     return registro
 
-def gerar_csv(qtd_itens, nome_arquivo="dados_fakes_identidade.csv"):
-    """Gera o CSV com os registros simulados."""
+def semear(semente):
+    """Fixa a semente do random e do Faker globais usados por gerar_registro."""
+    random.seed(semente)
+    fake.seed_instance(semente)
+
+def gerar_csv(qtd_itens, nome_arquivo="dados_fakes_identidade.csv", semente=None):
+    """Gera o CSV com os registros simulados (reprodutível se a semente for informada)."""
+    if semente is not None:
+        semear(semente)
+
     campos = [
         "nome_completo",
         "filiacao_pai",
@@ -172,6 +196,310 @@ def gerar_csv(qtd_itens, nome_arquivo="dados_fakes_identidade.csv"):
 
     print(f"{qtd_itens} registros salvos em '{nome_arquivo}'")
 
+# =========================
+# GERAÇÃO EM MASSA (VETORIZADA)
+# =========================
+
+CAMPOS = [
+    "nome_completo", "filiacao_pai", "filiacao_mae", "data_nascimento", "sexo", "naturalidade",
+    "local_tirou_cidade", "local_tirou_estado", "estado_completo", "data_emissao",
+    "validade_identidade", "orgao_emissor", "cpf"
+]
+
+# Pesos do órgão emissor (mesmos de gerar_registro)
+SUFIXOS_ORGAO = ["", "SSP", "PC"]
+PESOS_ORGAO = [0.4, 0.35, 0.25]
+
+
+def calcular_digitos_cpf(bases: np.ndarray) -> np.ndarray:
+    """
+    Versão vetorizada de calcular_digito_verificador (mesmos pesos, dígito a dígito).
+    bases: (N, 9) com os dígitos da base. Retorna (N, 11) com os dois dígitos verificadores.
+    """
+    bases = np.asarray(bases, dtype=np.int64)
+    resto = (bases @ np.arange(9, 0, -1)) % 11
+    d1 = np.where(resto < 2, 0, 11 - resto)
+    resto = (bases @ np.arange(10, 1, -1) + d1) % 11
+    d2 = np.where(resto < 2, 0, 11 - resto)
+    return np.column_stack([bases, d1, d2])
+
+
+def _feistel(valores, chaves, bits_metade=15):
+    mascara = np.uint64((1 << bits_metade) - 1)
+    esquerda = valores >> np.uint64(bits_metade)
+    direita = valores & mascara
+    for chave in chaves:
+        mistura = (direita * np.uint64(0x9E3779B1) + np.uint64(chave)) & np.uint64(0xFFFFFFFF)
+        mistura = (mistura ^ (mistura >> np.uint64(13))) & mascara
+        esquerda, direita = direita, esquerda ^ mistura
+    return (esquerda << np.uint64(bits_metade)) | direita
+
+
+def permutar_indices(indices, chaves, espaco=ESPACO_CPF):
+    """
+    Bijeção pseudoaleatória (controlada pelas chaves) de [0, espaco) nele mesmo:
+    rede de Feistel sobre 30 bits com cycle-walking para os valores que caem fora do espaço.
+    Índices distintos geram bases de CPF distintas, dispensando o set de CPFs já usados.
+    """
+    valores = _feistel(np.asarray(indices, dtype=np.uint64), chaves)
+    fora = valores >= espaco
+    while fora.any():
+        valores[fora] = _feistel(valores[fora], chaves)
+        fora = valores >= espaco
+    return valores.astype(np.int64)
+
+
+def formatar_cpfs(digitos: np.ndarray) -> np.ndarray:
+    """(N, 11) dígitos -> array de strings 'XXX.XXX.XXX-XX', montado direto nos códigos dos caracteres."""
+    caracteres = np.empty((len(digitos), 14), dtype=np.uint32)
+    caracteres[:, [0, 1, 2, 4, 5, 6, 8, 9, 10, 12, 13]] = digitos + ord("0")
+    caracteres[:, [3, 7]] = ord(".")
+    caracteres[:, 11] = ord("-")
+    return caracteres.view("<U14").ravel()
+
+
+def formatar_datas(datas: np.ndarray) -> np.ndarray:
+    """datetime64[D] -> array de strings 'dd/mm/aaaa', rearranjando os caracteres do formato ISO."""
+    iso = np.datetime_as_string(datas, unit="D").astype("<U10").view("<U1").reshape(-1, 10)
+    saida = np.empty((len(iso), 10), dtype="<U1")
+    saida[:, 0:2] = iso[:, 8:10]
+    saida[:, 3:5] = iso[:, 5:7]
+    saida[:, 6:10] = iso[:, 0:4]
+    saida[:, [2, 5]] = "/"
+    return saida.view("<U10").ravel()
+
+
+def somar_anos(datas: np.ndarray, anos: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de add_years_safe (29/02 em ano não bissexto vira datas + anos * 365 dias)."""
+    meses = datas.astype("datetime64[M]")
+    dias = (datas - meses.astype("datetime64[D]")).astype(np.int64)
+    ano_mes = meses.astype(np.int64) + 12 * anos
+    resultado = ano_mes.astype("datetime64[M]").astype("datetime64[D]") + dias
+
+    ano_novo = ano_mes // 12 + 1970
+    bissexto = (ano_novo % 4 == 0) & ((ano_novo % 100 != 0) | (ano_novo % 400 == 0))
+    invalida = (ano_mes % 12 == 1) & (dias == 28) & ~bissexto
+    resultado[invalida] = datas[invalida] + anos[invalida] * 365
+    return resultado
+
+
+def construir_pools(semente=None, tamanho=TAMANHO_POOL):
+    """Sorteia com o Faker, uma única vez, os pools de prenomes, sobrenomes e cidades."""
+    gerador = Faker('pt_BR')
+    gerador.seed_instance(semente)
+
+    def pool(funcao):
+        valores = dict.fromkeys(limpar_titulo(funcao()) for _ in range(tamanho))
+        return np.array(list(valores))
+
+    return {
+        "prenome": pool(gerador.first_name),
+        "prenome_m": pool(gerador.first_name_male),
+        "prenome_f": pool(gerador.first_name_female),
+        "sobrenome": pool(gerador.last_name),
+        "cidade": pool(gerador.city),
+    }
+
+
+def _sortear(rng, valores, n):
+    return valores[rng.integers(0, len(valores), n)]
+
+
+def _juntar(*partes):
+    resultado = partes[0]
+    for parte in partes[1:]:
+        resultado = np.char.add(resultado, parte)
+    return resultado
+
+
+def gerar_lote(rng, indices, chaves, pools, hoje=None):
+    """
+    Gera um lote de registros em colunas (dict campo -> array), com os mesmos campos e distribuições
+    de gerar_registro. indices: posições no espaço de CPFs (distintas entre lotes/execuções com as mesmas chaves).
+    """
+    n = len(indices)
+    hoje = np.datetime64(hoje or date.today(), "D")
+    estados = np.array(BR_STATE_ABBR)
+
+    # Nome completo e filiação
+    nome_completo = _juntar(_sortear(rng, pools["prenome"], n), " ", _sortear(rng, pools["sobrenome"], n))
+    filiacao_pai = _juntar(_sortear(rng, pools["prenome_m"], n), " ", _sortear(rng, pools["sobrenome"], n))
+    filiacao_mae = _juntar(_sortear(rng, pools["prenome_f"], n), " ", _sortear(rng, pools["sobrenome"], n))
+
+    # Data de nascimento: entre 1 e 90 anos
+    data_nascimento = hoje - rng.integers(365, 91 * 365, n)
+
+    sexo = np.array(["M", "F"])[rng.integers(0, 2, n)]
+
+    # Naturalidade e local de emissão
+    naturalidade = _juntar(_sortear(rng, pools["cidade"], n), " - ", _sortear(rng, estados, n))
+    cidade_emissao = _sortear(rng, pools["cidade"], n)
+    idx_estado = rng.integers(0, len(estados), n)
+    estado_emissao = estados[idx_estado]
+    estado_completo = np.array([BR_STATE_FULL[uf] for uf in BR_STATE_ABBR])[idx_estado]
+
+    # Datas: emissão e validade
+    data_emissao = hoje - rng.integers(0, 15 * 365 + 1, n)
+    validade = somar_anos(data_emissao, rng.integers(5, 11, n))
+
+    # Órgão emissor: tabela (sufixo x estado) indexada de uma vez
+    orgaos = np.array([
+        "Instituto de Identificacao" if sufixo == "" else f"Instituto de Identificacao / {sufixo} {uf}"
+        for sufixo in SUFIXOS_ORGAO for uf in BR_STATE_ABBR
+    ])
+    idx_sufixo = rng.choice(len(SUFIXOS_ORGAO), n, p=PESOS_ORGAO)
+    orgao = orgaos[idx_sufixo * len(BR_STATE_ABBR) + idx_estado]
+
+    # CPF único: base vinda da permutação dos índices
+    bases = permutar_indices(indices, chaves)
+    digitos_base = (bases[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    cpf = formatar_cpfs(calcular_digitos_cpf(digitos_base))
+
+    return {
+        "nome_completo": nome_completo,
+        "filiacao_pai": filiacao_pai,
+        "filiacao_mae": filiacao_mae,
+        "data_nascimento": formatar_datas(data_nascimento),
+        "sexo": sexo,
+        "naturalidade": naturalidade,
+        "local_tirou_cidade": cidade_emissao,
+        "local_tirou_estado": estado_emissao,
+        "estado_completo": estado_completo,
+        "data_emissao": formatar_datas(data_emissao),
+        "validade_identidade": formatar_datas(validade),
+        "orgao_emissor": orgao,
+        "cpf": cpf,
+    }
+
+
+def intervalo_shard(qtd_total, shard, total_shards):
+    """Faixa [inicio, fim) de índices de registro do shard k de N; as faixas dos N shards são disjuntas."""
+    if not 0 <= shard < total_shards:
+        raise ValueError(f"Shard {shard} fora do intervalo [0, {total_shards})")
+    return qtd_total * shard // total_shards, qtd_total * (shard + 1) // total_shards
+
+
+def caminho_shard(nome_arquivo, shard, total_shards):
+    """dados.csv -> dados.shard0003-de-0016.csv"""
+    if total_shards == 1:
+        return nome_arquivo
+    base, extensao = os.path.splitext(nome_arquivo)
+    return f"{base}.shard{shard:04d}-de-{total_shards:04d}{extensao}"
+
+
+def gerar_em_massa(qtd_itens, nome_arquivo="dados_fakes_identidade.csv", semente=None,
+                   tamanho_lote=TAMANHO_LOTE_MASSA, shard=0, total_shards=1, data_referencia=None):
+    """
+    Gera milhões de registros em lotes colunares, gravando cada lote assim que fica pronto.
+    Saída .csv (UTF-8 com BOM, como gerar_csv) ou .parquet/.arrow (pasta de partes, via escritor_saida).
+
+    Com total_shards > 1, gera só o shard `shard` dos qtd_itens registros, no arquivo de caminho_shard:
+    - a permutação dos CPFs e os pools dependem só da semente, iguais em todos os shards;
+    - cada shard recebe uma faixa disjunta de índices (CPFs distintos sem set global)
+      e o seu próprio fluxo aleatório, SeedSequence([semente, shard]).
+    Com a mesma semente e data_referencia (padrão: hoje), a saída é idêntica em qualquer máquina.
+    """
+    if qtd_itens > ESPACO_CPF:
+        raise ValueError(f"No máximo {ESPACO_CPF} CPFs distintos")
+    if semente is None:
+        if total_shards > 1:
+            raise ValueError("Geração em shards exige uma semente comum a todos eles")
+        semente = np.random.SeedSequence().entropy
+
+    chaves = np.random.default_rng(semente).integers(0, 2 ** 32, RODADAS_PERMUTACAO, dtype=np.uint64)
+    rng = np.random.default_rng(np.random.SeedSequence([semente, shard]))
+    pools = construir_pools(semente)
+    hoje = data_referencia or date.today()
+
+    primeiro_indice, ultimo_indice = intervalo_shard(qtd_itens, shard, total_shards)
+    nome_arquivo = caminho_shard(nome_arquivo, shard, total_shards)
+
+    # Saídas .parquet/.arrow são pastas de partes: sem apagá-las, as partes antigas ficariam junto das novas
+    if os.path.isdir(nome_arquivo):
+        shutil.rmtree(nome_arquivo)
+    elif os.path.isfile(nome_arquivo):
+        os.remove(nome_arquivo)
+    escritor = abrir_escritor(nome_arquivo, tamanho_grupo=tamanho_lote, encoding_csv="utf-8-sig")
+
+    inicio = time.perf_counter()
+    # Um shard vazio (mais shards que registros) ainda grava o cabeçalho / uma parte sem linhas,
+    # para toda máquina produzir o seu arquivo e mesclar_shards encontrar todos
+    primeiros = range(primeiro_indice, ultimo_indice, tamanho_lote) or [primeiro_indice]
+    for primeiro in primeiros:
+        indices = np.arange(primeiro, min(primeiro + tamanho_lote, ultimo_indice))
+        escritor.escrever_lote(gerar_lote(rng, indices, chaves, pools, hoje))
+    escritor.fechar()
+
+    quantidade = ultimo_indice - primeiro_indice
+    decorrido = time.perf_counter() - inicio
+    print(f"{quantidade} registros salvos em '{nome_arquivo}' "
+          f"({quantidade / decorrido if decorrido else 0:,.0f} registros/s)")
+    return nome_arquivo
+
+
+def mesclar_shards(arquivos, destino):
+    """
+    Junta as saídas dos shards, na ordem dada, sem reler os registros:
+    CSVs são concatenados (cabeçalho só do primeiro); pastas Parquet/Arrow têm as partes copiadas para o destino.
+    """
+    if os.path.splitext(destino)[1].lower() in (".parquet", ".arrow"):
+        os.makedirs(destino, exist_ok=True)
+        for i, pasta in enumerate(arquivos):
+            for parte in sorted(os.listdir(pasta)):
+                shutil.copyfile(os.path.join(pasta, parte), os.path.join(destino, f"shard{i:04d}-{parte}"))
+    else:
+        with open(destino, "wb") as saida:
+            for i, arquivo in enumerate(arquivos):
+                with open(arquivo, "rb") as entrada:
+                    if i > 0:
+                        entrada.readline()  # BOM + cabeçalho
+                    shutil.copyfileobj(entrada, saida)
+    print(f"{len(arquivos)} shards mesclados em '{destino}'")
+
+
+def _gerar_shard(args):
+    return gerar_em_massa(*args)
+
+
+def gerar_em_paralelo(qtd_itens, nome_arquivo="dados_fakes_identidade.csv", semente=0,
+                      total_shards=None, num_workers=None, mesclar=True, data_referencia=None):
+    """
+    Gera os shards numa pool de processos e os mescla. Com a mesma semente e data_referencia
+    (padrão: hoje), a saída é a mesma de rodar os shards em máquinas separadas.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    total_shards = total_shards or num_workers
+    hoje = data_referencia or date.today()
+
+    tarefas = [
+        (qtd_itens, nome_arquivo, semente, TAMANHO_LOTE_MASSA, shard, total_shards, hoje)
+        for shard in range(total_shards)
+    ]
+    with multiprocessing.Pool(num_workers) as pool:
+        arquivos = pool.map(_gerar_shard, tarefas)
+
+    if mesclar and total_shards > 1:
+        mesclar_shards(arquivos, nome_arquivo)
+        for arquivo in arquivos:
+            if os.path.isdir(arquivo):
+                shutil.rmtree(arquivo)
+            else:
+                os.remove(arquivo)
+    return arquivos
+
 if __name__ == "__main__":
-    qtd = int(input("Quantos registros deseja gerar? "))
-    gerar_csv(qtd)
+    if len(sys.argv) > 1:
+        # Modo em massa:
+        #   python gera_dados_sinteticos.py <quantidade> [arquivo] [semente] [shard] [total_shards] [data_referencia]
+        # Ex.: na máquina k de N, "... 50000000 dados.csv 42 k N 2026-01-31"; depois mesclar_shards junta as saídas.
+        # data_referencia (AAAA-MM-DD, padrão: hoje) fixa as datas geradas: use a mesma em todas as máquinas.
+        qtd = int(sys.argv[1])
+        arquivo = sys.argv[2] if len(sys.argv) > 2 else "dados_fakes_identidade.csv"
+        semente = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        shard = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+        total_shards = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+        data_referencia = date.fromisoformat(sys.argv[6]) if len(sys.argv) > 6 else None
+        gerar_em_massa(qtd, arquivo, semente, shard=shard, total_shards=total_shards, data_referencia=data_referencia)
+    else:
+        qtd = int(input("Quantos registros deseja gerar? "))
+        gerar_csv(qtd)
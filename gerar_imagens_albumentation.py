@@ -1,75 +1,221 @@
-import cv2
-import albumentations as A
+import json
+import multiprocessing
 import os
+import random
+import sys
+import zlib
+
+import cv2
+import numpy as np
+
+from ingestao_assincrona import listar_arquivos
 
 
-PASTA_FRENTE = "RGFRENTE"
+# Frentes já com a foto colada (saída de script_fotos)
+PASTA_FRENTE = "RGFRENTE_FOTO"
 PASTA_TRAS = "RGTRAS"
 
 PASTA_FRENTE_SAIDA = "RGFRENTE_AUG"
 PASTA_TRAS_SAIDA = "RGTRAS_AUG"
 
-os.makedirs(PASTA_FRENTE_SAIDA, exist_ok=True)
-os.makedirs(PASTA_TRAS_SAIDA, exist_ok=True)
+# Variações geradas a partir de cada imagem de entrada (decodificada uma única vez)
+VARIACOES_POR_IMAGEM = 1
 
-transformacao = A.Compose([
+# Semente base: cada saída usa uma semente derivada de (SEMENTE, nome do arquivo, variação),
+# então o resultado não depende do número de workers nem da ordem de processamento
+SEMENTE = 42
 
-    # Iluminação
-    A.RandomBrightnessContrast(
-        brightness_limit=0.25,
-        contrast_limit=0.25,
-        p=0.8
-    ),
+NUM_WORKERS = os.cpu_count() or 1
 
-    # Nitidez variável
-    A.Sharpen(alpha=(0.1, 0.3), lightness=(0.8, 1.2), p=0.3),
+# Imagens enviadas de uma vez para cada processo do pool
+TAMANHO_SHARD = 8
 
-    # Desfoque
-    A.GaussianBlur(blur_limit=(3, 7), p=0.3),
-    A.MotionBlur(blur_limit=5, p=0.3),
+# Parâmetros aplicados em cada saída (um JSON por linha), gravados dentro da pasta de saída
+ARQUIVO_PARAMETROS = "parametros_aumentacao.jsonl"
 
-    # Ruído
-    A.GaussNoise(var_limit=(5.0, 30.0), p=0.3),
+# Arrays maiores que isso (ex.: o ruído inteiro do GaussNoise) ficam registrados só pelo formato;
+# a semente gravada junto reproduz a saída exatamente
+MAX_ELEMENTOS_PARAMETRO = 64
 
-    # Rotação leve (documento levemente torto)
-    A.Rotate(limit=3, border_mode=cv2.BORDER_REPLICATE, p=0.5),
 
-    # Perspectiva
-    A.Perspective(scale=(0.03, 0.07), p=0.3),
+def criar_transformacao(replay=False):
+    """
+    Pipeline de aumentação. O albumentations só é importado aqui, então importar este módulo
+    não carrega nada; com replay=True cada chamada devolve também os parâmetros sorteados.
+    """
+    import albumentations as A
 
-    # Compressão tipo WhatsApp
-    A.ImageCompression(quality_lower=35, quality_upper=80, p=0.5),
+    classe = A.ReplayCompose if replay else A.Compose
+    return classe([
 
-    # Sombra artificial
-    A.RandomShadow(p=0.3)
-])
+        # Iluminação
+        A.RandomBrightnessContrast(
+            brightness_limit=0.25,
+            contrast_limit=0.25,
+            p=0.8
+        ),
 
-# ===== FUNÇÃO PARA PROCESSAR UMA PASTA =====
-def processar_pasta(pasta_entrada, pasta_saida):
-    arquivos = os.listdir(pasta_entrada)
+        # Nitidez variável
+        A.Sharpen(alpha=(0.1, 0.3), lightness=(0.8, 1.2), p=0.3),
+
+        # Desfoque
+        A.GaussianBlur(blur_limit=(3, 7), p=0.3),
+        A.MotionBlur(blur_limit=5, p=0.3),
+
+        # Ruído
+        A.GaussNoise(var_limit=(5.0, 30.0), p=0.3),
+
+        # Rotação leve (documento levemente torto)
+        A.Rotate(limit=3, border_mode=cv2.BORDER_REPLICATE, p=0.5),
+
+        # Perspectiva
+        A.Perspective(scale=(0.03, 0.07), p=0.3),
+
+        # Compressão tipo WhatsApp
+        A.ImageCompression(quality_lower=35, quality_upper=80, p=0.5),
+
+        # Sombra artificial
+        A.RandomShadow(p=0.3)
+    ])
+
+
+def semente_variacao(nome_arquivo, variacao, semente=SEMENTE):
+    """Semente de 32 bits da variação `variacao` do arquivo `nome_arquivo`."""
+    sequencia = np.random.SeedSequence([semente, zlib.crc32(nome_arquivo.encode("utf-8")), variacao])
+    return int(sequencia.generate_state(1)[0])
+
+
+def nome_saida(arquivo, variacao, variacoes):
+    # Com uma variação mantém o nome de sempre (aug_<arquivo>)
+    prefixo = "aug_" if variacoes == 1 else f"aug{variacao}_"
+    return prefixo + arquivo
 
-    for arquivo in arquivos:
-        caminho_arquivo = os.path.join(pasta_entrada, arquivo)
 
-        imagem = cv2.imread(caminho_arquivo)
+def _para_json(valor):
+    if isinstance(valor, np.ndarray):
+        if valor.size > MAX_ELEMENTOS_PARAMETRO:
+            return {"array": list(valor.shape)}
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, dict):
+        return {chave: _para_json(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_para_json(v) for v in valor]
+    return valor
 
-        if imagem is None:
-            print(f"⚠ Erro ao ler: {arquivo}")
-            continue
 
-        imagem_aumentada = transformacao(image=imagem)["image"]
+def parametros_aplicados(replay):
+    """Transformações efetivamente aplicadas (nome e parâmetros sorteados) a partir do replay do albumentations."""
+    aplicadas = []
+    for transformacao in replay["transforms"]:
+        if transformacao["applied"]:
+            aplicadas.append({
+                "transformacao": transformacao["__class_fullname__"].split(".")[-1],
+                "params": _para_json(transformacao["params"]),
+            })
+    return aplicadas
 
-        caminho_saida = os.path.join(pasta_saida, "aug_" + arquivo)
-        cv2.imwrite(caminho_saida, imagem_aumentada)
 
-        print(f" Gerada: {caminho_saida}")
+# Pipeline de cada processo do pool (ver _inicializar_worker)
+_transformacao = None
+
+
+def _inicializar_worker():
+    global _transformacao
+    # Cada worker já é um processo: evita que o OpenCV abra threads extras
+    cv2.setNumThreads(1)
+    _transformacao = criar_transformacao(replay=True)
+
+
+def aumentar_imagem(caminho, pasta_saida, variacoes=VARIACOES_POR_IMAGEM, semente=SEMENTE):
+    """
+    Decodifica a imagem uma vez e grava `variacoes` versões aumentadas em pasta_saida.
+    Devolve um registro (arquivo, origem, variação, semente, transformações) por saída.
+    """
+    arquivo = os.path.basename(caminho)
+    imagem = cv2.imread(caminho)
+
+    if imagem is None:
+        print(f"⚠ Erro ao ler: {arquivo}")
+        return []
+
+    registros = []
+    for variacao in range(variacoes):
+        semente_saida = semente_variacao(arquivo, variacao, semente)
+        # O albumentations sorteia via random/np.random
+        random.seed(semente_saida)
+        np.random.seed(semente_saida)
+
+        resultado = _transformacao(image=imagem)
+        nome = nome_saida(arquivo, variacao, variacoes)
+        cv2.imwrite(os.path.join(pasta_saida, nome), resultado["image"])
+
+        registros.append({
+            "arquivo": nome,
+            "origem": arquivo,
+            "variacao": variacao,
+            "semente": semente_saida,
+            "transformacoes": parametros_aplicados(resultado["replay"]),
+        })
+    return registros
+
+
+def _processar_shard(args):
+    caminhos, pasta_saida, variacoes, semente = args
+    return [registro for caminho in caminhos for registro in aumentar_imagem(caminho, pasta_saida, variacoes, semente)]
+
+
+# ===== FUNÇÃO PARA PROCESSAR UMA PASTA =====
+def processar_pasta(pasta_entrada, pasta_saida, variacoes=VARIACOES_POR_IMAGEM, num_workers=NUM_WORKERS,
+                    semente=SEMENTE):
+    """
+    Gera `variacoes` versões aumentadas de cada imagem da pasta, dividindo as imagens em
+    shards entre num_workers processos, e grava os parâmetros de cada saída em ARQUIVO_PARAMETROS.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    caminhos = [caminho for _, caminho in listar_arquivos(pasta_entrada)]
+    shards = [
+        (caminhos[i:i + TAMANHO_SHARD], pasta_saida, variacoes, semente)
+        for i in range(0, len(caminhos), TAMANHO_SHARD)
+    ]
+
+    geradas = 0
+    with open(os.path.join(pasta_saida, ARQUIVO_PARAMETROS), "w", encoding="utf-8") as f:
+        def gravar(registros):
+            nonlocal geradas
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            geradas += len(registros)
+
+        if num_workers <= 1:
+            _inicializar_worker()
+            for shard in shards:
+                gravar(_processar_shard(shard))
+        else:
+            with multiprocessing.Pool(num_workers, initializer=_inicializar_worker) as pool:
+                # imap mantém a ordem dos shards: o arquivo de parâmetros sai igual com qualquer número de workers
+                for registros in pool.imap(_processar_shard, shards):
+                    gravar(registros)
+
+    print(f" {geradas} imagens geradas em '{pasta_saida}' a partir de {len(caminhos)} de '{pasta_entrada}'")
+    return geradas
 
 
 # ===== EXECUÇÃO =====
-print("\n▶ Processando RGFRENTE...")
-processar_pasta(PASTA_FRENTE, PASTA_FRENTE_SAIDA)
+def main(variacoes=VARIACOES_POR_IMAGEM, num_workers=NUM_WORKERS):
+    print("\n▶ Processando frentes...")
+    processar_pasta(PASTA_FRENTE, PASTA_FRENTE_SAIDA, variacoes, num_workers)
+
+    print("\n▶ Processando versos...")
+    processar_pasta(PASTA_TRAS, PASTA_TRAS_SAIDA, variacoes, num_workers)
+
+    print("\n Todas as imagens de frente e trás foram aumentadas com sucesso!")
 
-print("\n▶ Processando RGTRAS...")
-processar_pasta(PASTA_TRAS, PASTA_TRAS_SAIDA)
 
-print("\n Todas as imagens de frente e trás foram aumentadas com sucesso!")
+if __name__ == "__main__":
+    # Uso: python gerar_imagens_albumentation.py [variacoes_por_imagem] [num_workers]
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else VARIACOES_POR_IMAGEM,
+        int(sys.argv[2]) if len(sys.argv) > 2 else NUM_WORKERS
+    )
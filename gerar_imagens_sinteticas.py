@@ -1,17 +1,38 @@
 import csv
 import json
+import multiprocessing
 import os
 import sys
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageFont
 
-def gerar_imagens(quantidade_imagens, imagem_frente, imagem_verso,
-                  csv_arquivo, json_frente, json_verso):
-    """
-    Gera pares de imagens (frente e trás) de identidades
-    com base em dados do CSV e posições do JSON.
-    As saídas são salvas em pastas separadas: RGFRENTE e RGTRAS.
-    """
+from cache_glifos import RenderizadorTexto
+
+# Campos desenhados em cada lado do documento
+CAMPOS_FRENTE = [
+    "nome_completo", "cpf", "sexo", "data_nascimento",
+    "naturalidade", "validade_identidade", "estado_completo"
+]
+
+CAMPOS_VERSO = [
+    "filiacao_pai",
+    "filiacao_mae",
+    "local_tirou_cidade",
+    "data_emissao",
+    "orgao_emissor"
+]
+
+# Pastas de saída separadas
+PASTA_FRENTE = "RGFRENTE"
+PASTA_TRAS = "RGTRAS"
+
+# Registros enviados de uma vez para cada processo do pool
+TAMANHO_SHARD = 64
 
+# Estado de cada processo renderizador: templates decodificados, fontes (com cache de glifos) e posições
+_renderizador = {}
+
+
+def carregar_fontes():
     try:
         fonte_bold = ImageFont.truetype("arialbd.ttf", 17)
         fonte_normal = ImageFont.truetype("arial.ttf", 17)
@@ -19,14 +40,100 @@ def gerar_imagens(quantidade_imagens, imagem_frente, imagem_verso,
         # Fontes padrão para sistemas Linux/macOS
         fonte_bold = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 17)
         fonte_normal = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 17)
+    return fonte_bold, fonte_normal
+
+
+def carregar_template(caminho_imagem):
+    """Decodifica a imagem-base uma única vez; cada registro trabalha numa cópia."""
+    template = Image.open(caminho_imagem).convert("RGB")
+    template.load()
+    return template
+
+
+def inicializar_renderizador(imagem_frente, imagem_verso, posicoes_frente, posicoes_verso):
+    """Carrega templates e fontes no processo atual (uma vez por worker do pool)."""
+    fonte_bold, fonte_normal = carregar_fontes()
+    _renderizador.update(
+        frente=carregar_template(imagem_frente),
+        verso=carregar_template(imagem_verso),
+        posicoes_frente=posicoes_frente,
+        posicoes_verso=posicoes_verso,
+        # Os glifos de cada fonte são rasterizados uma vez e reaproveitados em todos os cartões
+        fonte_bold=RenderizadorTexto(fonte_bold),
+        fonte_normal=RenderizadorTexto(fonte_normal),
+    )
+    if not _renderizador["fonte_bold"].exato or not _renderizador["fonte_normal"].exato:
+        print("AVISO: Fontes com layout raqm: o texto é desenhado sem o cache de glifos (sem ganho de velocidade).")
 
+
+def _desenhar_campos(img, dado, campos, posicoes_template, escolher_fonte):
     cor_fonte = (0, 0, 0)  # Preto (#000000)
 
-    # Pastas de saída separadas
-    pasta_frente = "RGFRENTE"
-    pasta_tras = "RGTRAS"
-    os.makedirs(pasta_frente, exist_ok=True)
-    os.makedirs(pasta_tras, exist_ok=True)
+    for campo in campos:
+        if campo in posicoes_template and campo in dado:
+            posicoes = posicoes_template[campo]
+            fonte = escolher_fonte(campo)
+
+            # Se for uma lista de listas (múltiplas posições)
+            if isinstance(posicoes[0], list):
+                for x, y in posicoes:
+                    fonte.desenhar(img, (x, y), dado[campo], cor_fonte)
+            else:
+                # Apenas uma posição
+                x, y = posicoes
+                fonte.desenhar(img, (x, y), dado[campo], cor_fonte)
+
+
+def renderizar_frente(dado):
+    """Desenha os campos da frente numa cópia do template já decodificado."""
+    img_frente = _renderizador["frente"].copy()
+    fonte_bold = _renderizador["fonte_bold"]
+    fonte_normal = _renderizador["fonte_normal"]
+
+    _desenhar_campos(
+        img_frente, dado, CAMPOS_FRENTE, _renderizador["posicoes_frente"],
+        lambda campo: fonte_normal if campo == "estado_completo" else fonte_bold
+    )
+    return img_frente
+
+
+def renderizar_verso(dado):
+    """Desenha os campos do verso numa cópia do template já decodificado."""
+    img_verso = _renderizador["verso"].copy()
+    fonte_bold = _renderizador["fonte_bold"]
+
+    _desenhar_campos(
+        img_verso, dado, CAMPOS_VERSO, _renderizador["posicoes_verso"],
+        lambda campo: fonte_bold
+    )
+    return img_verso
+
+
+def _renderizar_shard(shard):
+    """Renderiza e salva um bloco de registros [(id_item, dado), ...]."""
+    for id_item, dado in shard:
+        # ======= FRENTE =======
+        caminho_frente = os.path.join(PASTA_FRENTE, f"rg-frente_{id_item:04d}.jpg")
+        renderizar_frente(dado).save(caminho_frente, "JPEG")
+
+        # ======= TRÁS =======
+        caminho_verso = os.path.join(PASTA_TRAS, f"rg-tras_{id_item:04d}.jpg")
+        renderizar_verso(dado).save(caminho_verso, "JPEG")
+    return len(shard)
+
+
+def gerar_imagens(quantidade_imagens, imagem_frente, imagem_verso,
+                  csv_arquivo, json_frente, json_verso, num_workers=1):
+    """
+    Gera pares de imagens (frente e trás) de identidades
+    com base em dados do CSV e posições do JSON.
+    As saídas são salvas em pastas separadas: RGFRENTE e RGTRAS.
+    Os templates são decodificados uma vez por processo e os registros
+    são divididos em shards entre num_workers processos; cada arquivo depende
+    só do seu registro, então a saída é a mesma com qualquer número de workers.
+    """
+    os.makedirs(PASTA_FRENTE, exist_ok=True)
+    os.makedirs(PASTA_TRAS, exist_ok=True)
 
     # --- 1. Ler CSV ---
     with open(csv_arquivo, newline='', encoding='utf-8-sig') as f:
@@ -43,70 +150,30 @@ def gerar_imagens(quantidade_imagens, imagem_frente, imagem_verso,
     quantidade_imagens = min(quantidade_imagens, len(dados_csv))
 
     # --- 4. Gerar as imagens ---
-    for id_item, dado in enumerate(dados_csv[:quantidade_imagens], start=1):
-
-        # ======= FRENTE =======
-        img_frente = Image.open(imagem_frente).convert("RGB")
-        draw_frente = ImageDraw.Draw(img_frente)
-
-        campos_frente = [
-            "nome_completo", "cpf", "sexo", "data_nascimento",
-            "naturalidade", "validade_identidade", "estado_completo"
-        ]
-
-        for campo in campos_frente:
-            if campo in posicoes_frente and campo in dado:
-                posicoes = posicoes_frente[campo]
-
-                # Se for uma lista de listas (múltiplas posições)
-                if isinstance(posicoes[0], list):
-                    for x, y in posicoes:
-                        fonte = fonte_normal if campo == "estado_completo" else fonte_bold
-                        draw_frente.text((x, y), dado[campo], font=fonte, fill=cor_fonte)
-                else:
-                    # Apenas uma posição
-                    x, y = posicoes
-                    fonte = fonte_normal if campo == "estado_completo" else fonte_bold
-                    draw_frente.text((x, y), dado[campo], font=fonte, fill=cor_fonte)
-
-        caminho_frente = os.path.join(pasta_frente, f"rg-frente_{id_item:04d}.jpg")
-        img_frente.save(caminho_frente, "JPEG")
-
-        # ======= TRÁS =======
-        img_verso = Image.open(imagem_verso).convert("RGB")
-        draw_verso = ImageDraw.Draw(img_verso)
-
-        campos_verso = [
-            "filiacao_pai",
-            "filiacao_mae",
-            "local_tirou_cidade",
-            "data_emissao",
-            "orgao_emissor"
-        ]
-
-        for campo in campos_verso:
-            if campo in posicoes_verso and campo in dado:
-                posicoes = posicoes_verso[campo]
-
-                if isinstance(posicoes[0], list):
-                    for x, y in posicoes:
-                        draw_verso.text((x, y), dado[campo], font=fonte_bold, fill=cor_fonte)
-                else:
-                    x, y = posicoes
-                    draw_verso.text((x, y), dado[campo], font=fonte_bold, fill=cor_fonte)
+    registros = list(enumerate(dados_csv[:quantidade_imagens], start=1))
+    shards = [registros[i:i + TAMANHO_SHARD] for i in range(0, len(registros), TAMANHO_SHARD)]
+    args_inicializacao = (imagem_frente, imagem_verso, posicoes_frente, posicoes_verso)
 
-        caminho_verso = os.path.join(pasta_tras, f"rg-tras_{id_item:04d}.jpg")
-        img_verso.save(caminho_verso, "JPEG")
+    if num_workers <= 1:
+        inicializar_renderizador(*args_inicializacao)
+        for shard in shards:
+            _renderizar_shard(shard)
+    else:
+        with multiprocessing.Pool(num_workers, initializer=inicializar_renderizador,
+                                  initargs=args_inicializacao) as pool:
+            for _ in pool.imap_unordered(_renderizar_shard, shards):
+                pass
 
-    print(f"{quantidade_imagens} frentes salvas em '{pasta_frente}' e {quantidade_imagens} versos em '{pasta_tras}'.")
+    print(f"{quantidade_imagens} frentes salvas em '{PASTA_FRENTE}' e {quantidade_imagens} versos em '{PASTA_TRAS}'.")
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python gera_dados_sinteticos.py <quantidade_imagens>")
+        print("Uso: python gera_dados_sinteticos.py <quantidade_imagens> [num_workers]")
         sys.exit(1)
 
     quantidade_imagens = int(sys.argv[1])
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
 
     gerar_imagens(
         quantidade_imagens=quantidade_imagens,
@@ -114,7 +181,8 @@ def main():
         imagem_verso="rg_atras.png",
         csv_arquivo="dados_fakes_identidade.csv",
         json_frente="posicoes_frente.json",
-        json_verso="posicoes_atras.json"
+        json_verso="posicoes_atras.json",
+        num_workers=num_workers
     )
 
 
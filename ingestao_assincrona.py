@@ -0,0 +1,154 @@
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import metricas
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+EXTENSOES_IMAGEM = (".png", ".jpg", ".jpeg", ".webp")
+
+# Leituras de arquivo em andamento ao mesmo tempo (em compartilhamento de rede a latência
+# de cada open/read domina, então muitas leituras simultâneas escondem essa espera)
+MAX_LEITURAS_SIMULTANEAS = 32
+THREADS_DECODIFICACAO = 4
+
+# Itens prontos aguardando o consumidor; com a fila cheia a leitura para até ele liberar espaço
+TAMANHO_FILA = 64
+
+_FIM = object()
+
+
+def listar_arquivos(pasta, extensoes=EXTENSOES_IMAGEM):
+    """
+    Lista (nome, caminho) dos arquivos da pasta com as extensões dadas, ordenados pelo nome.
+    Usa os.scandir: o tipo de cada entrada vem da própria listagem, sem um stat por arquivo.
+    """
+    with os.scandir(pasta) as entradas:
+        arquivos = [(e.name, e.path) for e in entradas if e.name.lower().endswith(extensoes) and e.is_file()]
+    arquivos.sort()
+    return arquivos
+
+
+def ler_arquivo(caminho):
+    with metricas.medir("leitura"):
+        with open(caminho, "rb") as f:
+            return f.read()
+
+
+def decodificar_bytes(conteudo):
+    """cv2.imdecode dos bytes do arquivo; None se não for uma imagem válida (como cv2.imread)."""
+    with metricas.medir("decodificacao"):
+        return cv2.imdecode(np.frombuffer(conteudo, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _colocar(saida, valor, parar):
+    # put bloqueante que desiste se o consumidor já encerrou
+    while not parar.is_set():
+        try:
+            saida.put(valor, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+async def _produzir(itens, caminho_de, ler, decodificar, saida, parar, max_leituras, num_threads, ordenado):
+    loop = asyncio.get_running_loop()
+    semaforo = asyncio.Semaphore(max_leituras)
+    tarefas = set()
+
+    # Uma thread por leitura em andamento (o asyncio não tem leitura de arquivo assíncrona);
+    # as mesmas threads fazem o put bloqueante na fila, então a decodificação nunca fica parada
+    with ThreadPoolExecutor(max_workers=max_leituras) as executor_leitura, \
+            ThreadPoolExecutor(max_workers=num_threads) as executor_decodificacao:
+
+        async def carregar(item):
+            try:
+                dados = await loop.run_in_executor(executor_leitura, ler, caminho_de(item))
+                if decodificar:
+                    dados = await loop.run_in_executor(executor_decodificacao, decodificar_bytes, dados)
+                return item, dados, None
+            except Exception as e:
+                # Falha de leitura vira erro do item (nunca some em silêncio)
+                return item, None, f"{type(e).__name__}: {e}"
+
+        async def processar(item, anterior):
+            try:
+                valor = await carregar(item)
+                # Em ordem, o item só entra na fila depois do anterior; como o semáforo só é liberado
+                # aqui, no máximo max_leituras itens ficam entre o início da leitura e a fila
+                if anterior is not None:
+                    await asyncio.wait([anterior])
+                await loop.run_in_executor(executor_leitura, _colocar, saida, valor, parar)
+            finally:
+                semaforo.release()
+
+        anterior = None
+        try:
+            for item in itens:
+                # O semáforo limita leituras + decodificações + itens esperando vaga na fila
+                await semaforo.acquire()
+                if parar.is_set():
+                    semaforo.release()
+                    break
+                tarefa = asyncio.create_task(processar(item, anterior if ordenado else None))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+                anterior = tarefa
+        finally:
+            # Mesmo se a iteração dos itens falhar, as leituras em andamento terminam antes dos executores
+            if tarefas:
+                await asyncio.gather(*tarefas, return_exceptions=True)
+
+
+def carregar_assincrono(itens, caminho_de=lambda item: item, ler=ler_arquivo, decodificar=True,
+                        max_leituras=MAX_LEITURAS_SIMULTANEAS, num_threads=THREADS_DECODIFICACAO,
+                        tamanho_fila=TAMANHO_FILA, ordenado=True):
+    """
+    Lê os arquivos dos itens com até max_leituras leituras simultâneas (num loop asyncio em
+    uma thread própria), decodifica em um pool de num_threads threads e devolve tuplas
+    (item, dados, erro) através de uma fila limitada.
+
+    Com ordenado=True (padrão) as tuplas saem na ordem dos itens de entrada, para a saída do
+    extrator ser a mesma a cada execução: leituras que terminam antes esperam a vez, e no máximo
+    max_leituras itens ficam retidos. Com ordenado=False saem na ordem em que ficam prontas.
+
+    dados é a imagem BGR decodificada (None se ilegível) ou, com decodificar=False, os bytes
+    do arquivo; erro é a mensagem da falha na leitura (dados=None nesse caso).
+    ler recebe o caminho e devolve os bytes (ex.: shards_imagens.ler_conteudo para datasets em shards).
+    Assim a latência do disco/rede se sobrepõe ao processamento feito pelo consumidor.
+    """
+    saida = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+    falha = []
+
+    def executar():
+        try:
+            asyncio.run(_produzir(itens, caminho_de, ler, decodificar, saida, parar, max_leituras, num_threads, ordenado))
+        except BaseException as e:
+            falha.append(e)
+        finally:
+            _colocar(saida, _FIM, parar)
+
+    thread = threading.Thread(target=executar, daemon=True)
+    thread.start()
+    try:
+        while True:
+            # Tempo que o consumidor ficou parado esperando a ingestão (0 se ela deu conta)
+            with metricas.medir("espera_ingestao"):
+                valor = saida.get()
+            if valor is _FIM:
+                break
+            yield valor
+    finally:
+        parar.set()
+        thread.join()
+
+    if falha:
+        raise falha[0]
@@ -0,0 +1,125 @@
+import csv
+import hashlib
+import os
+
+from shards_imagens import info_registro
+
+CAMPOS_MANIFESTO = ["caminho", "tamanho", "mtime_ns", "hash"]
+
+# Quantidade padrão de imagens processadas entre dois checkpoints
+# (saídas Parquet/Arrow arredondam para um múltiplo do grupo: ver escritor_saida.intervalo_checkpoint)
+CHECKPOINT_A_CADA = 500
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """Hash do conteúdo do arquivo em disco."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class Manifesto:
+    """
+    Registro dos arquivos já processados (caminho, tamanho, mtime, hash), gravado em CSV
+    apenas por acréscimo: se um caminho aparecer mais de uma vez, vale a última linha.
+    Permite pular o que já foi extraído e retomar uma execução interrompida.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.entradas = {}
+        self.pendentes = []
+        # Caminhos já processados antes cujo conteúdo mudou: a linha antiga deles na saída
+        # deve ser removida no fim da execução (ver escritor_saida.remover_linhas_substituidas)
+        self.substituidos = set()
+
+        if os.path.exists(caminho):
+            with open(caminho, newline="", encoding="utf-8") as f:
+                for linha in csv.DictReader(f):
+                    self.entradas[linha["caminho"]] = linha
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def precisa_processar(self, caminho):
+        """
+        True se o arquivo é novo ou mudou desde o último processamento.
+        Tamanho e mtime iguais bastam; se só o mtime mudou, o hash decide.
+        Imagens dentro de shards (caminho virtual) são comparadas pelo hash gravado no índice.
+        """
+        entrada = self.entradas.get(caminho)
+        if entrada is None:
+            return True
+
+        registro = info_registro(caminho)
+        if registro is not None:
+            if registro["hash"] == entrada["hash"]:
+                return False
+            self.substituidos.add(caminho)
+            return True
+
+        info = os.stat(caminho)
+        if int(entrada["tamanho"]) != info.st_size:
+            self.substituidos.add(caminho)
+            return True
+        if int(entrada["mtime_ns"]) == info.st_mtime_ns:
+            return False
+
+        hash_atual = hash_arquivo(caminho)
+        if hash_atual != entrada["hash"]:
+            self.substituidos.add(caminho)
+            return True
+
+        # Conteúdo igual com mtime novo (ex.: arquivo copiado): só atualiza o registro
+        self.registrar(caminho, hash_atual)
+        return False
+
+    def registrar(self, caminho, hash_conteudo=None):
+        """Marca o arquivo como processado; só vai para o disco no próximo salvar()."""
+        registro = info_registro(caminho)
+        if registro is not None:
+            # Imagem dentro de um shard: tamanho e hash já estão no índice
+            entrada = {"caminho": caminho, "tamanho": registro["tamanho"], "mtime_ns": 0, "hash": registro["hash"]}
+        else:
+            info = os.stat(caminho)
+            entrada = {
+                "caminho": caminho,
+                "tamanho": info.st_size,
+                "mtime_ns": info.st_mtime_ns,
+                "hash": hash_conteudo or hash_arquivo(caminho),
+            }
+        self.entradas[caminho] = entrada
+        self.pendentes.append(entrada)
+
+    def salvar(self):
+        """Acrescenta as entradas pendentes ao arquivo do manifesto."""
+        if not self.pendentes:
+            return
+
+        novo = not os.path.exists(self.caminho)
+        with open(self.caminho, "a", newline="", encoding="utf-8") as f:
+            escritor = csv.DictWriter(f, fieldnames=CAMPOS_MANIFESTO)
+            if novo:
+                escritor.writeheader()
+            escritor.writerows(self.pendentes)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.pendentes = []
+
+
+def caminho_manifesto(caminho_saida):
+    """Manifesto associado a uma saída (CSV, pasta Parquet ou pasta Arrow)."""
+    return f"{os.path.normpath(caminho_saida)}.manifesto.csv"
+
+
+def salvar_checkpoint(escritor, manifesto):
+    """
+    Grava as linhas acumuladas no escritor e depois o manifesto.
+    Nessa ordem, uma queda entre as duas etapas só pode gerar linhas repetidas
+    (o arquivo é reprocessado), nunca perder linhas já extraídas.
+    """
+    escritor.checkpoint()
+    manifesto.salvar()
@@ -0,0 +1,197 @@
+import bisect
+import json
+import threading
+import time
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Bordas (ms) dos buckets dos histogramas: progressão geométrica (25% por bucket) de 0,05 ms a ~4 min,
+# então os percentis estimados têm erro relativo de no máximo 25%
+BORDAS_MS = [round(0.05 * 1.25 ** i, 4) for i in range(70)]
+
+# Desligado por padrão: medir() e contar() não fazem nada até ativar() ser chamado
+_ativo = False
+_histogramas = {}
+_contadores = {}
+_trava = threading.Lock()
+
+
+class Histograma:
+    """Tempos de uma etapa agregados em buckets fixos (não guarda as amostras)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BORDAS_MS) + 1)
+        self.quantidade = 0
+        self.soma_ms = 0.0
+        self.minimo_ms = float("inf")
+        self.maximo_ms = 0.0
+
+    def registrar(self, ms):
+        self.buckets[bisect.bisect_left(BORDAS_MS, ms)] += 1
+        self.quantidade += 1
+        self.soma_ms += ms
+        self.minimo_ms = min(self.minimo_ms, ms)
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def percentil(self, p):
+        """Borda superior do bucket que contém o percentil p (0-100), limitada ao máximo observado."""
+        if not self.quantidade:
+            return 0.0
+        alvo = p / 100 * self.quantidade
+        acumulado = 0
+        for i, contagem in enumerate(self.buckets):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                borda = BORDAS_MS[i] if i < len(BORDAS_MS) else self.maximo_ms
+                return min(max(borda, self.minimo_ms), self.maximo_ms)
+        return self.maximo_ms
+
+    def para_dict(self):
+        return {
+            "buckets": list(self.buckets),
+            "quantidade": self.quantidade,
+            "soma_ms": self.soma_ms,
+            "minimo_ms": self.minimo_ms,
+            "maximo_ms": self.maximo_ms,
+        }
+
+    def mesclar(self, dados):
+        self.buckets = [a + b for a, b in zip(self.buckets, dados["buckets"])]
+        self.quantidade += dados["quantidade"]
+        self.soma_ms += dados["soma_ms"]
+        self.minimo_ms = min(self.minimo_ms, dados["minimo_ms"])
+        self.maximo_ms = max(self.maximo_ms, dados["maximo_ms"])
+
+
+def ativar(ativo=True):
+    global _ativo
+    _ativo = ativo
+
+
+def esta_ativo():
+    return _ativo
+
+
+def registrar_tempo(etapa, segundos):
+    if not _ativo:
+        return
+    with _trava:
+        if etapa not in _histogramas:
+            _histogramas[etapa] = Histograma()
+        _histogramas[etapa].registrar(segundos * 1000)
+
+
+def contar(nome, quantidade=1):
+    if not _ativo:
+        return
+    with _trava:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+class _Cronometro:
+    __slots__ = ("etapa", "inicio")
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        registrar_tempo(self.etapa, time.perf_counter() - self.inicio)
+
+
+class _CronometroNulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return None
+
+
+_CRONOMETRO_NULO = _CronometroNulo()
+
+
+def medir(etapa):
+    """
+    Uso: `with metricas.medir("ocr"): ...`
+    Desativado, devolve um objeto vazio compartilhado (custo de uma chamada de função).
+    """
+    return _Cronometro(etapa) if _ativo else _CRONOMETRO_NULO
+
+
+def coletar():
+    """Retira as métricas acumuladas no processo (para enviar de um worker ao processo principal)."""
+    if not _ativo:
+        return None
+    with _trava:
+        dados = {
+            "histogramas": {etapa: h.para_dict() for etapa, h in _histogramas.items()},
+            "contadores": dict(_contadores),
+        }
+        _histogramas.clear()
+        _contadores.clear()
+    return dados
+
+
+def mesclar(dados):
+    """Soma ao processo atual as métricas coletadas em outro processo."""
+    if not dados:
+        return
+    with _trava:
+        for etapa, h in dados["histogramas"].items():
+            _histogramas.setdefault(etapa, Histograma()).mesclar(h)
+        for nome, quantidade in dados["contadores"].items():
+            _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def reiniciar():
+    with _trava:
+        _histogramas.clear()
+        _contadores.clear()
+
+
+def resumo():
+    with _trava:
+        etapas = {
+            etapa: {
+                "quantidade": h.quantidade,
+                "total_s": round(h.soma_ms / 1000, 3),
+                "media_ms": round(h.soma_ms / h.quantidade, 3),
+                "p50_ms": round(h.percentil(50), 3),
+                "p95_ms": round(h.percentil(95), 3),
+                "max_ms": round(h.maximo_ms, 3),
+            }
+            for etapa, h in _histogramas.items() if h.quantidade
+        }
+        return {"etapas": etapas, "contadores": dict(_contadores)}
+
+
+def imprimir_resumo():
+    """
+    Tabela das etapas ordenadas pelo tempo total gasto. As etapas podem ser aninhadas
+    (ex.: "ocr" dentro de "documento"), então a fração é relativa à etapa mais longa.
+    """
+    dados = resumo()
+    if not dados["etapas"] and not dados["contadores"]:
+        return
+
+    total = max((e["total_s"] for e in dados["etapas"].values()), default=0.0) or 1.0
+    print("\nMétricas por etapa (% do tempo da etapa mais longa):")
+    for etapa, e in sorted(dados["etapas"].items(), key=lambda item: -item[1]["total_s"]):
+        print(f"   {etapa:>16}: {e['quantidade']:7d}x | total {e['total_s']:9.2f} s ({e['total_s'] / total:6.1%}) | "
+              f"média {e['media_ms']:8.2f} ms | p50 {e['p50_ms']:8.2f} ms | p95 {e['p95_ms']:8.2f} ms")
+    for nome, quantidade in sorted(dados["contadores"].items()):
+        print(f"   {nome}: {quantidade}")
+
+
+def exportar(caminho):
+    """Grava o resumo e os histogramas completos (bordas + contagens) em JSON."""
+    with _trava:
+        histogramas = {etapa: h.para_dict() for etapa, h in _histogramas.items()}
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({**resumo(), "bordas_ms": BORDAS_MS, "histogramas": histogramas}, f, indent=2)
+    print(f"Métricas salvas em '{caminho}'")
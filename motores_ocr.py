@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import metricas
+from cache_ocr import gerar_chave, hash_imagem
+
+# =========================
+# MOTORES DE OCR
+# =========================
+# Interface comum: reconhecer_lote(imgs) devolve, por imagem, uma tupla (linhas, caixas, confiancas).
+# O modelo só é importado/carregado na primeira imagem, então escolher um motor não custa nada
+# até ele ser usado (e importar um extrator não carrega o PaddleOCR à toa).
+
+
+class MotorOCR(ABC):
+    nome = None
+    idioma_padrao = None
+
+    # Resultados deste motor vão para o cache em disco
+    usa_cache = True
+
+    # O motor trabalha em tons de cinza: recebe a versão cinza já calculada do documento (ver contexto_imagem.py)
+    entrada_cinza = False
+
+    def __init__(self, idioma=None, **parametros):
+        self.idioma = idioma or self.idioma_padrao
+        self.parametros = parametros
+        self._modelo = None
+
+    @property
+    def modelo(self):
+        if self._modelo is None:
+            self._modelo = self._carregar()
+        return self._modelo
+
+    def _carregar(self):
+        return None
+
+    @abstractmethod
+    def reconhecer(self, img):
+        """(linhas, caixas, confiancas) de uma imagem."""
+
+    def reconhecer_lote(self, imgs):
+        return [self.reconhecer(img) for img in imgs]
+
+    def chave_cache(self, img):
+        return gerar_chave(hash_imagem(img), self.nome, self.idioma, self.parametros)
+
+
+class MotorTesseract(MotorOCR):
+    """pytesseract.image_to_string; as linhas são o texto quebrado em '\\n' (sem caixas/confianças)."""
+
+    nome = "tesseract"
+    idioma_padrao = "por"
+
+    # O Tesseract binariza sobre a luminância; em cinza ele não converte de novo e o PNG temporário
+    # do pytesseract tem um canal em vez de três
+    entrada_cinza = True
+
+    def __init__(self, idioma=None, config=""):
+        super().__init__(idioma, config=config)
+
+    def _carregar(self):
+        import pytesseract
+        return pytesseract
+
+    def reconhecer(self, img):
+        texto = self.modelo.image_to_string(img, lang=self.idioma, config=self.parametros["config"])
+        return texto.split("\n"), [], []
+
+
+def _interpretar_bloco(bloco):
+    """Separa linhas, caixas e confianças do resultado de uma imagem."""
+    linhas, caixas, confiancas = [], [], []
+
+    # Estrutura retornada:
+    # [[ [coords], (texto, confianca) ], ...]
+    for item in bloco:
+        linhas.append(item[1][0])
+        caixas.append(np.asarray(item[0]).tolist())
+        confiancas.append(float(item[1][1]))
+
+    return linhas, caixas, confiancas
+
+
+class MotorPaddleOCR(MotorOCR):
+    """PaddleOCR com uma única chamada a predict por lote."""
+
+    nome = "paddleocr"
+    idioma_padrao = "pt"
+
+    def _carregar(self):
+        from paddleocr import PaddleOCR
+        return PaddleOCR(lang=self.idioma, **self.parametros)
+
+    def reconhecer(self, img):
+        return self.reconhecer_lote([img])[0]
+
+    def reconhecer_lote(self, imgs):
+        # Um bloco de resultado por imagem, na ordem de entrada
+        return [_interpretar_bloco(bloco) for bloco in self.modelo.predict(list(imgs))]
+
+
+class MotorNulo(MotorOCR):
+    """Não roda OCR: devolve sempre o mesmo texto (vazio por padrão). Para testes e para medir o resto do pipeline."""
+
+    nome = "nulo"
+    usa_cache = False
+
+    def __init__(self, idioma=None, texto=""):
+        super().__init__(idioma, texto=texto)
+
+    def reconhecer(self, img):
+        texto = self.parametros["texto"]
+        return (texto.split("\n") if texto else []), [], []
+
+
+MOTORES = {
+    MotorTesseract.nome: MotorTesseract,
+    MotorPaddleOCR.nome: MotorPaddleOCR,
+    MotorNulo.nome: MotorNulo,
+}
+
+
+def criar_motor(nome, **opcoes):
+    """Instancia o motor pelo nome ("tesseract", "paddleocr" ou "nulo"); o modelo só carrega no primeiro uso."""
+    if nome not in MOTORES:
+        raise ValueError(f"Motor de OCR desconhecido: {nome} (opções: {', '.join(MOTORES)})")
+    return MOTORES[nome](**opcoes)
+
+
+def reconhecer_com_cache(motor, imgs, cache=None):
+    """
+    Roda o motor numa lista de imagens e devolve, na mesma ordem, (linhas, caixas, confiancas) por imagem.
+    Imagens já presentes no cache em disco não são enviadas ao motor; as faltantes vão num único lote.
+    """
+    resultados = [None] * len(imgs)
+    chaves = [None] * len(imgs)
+    faltantes = []
+
+    for i, img in enumerate(imgs):
+        if cache is not None and motor.usa_cache:
+            chaves[i] = motor.chave_cache(img)
+            em_cache = cache.obter(chaves[i])
+            if em_cache is not None:
+                linhas = em_cache["texto"].split("\n") if em_cache["texto"] else []
+                resultados[i] = (linhas, em_cache["caixas"], em_cache["confiancas"])
+                metricas.contar("ocr_cache_acertos")
+                continue
+        faltantes.append(i)
+
+    if faltantes:
+        metricas.contar(f"ocr_imagens_{motor.nome}", len(faltantes))
+        with metricas.medir(f"ocr_motor_{motor.nome}"):
+            reconhecidos = motor.reconhecer_lote([imgs[i] for i in faltantes])
+        for i, resultado in zip(faltantes, reconhecidos):
+            resultados[i] = resultado
+            if chaves[i] is not None:
+                linhas, caixas, confiancas = resultado
+                cache.salvar(chaves[i], "\n".join(linhas), caixas, confiancas)
+
+    return resultados
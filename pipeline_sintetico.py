@@ -0,0 +1,218 @@
+import csv
+import json
+import multiprocessing
+import os
+import random
+import sys
+
+import cv2
+import numpy as np
+
+import gerar_imagens_sinteticas as renderizador
+import script_fotos
+from shards_imagens import EscritorShards, remover_partes
+from gerar_imagens_albumentation import PASTA_FRENTE_SAIDA, PASTA_TRAS_SAIDA, criar_transformacao, nome_saida
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Formato ("jpg", "png" ou "webp") e qualidade (jpg/webp) da única codificação de cada saída
+FORMATO_SAIDA = "jpg"
+QUALIDADE_SAIDA = 95
+
+# Variações aumentadas geradas por registro (a partir do mesmo card renderizado em memória)
+VARIACOES_POR_REGISTRO = 1
+
+# Também grava o card limpo (sem aumentação) em RGFRENTE/RGTRAS
+SALVAR_ORIGINAL = False
+
+# Semente base: o registro i usa SEMENTE + i, então a saída não depende do número de workers
+SEMENTE = 42
+
+TAMANHO_SHARD = 32
+
+# Pasta de um dataset em shards (ver shards_imagens) para as variações aumentadas;
+# None grava um arquivo por imagem em RGFRENTE_AUG/RGTRAS_AUG
+PASTA_SHARDS = None
+
+# Rótulo gravado no índice dos shards para cada lado (mesmos tipos de features_rg_face_ocr.PASTAS)
+ROTULOS = {"frente": "RG_FRENTE", "verso": "RG_VERSO"}
+
+# Pools de fotos já redimensionadas e pipeline de aumentação, criados uma vez por worker
+_pools_fotos = {}
+_transformacao = None
+
+
+def _carregar_pools_fotos():
+    return {"M": script_fotos.PoolFotos(script_fotos.PASTA_MASCULINO),
+            "F": script_fotos.PoolFotos(script_fotos.PASTA_FEMININO)}
+
+
+def _inicializar_worker(imagem_frente, imagem_verso, posicoes_frente, posicoes_verso, usar_fotos):
+    global _transformacao
+    renderizador.inicializar_renderizador(imagem_frente, imagem_verso, posicoes_frente, posicoes_verso)
+    _transformacao = criar_transformacao()
+    _pools_fotos.clear()
+    if usar_fotos:
+        _pools_fotos.update(_carregar_pools_fotos())
+
+
+def codificar(img_bgr, formato=FORMATO_SAIDA, qualidade=QUALIDADE_SAIDA):
+    parametros = []
+    if formato == "jpg":
+        parametros = [cv2.IMWRITE_JPEG_QUALITY, qualidade]
+    elif formato == "webp":
+        parametros = [cv2.IMWRITE_WEBP_QUALITY, qualidade]
+
+    ok, buffer = cv2.imencode(f".{formato}", img_bgr, parametros)
+    if not ok:
+        raise ValueError(f"Falha ao codificar a imagem em {formato}")
+    return buffer
+
+
+def _gravar(caminho, img_bgr, formato, qualidade):
+    with open(caminho, "wb") as f:
+        f.write(codificar(img_bgr, formato, qualidade).tobytes())
+
+
+def _pil_para_bgr(img):
+    return cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)
+
+
+def processar_registro(id_item, dado, foto, variacoes, formato, qualidade, salvar_original, em_memoria=False):
+    """
+    render -> cola a foto -> N aumentações, tudo em memória; cada saída é codificada uma única vez.
+    foto: ("F" ou "M", índice no pool de fotos) ou None para o card sem foto.
+    Com em_memoria=True as aumentações não vão para o disco: devolve (rótulo, lado, nome, bytes) de cada uma.
+    """
+    # Semente própria do registro (albumentations sorteia via random/np.random)
+    random.seed(SEMENTE + id_item)
+    np.random.seed((SEMENTE + id_item) % 2 ** 32)
+
+    frente = renderizador.renderizar_frente(dado)
+    if foto is not None:
+        sexo, indice_foto = foto
+        script_fotos.colar_foto(frente, _pools_fotos[sexo][indice_foto])
+
+    cards = {
+        "frente": (_pil_para_bgr(frente), f"rg-frente_{id_item:04d}", renderizador.PASTA_FRENTE, PASTA_FRENTE_SAIDA),
+        "verso": (_pil_para_bgr(renderizador.renderizar_verso(dado)), f"rg-tras_{id_item:04d}",
+                  renderizador.PASTA_TRAS, PASTA_TRAS_SAIDA),
+    }
+
+    saidas = []
+    for lado, (card_bgr, nome, pasta_original, pasta_aug) in cards.items():
+        if salvar_original:
+            _gravar(os.path.join(pasta_original, f"{nome}.{formato}"), card_bgr, formato, qualidade)
+
+        for k in range(variacoes):
+            aumentada = _transformacao(image=card_bgr)["image"]
+            nome_aumentada = nome_saida(f"{nome}.{formato}", k, variacoes)
+            if em_memoria:
+                saidas.append((ROTULOS[lado], lado, nome_aumentada, codificar(aumentada, formato, qualidade).tobytes()))
+            else:
+                _gravar(os.path.join(pasta_aug, nome_aumentada), aumentada, formato, qualidade)
+    return saidas
+
+
+def _processar_shard(args):
+    shard, variacoes, formato, qualidade, salvar_original, em_memoria = args
+    saidas = []
+    for id_item, dado, foto in shard:
+        saidas += processar_registro(id_item, dado, foto, variacoes, formato, qualidade, salvar_original, em_memoria)
+    return saidas
+
+
+def executar_pipeline(quantidade, imagem_frente="rg_frente.png", imagem_verso="rg_atras.png",
+                      csv_arquivo="dados_fakes_identidade.csv",
+                      json_frente="posicoes_frente.json", json_verso="posicoes_atras.json",
+                      variacoes=VARIACOES_POR_REGISTRO, num_workers=1,
+                      formato=FORMATO_SAIDA, qualidade=QUALIDADE_SAIDA, salvar_original=SALVAR_ORIGINAL,
+                      pasta_shards=PASTA_SHARDS):
+    """
+    Substitui a sequência gerar_imagens_sinteticas -> script_fotos -> gerar_imagens_albumentation
+    por uma única etapa em streaming: nenhum card é regravado e relido do disco no meio do caminho.
+    Com pasta_shards, as variações aumentadas vão para um dataset em shards gravado pelo processo
+    principal, na ordem dos registros (o mesmo conteúdo com qualquer número de workers).
+    Como no modo de arquivos soltos, uma nova execução substitui o dataset anterior da pasta.
+    """
+    with open(csv_arquivo, newline='', encoding='utf-8-sig') as f:
+        dados = list(csv.DictReader(f))[:quantidade]
+
+    with open(json_frente, encoding='utf-8') as f:
+        posicoes_frente = json.load(f)
+    with open(json_verso, encoding='utf-8') as f:
+        posicoes_verso = json.load(f)
+
+    # Só a contagem das pastas aqui; cada worker carrega o próprio pool de fotos redimensionadas
+    quantidade_m = len(script_fotos.carregar_fotos(script_fotos.PASTA_MASCULINO)) if os.path.isdir(script_fotos.PASTA_MASCULINO) else 0
+    quantidade_f = len(script_fotos.carregar_fotos(script_fotos.PASTA_FEMININO)) if os.path.isdir(script_fotos.PASTA_FEMININO) else 0
+    usar_fotos = bool(quantidade_m and quantidade_f)
+    if usar_fotos:
+        fotos = script_fotos.atribuir_fotos(dados, quantidade_m, quantidade_f)
+    else:
+        print(" As pastas faces_m ou faces_f estão vazias: cards sem foto.")
+        fotos = [None] * len(dados)
+
+    em_memoria = pasta_shards is not None
+    pastas = [] if em_memoria else [PASTA_FRENTE_SAIDA, PASTA_TRAS_SAIDA]
+    if salvar_original:
+        pastas += [renderizador.PASTA_FRENTE, renderizador.PASTA_TRAS]
+    for pasta in pastas:
+        os.makedirs(pasta, exist_ok=True)
+
+    registros = [(i, dado, foto) for i, (dado, foto) in enumerate(zip(dados, fotos), start=1)]
+    shards = [
+        (registros[i:i + TAMANHO_SHARD], variacoes, formato, qualidade, salvar_original, em_memoria)
+        for i in range(0, len(registros), TAMANHO_SHARD)
+    ]
+    args_inicializacao = (imagem_frente, imagem_verso, posicoes_frente, posicoes_verso, usar_fotos)
+
+    escritor = None
+    if em_memoria:
+        removidos = remover_partes(pasta_shards) if os.path.isdir(pasta_shards) else 0
+        if removidos:
+            print(f"{removidos} arquivo(s) de shards anteriores removidos de '{pasta_shards}'.")
+        escritor = EscritorShards(pasta_shards)
+
+    def gravar(saidas):
+        for rotulo, lado, nome, conteudo in saidas:
+            escritor.adicionar(conteudo, rotulo, nome, lado)
+
+    if num_workers <= 1:
+        _inicializar_worker(*args_inicializacao)
+        for shard in shards:
+            gravar(_processar_shard(shard))
+    else:
+        with multiprocessing.Pool(num_workers, initializer=_inicializar_worker,
+                                  initargs=args_inicializacao) as pool:
+            # Com shards a ordem importa (imap); com arquivos soltos cada shard é independente
+            mapear = pool.imap if em_memoria else pool.imap_unordered
+            for saidas in mapear(_processar_shard, shards):
+                gravar(saidas)
+
+    if em_memoria:
+        escritor.fechar()
+        print(f"{len(registros)} registros processados: {escritor.total} imagens em {escritor.partes_gravadas} parte(s) "
+              f"de shards em '{pasta_shards}'.")
+    else:
+        print(f"{len(registros)} registros processados: {len(registros) * variacoes} frentes em "
+              f"'{PASTA_FRENTE_SAIDA}' e {len(registros) * variacoes} versos em '{PASTA_TRAS_SAIDA}'.")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python pipeline_sintetico.py <quantidade> [variacoes_por_registro] [num_workers] [pasta_shards]")
+        sys.exit(1)
+
+    quantidade = int(sys.argv[1])
+    variacoes = int(sys.argv[2]) if len(sys.argv) > 2 else VARIACOES_POR_REGISTRO
+    num_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+    pasta_shards = sys.argv[4] if len(sys.argv) > 4 else PASTA_SHARDS
+
+    executar_pipeline(quantidade, variacoes=variacoes, num_workers=num_workers, pasta_shards=pasta_shards)
+
+
+if __name__ == "__main__":
+    main()
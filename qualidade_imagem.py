@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+
+# Grade (linhas, colunas) das regiões usadas nas estatísticas locais
+GRADE_REGIOES = (4, 4)
+
+# Pixels a partir deste valor contam como reflexo (brilho estourado)
+LIMIAR_REFLEXO = 245
+
+# Pixels até este valor contam como sombra
+LIMIAR_SOMBRA = 50
+
+
+def _variancia(soma, soma_quadrados, n):
+    media = soma / n
+    return np.maximum(soma_quadrados / n - media ** 2, 0.0)
+
+
+def calcular_qualidade_lote(pilha_gray, grade=GRADE_REGIOES):
+    """
+    Features de qualidade de uma pilha de imagens em tons de cinza do mesmo tamanho (N, H, W), uint8.
+
+    Globais (mesmos valores de np.mean / np.std / Laplacian(CV_64F).var() sobre a imagem):
+      brilho_medio, contraste, nitidez_blur
+    Por região da grade (N, linhas, colunas):
+      nitidez_regioes, reflexo_regioes (fração de pixels estourados), sombra_regioes (fração escura)
+    Resumos por imagem:
+      nitidez_min_regiao, reflexo_frac, sombra_frac
+
+    O Laplaciano fica num único buffer int16 reaproveitado para a pilha toda (exato para uint8),
+    e as somas usam acumuladores inteiros em vez de cópias float64 da imagem.
+    """
+    pilha_gray = np.asarray(pilha_gray)
+    if pilha_gray.ndim == 2:
+        pilha_gray = pilha_gray[None]
+
+    n, altura, largura = pilha_gray.shape
+    total_pixels = altura * largura
+
+    laplaciano = np.empty((n, altura, largura), dtype=np.int16)
+    for i in range(n):
+        cv2.Laplacian(pilha_gray[i], cv2.CV_16S, dst=laplaciano[i])
+
+    # Somas com acumuladores inteiros direto sobre os buffers uint8/int16 (sem cópias float64)
+    soma_pixels = pilha_gray.sum(axis=(1, 2), dtype=np.int64)
+    soma_pixels_quad = np.einsum("nhw,nhw->n", pilha_gray, pilha_gray, dtype=np.int64)
+    soma_lap = laplaciano.sum(axis=(1, 2), dtype=np.int64)
+    soma_lap_quad = np.einsum("nhw,nhw->n", laplaciano, laplaciano, dtype=np.int64)
+
+    brilho_medio = soma_pixels / total_pixels
+    contraste = np.sqrt(_variancia(soma_pixels, soma_pixels_quad, total_pixels))
+    nitidez_blur = _variancia(soma_lap, soma_lap_quad, total_pixels)
+
+    # Estatísticas locais (descarta a sobra de borda que não fecha uma região inteira)
+    linhas_grade, colunas_grade = grade
+    h_reg = altura // linhas_grade
+    w_reg = largura // colunas_grade
+    forma_regioes = (n, linhas_grade, h_reg, colunas_grade, w_reg)
+    eixos = (2, 4)
+    pixels_por_regiao = h_reg * w_reg
+
+    pixels_reg = pilha_gray[:, :h_reg * linhas_grade, :w_reg * colunas_grade].reshape(forma_regioes)
+    lap_reg = laplaciano[:, :h_reg * linhas_grade, :w_reg * colunas_grade].reshape(forma_regioes)
+
+    nitidez_regioes = _variancia(
+        lap_reg.sum(axis=eixos, dtype=np.int64),
+        np.einsum("nahbw,nahbw->nab", lap_reg, lap_reg, dtype=np.int64),
+        pixels_por_regiao
+    )
+    reflexo_regioes = (pixels_reg >= LIMIAR_REFLEXO).sum(axis=eixos) / pixels_por_regiao
+    sombra_regioes = (pixels_reg <= LIMIAR_SOMBRA).sum(axis=eixos) / pixels_por_regiao
+
+    return {
+        "brilho_medio": brilho_medio,
+        "contraste": contraste,
+        "nitidez_blur": nitidez_blur,
+        "nitidez_regioes": nitidez_regioes,
+        "reflexo_regioes": reflexo_regioes,
+        "sombra_regioes": sombra_regioes,
+        "nitidez_min_regiao": nitidez_regioes.min(axis=(1, 2)),
+        "reflexo_frac": reflexo_regioes.mean(axis=(1, 2)),
+        "sombra_frac": sombra_regioes.mean(axis=(1, 2)),
+    }
+
+
+def calcular_qualidade_imagens(imagens_gray, grade=GRADE_REGIOES):
+    """
+    Versão para uma lista de imagens de tamanhos variados: agrupa as de mesmo tamanho
+    numa pilha e devolve um dicionário de features (escalares e grades) por imagem, na ordem de entrada.
+    """
+    resultados = [None] * len(imagens_gray)
+    por_tamanho = {}
+    for i, img in enumerate(imagens_gray):
+        por_tamanho.setdefault(img.shape, []).append(i)
+
+    for indices in por_tamanho.values():
+        lote = calcular_qualidade_lote(np.stack([imagens_gray[i] for i in indices]), grade)
+        for posicao, i in enumerate(indices):
+            resultados[i] = {nome: valores[posicao] for nome, valores in lote.items()}
+
+    return resultados
+
+
+def calcular_qualidade(img_gray, grade=GRADE_REGIOES):
+    """Features de qualidade de uma única imagem em tons de cinza."""
+    return calcular_qualidade_imagens([img_gray], grade)[0]
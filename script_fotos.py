@@ -1,5 +1,8 @@
 import os
 import csv
+import sys
+
+import numpy as np
 from PIL import Image
 
 # ==== CONFIGURAÇÕES ====
@@ -8,6 +11,11 @@ PASTA_MASCULINO = "faces_m"
 PASTA_FEMININO = "faces_f"
 CSV_ARQUIVO = "dados_fakes_identidade.csv"
 
+# Cards com a foto vão para outra pasta: os de PASTA_RG não são regravados, então a etapa pode
+# ser interrompida e retomada (cards já gerados em PASTA_SAIDA são pulados)
+PASTA_SAIDA = "RGFRENTE_FOTO"
+SOBRESCREVER = False
+
 # ✅ NOVA POSIÇÃO DA FOTO NO RG
 POS_X = 276
 POS_Y = 615
@@ -24,52 +32,105 @@ def carregar_fotos(pasta):
     return arquivos
 
 
-def main():
-    fotos_m = carregar_fotos(PASTA_MASCULINO)
-    fotos_f = carregar_fotos(PASTA_FEMININO)
+class PoolFotos:
+    """
+    Fotos de uma pasta abertas e redimensionadas para LARGURA_FOTO x ALTURA_FOTO uma única vez,
+    guardadas num único array RGB (quantidade, ALTURA_FOTO, LARGURA_FOTO, 3).
+    """
+
+    def __init__(self, pasta):
+        self.caminhos = carregar_fotos(pasta) if os.path.isdir(pasta) else []
+        self.fotos = np.empty((len(self.caminhos), ALTURA_FOTO, LARGURA_FOTO, 3), np.uint8)
+        for i, caminho in enumerate(self.caminhos):
+            with Image.open(caminho) as foto:
+                self.fotos[i] = np.asarray(foto.convert("RGB").resize((LARGURA_FOTO, ALTURA_FOTO)))
+
+    def __len__(self):
+        return len(self.caminhos)
+
+    def __getitem__(self, indice):
+        return self.fotos[indice]
+
+
+def atribuir_fotos(dados, quantidade_m, quantidade_f):
+    """
+    Rodízio das fotos por sexo, na ordem do CSV: devolve ("F" ou "M", índice no pool) por registro.
+    Feito de antemão, cada registro pode ser processado (ou pulado) de forma independente.
+    """
+    contador_m = 0
+    contador_f = 0
+    atribuicoes = []
+    for pessoa in dados:
+        if pessoa.get("sexo", "").upper() == "F":
+            atribuicoes.append(("F", contador_f % quantidade_f))
+            contador_f += 1
+        else:
+            atribuicoes.append(("M", contador_m % quantidade_m))
+            contador_m += 1
+    return atribuicoes
+
+
+def colar_foto(card, foto):
+    """
+    Cola a foto (array RGB do pool) na posição do RG, direto no card em memória:
+    uma imagem PIL ou um array numpy com os mesmos canais da foto (recortada nas bordas como no paste do PIL).
+    """
+    if isinstance(card, Image.Image):
+        card.paste(Image.fromarray(foto), (POS_X, POS_Y))
+        return card
+
+    altura = min(ALTURA_FOTO, card.shape[0] - POS_Y)
+    largura = min(LARGURA_FOTO, card.shape[1] - POS_X)
+    if altura > 0 and largura > 0:
+        card[POS_Y:POS_Y + altura, POS_X:POS_X + largura] = foto[:altura, :largura]
+    return card
+
+
+def main(pasta_saida=PASTA_SAIDA, sobrescrever=SOBRESCREVER):
+    pools = {"M": PoolFotos(PASTA_MASCULINO), "F": PoolFotos(PASTA_FEMININO)}
 
-    if not fotos_m or not fotos_f:
+    if not len(pools["M"]) or not len(pools["F"]):
         print(" As pastas faces_m ou faces_f estão vazias!")
         return
 
     with open(CSV_ARQUIVO, newline='', encoding="utf-8-sig") as f:
         dados = list(csv.DictReader(f))
 
-    contador_m = 0
-    contador_f = 0
+    os.makedirs(pasta_saida, exist_ok=True)
+    atribuicoes = atribuir_fotos(dados, len(pools["M"]), len(pools["F"]))
+    aplicadas = 0
+    puladas = 0
 
-    for i, pessoa in enumerate(dados, start=1):
-        sexo = pessoa.get("sexo", "").upper()
+    for i, (sexo, indice_foto) in enumerate(atribuicoes, start=1):
+        nome = f"rg-frente_{i:04d}.jpg"
+        caminho_rg = os.path.join(PASTA_RG, nome)
+        caminho_saida = os.path.join(pasta_saida, nome)
 
-        caminho_rg = os.path.join(PASTA_RG, f"rg-frente_{i:04d}.jpg")
+        # Retomada: o card já foi gerado numa execução anterior
+        if not sobrescrever and os.path.exists(caminho_saida):
+            puladas += 1
+            continue
 
         if not os.path.exists(caminho_rg):
             print(f" RG não encontrado: {caminho_rg}")
             continue
 
-        # Escolhe a foto de acordo com o sexo
-        if sexo == "F":
-            foto_path = fotos_f[contador_f % len(fotos_f)]
-            contador_f += 1
-        else:
-            foto_path = fotos_m[contador_m % len(fotos_m)]
-            contador_m += 1
-
-        # Abre RG e Foto
-        rg = Image.open(caminho_rg).convert("RGB")
-        foto = Image.open(foto_path).convert("RGB")
-        foto = foto.resize((LARGURA_FOTO, ALTURA_FOTO))
-
-        #  Cola a foto na NOVA posição
-        rg.paste(foto, (POS_X, POS_Y))
-
-        # Salva novamente
-        rg.save(caminho_rg, "JPEG")
+        # Abre o RG e cola a foto já redimensionada do pool
+        with Image.open(caminho_rg) as rg:
+            card = colar_foto(rg.convert("RGB"), pools[sexo][indice_foto])
 
-        print(f" Foto aplicada em: {caminho_rg}")
+        # Grava num temporário e só então renomeia: um JPEG cortado por uma interrupção
+        # nunca fica com o nome final (que faria a retomada pulá-lo para sempre)
+        temporario = caminho_saida + ".tmp"
+        card.save(temporario, "JPEG")
+        os.replace(temporario, caminho_saida)
+        aplicadas += 1
 
-    print("\n Todas as fotos foram aplicadas com sucesso!")
+    if puladas:
+        print(f" {puladas} card(s) já existentes em '{pasta_saida}' foram pulados.")
+    print(f"\n {aplicadas} foto(s) aplicadas; cards salvos em '{pasta_saida}'.")
 
 
 if __name__ == "__main__":
-    main()
+    # Uso: python script_fotos.py [pasta_saida]
+    main(sys.argv[1] if len(sys.argv) > 1 else PASTA_SAIDA)
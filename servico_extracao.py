@@ -0,0 +1,242 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+import features_rg_face_ocr as extrator
+import metricas
+from gate_qualidade import EstatisticasGate
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+HOST = "127.0.0.1"
+PORTA = 8765
+
+# Requisições aguardando o OCR; com a fila cheia o serviço responde 503 em vez de acumular memória
+TAMANHO_FILA = 64
+
+# Lote enviado ao OCR: junta até TAMANHO_LOTE imagens que chegarem em até JANELA_LOTE_S após a primeira
+TAMANHO_LOTE = extrator.TAMANHO_LOTE_OCR
+JANELA_LOTE_S = 0.02
+
+# Tempo máximo que uma requisição espera pelo resultado
+TEMPO_MAXIMO_S = 120
+
+# Card de aquecimento: um template real, que passa pelo gate de qualidade e exercita o OCR de verdade
+IMAGEM_AQUECIMENTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rg_frente.png")
+
+# Exemplo de uso:
+#   python servico_extracao.py [porta] [motor_ocr]
+#   curl --data-binary @rg.jpg "http://127.0.0.1:8765/extrair?tipo=RG_FRENTE&nome=rg.jpg"
+
+
+class ServicoExtracao:
+    """
+    Mantém o motor de OCR e o face_cascade carregados e processa as imagens recebidas
+    numa única thread (o OCR não é thread-safe), agrupando as requisições em lotes.
+    """
+
+    def __init__(self, tamanho_fila=TAMANHO_FILA, tamanho_lote=TAMANHO_LOTE, janela_lote_s=JANELA_LOTE_S):
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.tamanho_lote = tamanho_lote
+        self.janela_lote_s = janela_lote_s
+        self.processadas = 0
+        self.rejeitadas_fila_cheia = 0
+        self.descartadas_expiradas = 0
+        self._thread = threading.Thread(target=self._consumir, daemon=True)
+
+    def aquecer(self, caminho_imagem=IMAGEM_AQUECIMENTO):
+        """
+        Carrega o modelo de OCR e roda um lote de aquecimento (sem cache, para a inferência rodar)
+        antes de aceitar requisições. Métricas e estatísticas do gate são zeradas depois.
+        """
+        inicio = time.perf_counter()
+        extrator.motor_ocr.modelo
+
+        img = cv2.imread(caminho_imagem)
+        if img is None:
+            print(f"AVISO: imagem de aquecimento não encontrada ({caminho_imagem}): só o modelo foi carregado.")
+        else:
+            usar_cache = extrator.USAR_CACHE_OCR
+            extrator.USAR_CACHE_OCR = False
+            try:
+                extrator.extrair_features_lote([(os.path.basename(caminho_imagem), "RG_FRENTE", img)])
+            finally:
+                extrator.USAR_CACHE_OCR = usar_cache
+
+        metricas.reiniciar()
+        extrator.estatisticas_gate = EstatisticasGate()
+        print(f"Modelos carregados em {time.perf_counter() - inicio:.1f} s (motor de OCR: {extrator.motor_ocr.nome})")
+
+    def iniciar(self):
+        self.aquecer()
+        self._thread.start()
+
+    def enviar(self, nome, tipo_documento, img, tempo_maximo_s=TEMPO_MAXIMO_S):
+        """
+        Enfileira uma imagem e devolve um Future com as features; queue.Full se a fila estiver cheia.
+        Se o resultado não puder mais ser entregue em tempo_maximo_s, a imagem é descartada sem OCR.
+        """
+        futuro = Future()
+        try:
+            self.fila.put_nowait((nome, tipo_documento, img, futuro, time.monotonic() + tempo_maximo_s))
+        except queue.Full:
+            self.rejeitadas_fila_cheia += 1
+            raise
+        return futuro
+
+    def _aceitar(self, pedido):
+        """
+        False para pedidos cujo cliente já desistiu (Future cancelado) ou cujo prazo venceu;
+        os demais passam a "em execução" e não podem mais ser cancelados.
+        """
+        *_, futuro, prazo = pedido
+        if time.monotonic() > prazo:
+            futuro.cancel()
+        if not futuro.set_running_or_notify_cancel():
+            self.descartadas_expiradas += 1
+            return False
+        return True
+
+    def _proximo_lote(self):
+        lote = []
+        while not lote:
+            pedido = self.fila.get()
+            if self._aceitar(pedido):
+                lote.append(pedido)
+
+        limite = time.perf_counter() + self.janela_lote_s
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                pedido = self.fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            if self._aceitar(pedido):
+                lote.append(pedido)
+        return lote
+
+    def _consumir(self):
+        while True:
+            lote = self._proximo_lote()
+            try:
+                resultados = extrator.extrair_features_lote([(nome, tipo, img) for nome, tipo, img, *_ in lote])
+            except Exception as e:
+                for _, _, _, futuro, _ in lote:
+                    futuro.set_exception(e)
+                continue
+
+            for (_, _, _, futuro, _), features in zip(lote, resultados):
+                futuro.set_result(features)
+            self.processadas += len(lote)
+
+    def estado(self):
+        return {
+            "motor_ocr": extrator.motor_ocr.nome,
+            "fila": self.fila.qsize(),
+            "capacidade_fila": self.fila.maxsize,
+            "processadas": self.processadas,
+            "rejeitadas_fila_cheia": self.rejeitadas_fila_cheia,
+            "descartadas_expiradas": self.descartadas_expiradas,
+        }
+
+
+def _para_json(valor):
+    # Tipos numpy que escapam de montar_features (ex.: coordenadas do cascade)
+    return valor.item() if hasattr(valor, "item") else str(valor)
+
+
+def criar_handler(servico):
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, status, corpo, cabecalhos=None):
+            dados = json.dumps(corpo, default=_para_json, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/saude":
+                self._responder(200, servico.estado())
+            else:
+                self._responder(404, {"erro": "rota não encontrada"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/extrair":
+                self._responder(404, {"erro": "rota não encontrada"})
+                return
+
+            parametros = parse_qs(url.query)
+            tipo_documento = parametros.get("tipo", ["RG_FRENTE"])[0]
+            nome = parametros.get("nome", ["imagem"])[0]
+
+            # Decodificação na thread da requisição, fora da thread do OCR
+            corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            img = cv2.imdecode(np.frombuffer(corpo, np.uint8), cv2.IMREAD_COLOR) if corpo else None
+            if img is None:
+                self._responder(400, {"erro": "corpo da requisição não é uma imagem válida"})
+                return
+
+            try:
+                futuro = servico.enviar(nome, tipo_documento, img)
+            except queue.Full:
+                self._responder(503, {"erro": "fila cheia, tente novamente"}, {"Retry-After": "1"})
+                return
+
+            try:
+                features = futuro.result(timeout=TEMPO_MAXIMO_S)
+            except (TimeoutError, CancelledError):
+                # Se ainda estiver na fila, o consumidor descarta a imagem em vez de processá-la à toa;
+                # CancelledError: o consumidor já a descartou por ter vencido o prazo
+                futuro.cancel()
+                self._responder(504, {"erro": "tempo esgotado aguardando o OCR"})
+                return
+            except Exception as e:
+                self._responder(500, {"erro": f"{type(e).__name__}: {e}"})
+                return
+
+            self._responder(200, features)
+
+        def log_message(self, formato, *args):
+            # Sem uma linha de log por requisição
+            pass
+
+    return Handler
+
+
+def main(host=HOST, porta=PORTA, motor=extrator.MOTOR_OCR):
+    extrator.selecionar_motor_ocr(motor)
+    servico = ServicoExtracao()
+    servico.iniciar()
+
+    servidor = ThreadingHTTPServer((host, porta), criar_handler(servico))
+    print(f"Serviço de extração ouvindo em http://{host}:{porta} (POST /extrair, GET /saude)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        extrator.estatisticas_gate.imprimir_resumo()
+
+
+if __name__ == "__main__":
+    main(
+        porta=int(sys.argv[1]) if len(sys.argv) > 1 else PORTA,
+        motor=sys.argv[2] if len(sys.argv) > 2 else extrator.MOTOR_OCR
+    )
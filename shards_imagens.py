@@ -0,0 +1,304 @@
+import glob
+import hashlib
+import os
+import re
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+from classificador_lado import eh_frente
+from ingestao_assincrona import decodificar_bytes, ler_arquivo, listar_arquivos
+
+# =========================
+# CONFIGURAÇÕES
+# =========================
+# Um dataset em shards é uma pasta com partes numeradas, cada uma com dois arquivos:
+#   parte-00000.dados       imagens já codificadas (jpg/png/webp), uma após a outra
+#   parte-00000.indice.npy  uma linha por imagem: offset, tamanho, rótulo, id de origem, lado e hash
+# Os dois são abertos com memory-map: ler uma imagem é fatiar o arquivo de dados, sem open/stat por imagem.
+
+PREFIXO_PARTE = "parte"
+EXTENSAO_DADOS = ".dados"
+SUFIXO_INDICE = ".indice.npy"
+
+# Uma nova parte começa quando a atual passaria deste tamanho
+TAMANHO_MAX_PARTE = 1024 ** 3
+
+DTYPE_INDICE = np.dtype([
+    ("offset", "<u8"),
+    ("tamanho", "<u4"),
+    ("rotulo", "<U24"),
+    ("id_origem", "<U96"),
+    ("lado", "<U8"),
+    ("hash", "<U40"),
+])
+
+# Caminho "virtual" de uma imagem dentro de um shard: <arquivo .dados>#<índice>/<id de origem>.
+# Com ele o resto do código (manifesto, ingestão, nome do arquivo na saída) continua trabalhando com caminhos.
+PADRAO_CAMINHO_REGISTRO = re.compile(r"^(?P<dados>.+\.dados)#(?P<indice>\d+)(?:[\\/][^\\/]*)?$")
+
+
+def hash_conteudo(conteudo):
+    """Mesmo hash de manifesto.hash_arquivo, calculado sobre os bytes já em memória."""
+    return hashlib.blake2b(conteudo, digest_size=20).hexdigest()
+
+
+def caminho_indice(caminho_dados):
+    return caminho_dados[:-len(EXTENSAO_DADOS)] + SUFIXO_INDICE
+
+
+def listar_partes(pasta, prefixo=PREFIXO_PARTE):
+    """Arquivos de dados das partes completas (com índice gravado) da pasta, em ordem."""
+    indices = sorted(glob.glob(os.path.join(glob.escape(pasta), f"{prefixo}-*{SUFIXO_INDICE}")))
+    return [caminho[:-len(SUFIXO_INDICE)] + EXTENSAO_DADOS for caminho in indices]
+
+
+def contem_shards(pasta):
+    return os.path.isdir(pasta) and bool(listar_partes(pasta))
+
+
+def remover_partes(pasta, prefixo=PREFIXO_PARTE):
+    """Apaga as partes da pasta (completas, interrompidas e temporárias); devolve quantos arquivos removeu."""
+    padrao = os.path.join(glob.escape(pasta), f"{prefixo}-*")
+    arquivos = [
+        caminho for caminho in glob.glob(padrao)
+        if caminho.endswith((EXTENSAO_DADOS, SUFIXO_INDICE, SUFIXO_INDICE + ".tmp"))
+    ]
+    for caminho in arquivos:
+        os.remove(caminho)
+    return len(arquivos)
+
+
+# =========================
+# ESCRITA
+# =========================
+
+class EscritorShards:
+    """
+    Grava imagens já codificadas em partes sequenciais, trocando de parte a cada tamanho_max_parte bytes.
+    O índice de cada parte só é gravado quando ela é fechada: uma parte sem índice (execução
+    interrompida) é ignorada pelos leitores.
+    Uma pasta que já tem partes só é aceita com acrescentar=True (as novas partes vêm depois
+    das existentes); sem isso, gravar de novo no mesmo dataset duplicaria todos os registros.
+    """
+
+    def __init__(self, pasta, tamanho_max_parte=TAMANHO_MAX_PARTE, prefixo=PREFIXO_PARTE, acrescentar=False):
+        existentes = len(listar_partes(pasta, prefixo)) if os.path.isdir(pasta) else 0
+        if existentes and not acrescentar:
+            raise FileExistsError(
+                f"'{pasta}' já contém {existentes} parte(s) de shards: use acrescentar=True "
+                f"ou apague as partes antes (remover_partes)"
+            )
+        os.makedirs(pasta, exist_ok=True)
+        self.pasta = pasta
+        self.tamanho_max_parte = tamanho_max_parte
+        self.prefixo = prefixo
+        self.numero_parte = existentes
+        # Contadores desta execução (as partes anteriores de um acréscimo não entram)
+        self.partes_gravadas = 0
+        self.total = 0
+        self._arquivo = None
+        self._registros = []
+        self._offset = 0
+
+    def _caminho_dados(self):
+        return os.path.join(self.pasta, f"{self.prefixo}-{self.numero_parte:05d}{EXTENSAO_DADOS}")
+
+    def _abrir_parte(self):
+        self._arquivo = open(self._caminho_dados(), "wb")
+        self._registros = []
+        self._offset = 0
+
+    def _fechar_parte(self):
+        if self._arquivo is None:
+            return
+        self._arquivo.close()
+        indice = np.array(self._registros, dtype=DTYPE_INDICE)
+        destino = caminho_indice(self._caminho_dados())
+        temporario = destino + ".tmp"
+        with open(temporario, "wb") as f:
+            np.save(f, indice)
+        os.replace(temporario, destino)
+        self._arquivo = None
+        self.numero_parte += 1
+        self.partes_gravadas += 1
+
+    def adicionar(self, conteudo, rotulo="", id_origem="", lado=""):
+        """Acrescenta uma imagem codificada (bytes) e devolve o caminho virtual dela."""
+        # Strings maiores que o campo seriam truncadas em silêncio pelo numpy
+        for campo, valor in (("rotulo", rotulo), ("id_origem", id_origem), ("lado", lado)):
+            if len(valor) > DTYPE_INDICE[campo].itemsize // 4:
+                raise ValueError(f"{campo} longo demais para o índice ({DTYPE_INDICE[campo].str}): {valor}")
+
+        conteudo = bytes(conteudo)
+        if self._arquivo is not None and self._offset and self._offset + len(conteudo) > self.tamanho_max_parte:
+            self._fechar_parte()
+        if self._arquivo is None:
+            self._abrir_parte()
+
+        self._arquivo.write(conteudo)
+        self._registros.append((self._offset, len(conteudo), rotulo, id_origem, lado, hash_conteudo(conteudo)))
+        self._offset += len(conteudo)
+        self.total += 1
+        return f"{self._caminho_dados()}#{len(self._registros) - 1}/{id_origem}"
+
+    def fechar(self):
+        self._fechar_parte()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+# =========================
+# LEITURA
+# =========================
+
+class ParteShard:
+    """Uma parte aberta com memory-map (índice e dados)."""
+
+    def __init__(self, caminho_dados):
+        self.caminho_dados = caminho_dados
+        self.indice = np.load(caminho_indice(caminho_dados), mmap_mode="r")
+        self._dados = None
+
+    def __len__(self):
+        return len(self.indice)
+
+    @property
+    def dados(self):
+        if self._dados is None:
+            tamanho = os.path.getsize(self.caminho_dados)
+            self._dados = np.memmap(self.caminho_dados, np.uint8, "r") if tamanho else np.empty(0, np.uint8)
+        return self._dados
+
+    def ler(self, i):
+        registro = self.indice[i]
+        offset = int(registro["offset"])
+        return self.dados[offset:offset + int(registro["tamanho"])].tobytes()
+
+    def caminho_registro(self, i):
+        return f"{self.caminho_dados}#{i}/{self.indice[i]['id_origem']}"
+
+    def registro(self, i):
+        linha = self.indice[i]
+        return {
+            "caminho": self.caminho_registro(i),
+            "rotulo": str(linha["rotulo"]),
+            "id_origem": str(linha["id_origem"]),
+            "lado": str(linha["lado"]),
+            "tamanho": int(linha["tamanho"]),
+            "hash": str(linha["hash"]),
+        }
+
+
+class LeitorShards:
+    """Todas as partes de uma pasta vistas como uma única sequência de registros."""
+
+    def __init__(self, pasta, prefixo=PREFIXO_PARTE):
+        self.partes = [_abrir_parte(caminho) for caminho in listar_partes(pasta, prefixo)]
+        self._inicios = np.cumsum([0] + [len(parte) for parte in self.partes])
+
+    def __len__(self):
+        return int(self._inicios[-1])
+
+    def _localizar(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        numero = int(np.searchsorted(self._inicios, i, side="right")) - 1
+        return self.partes[numero], i - int(self._inicios[numero])
+
+    def __getitem__(self, i):
+        parte, local = self._localizar(i)
+        return parte.registro(local)
+
+    def __iter__(self):
+        for parte in self.partes:
+            for i in range(len(parte)):
+                yield parte.registro(i)
+
+    def ler(self, i):
+        parte, local = self._localizar(i)
+        return parte.ler(local)
+
+
+# Partes já abertas neste processo (a ingestão lê de várias threads)
+_partes_abertas = {}
+_trava = threading.Lock()
+
+
+def _abrir_parte(caminho_dados):
+    with _trava:
+        if caminho_dados not in _partes_abertas:
+            _partes_abertas[caminho_dados] = ParteShard(caminho_dados)
+        return _partes_abertas[caminho_dados]
+
+
+def info_registro(caminho):
+    """Registro do índice (caminho, rótulo, id, lado, tamanho, hash) de um caminho virtual; None se for um arquivo comum."""
+    match = PADRAO_CAMINHO_REGISTRO.match(caminho)
+    if match is None:
+        return None
+    return _abrir_parte(match["dados"]).registro(int(match["indice"]))
+
+
+def ler_conteudo(caminho):
+    """Bytes da imagem: fatia do shard para caminhos virtuais, leitura do arquivo para os demais."""
+    match = PADRAO_CAMINHO_REGISTRO.match(caminho)
+    if match is None:
+        return ler_arquivo(caminho)
+    return _abrir_parte(match["dados"]).ler(int(match["indice"]))
+
+
+def ler_imagem(caminho):
+    """cv2.imread que também aceita caminhos virtuais de shards (None se ilegível)."""
+    if PADRAO_CAMINHO_REGISTRO.match(caminho) is None:
+        return cv2.imread(caminho)
+    return decodificar_bytes(ler_conteudo(caminho))
+
+
+def listar_imagens_pasta(pasta, rotulo_padrao):
+    """
+    (caminho, rótulo) das imagens de uma pasta: os registros dos shards, se a pasta tiver shards,
+    senão os arquivos de imagem soltos com o rótulo padrão.
+    """
+    if contem_shards(pasta):
+        return [(registro["caminho"], registro["rotulo"] or rotulo_padrao) for registro in LeitorShards(pasta)]
+    return [(caminho, rotulo_padrao) for _, caminho in listar_arquivos(pasta)]
+
+
+def empacotar_pastas(pastas, destino, tamanho_max_parte=TAMANHO_MAX_PARTE, acrescentar=False):
+    """
+    Converte pastas de imagens soltas {rótulo: pasta} num dataset em shards em `destino`.
+    Um destino que já tem shards é recusado, a menos que acrescentar=True.
+    """
+    with EscritorShards(destino, tamanho_max_parte, acrescentar=acrescentar) as escritor:
+        for rotulo, pasta in pastas.items():
+            if not os.path.isdir(pasta):
+                print(f"AVISO: Pasta não encontrada: {pasta}. Pulando.")
+                continue
+            lado = "frente" if eh_frente(rotulo) else "verso"
+            for nome, caminho in listar_arquivos(pasta):
+                escritor.adicionar(ler_arquivo(caminho), rotulo, nome, lado)
+    print(f"{escritor.total} imagens empacotadas em {escritor.partes_gravadas} parte(s) nova(s) em '{destino}'")
+    return escritor.total
+
+
+if __name__ == "__main__":
+    # Uso: python shards_imagens.py [--acrescentar] <pasta_destino> RG_FRENTE=RGFRENTE_AUG RG_VERSO=RGTRAS_AUG
+    argumentos = [a for a in sys.argv[1:] if a != "--acrescentar"]
+    if len(argumentos) < 2:
+        print("Uso: python shards_imagens.py [--acrescentar] <pasta_destino> <rotulo>=<pasta> [<rotulo>=<pasta> ...]")
+        sys.exit(1)
+    try:
+        empacotar_pastas(
+            dict(argumento.split("=", 1) for argumento in argumentos[1:]), argumentos[0],
+            acrescentar="--acrescentar" in sys.argv[1:]
+        )
+    except FileExistsError as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
@@ -0,0 +1,123 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import cache_ocr
+from cache_ocr import CacheOCR, gerar_chave, hash_imagem
+from motores_ocr import MotorOCR, reconhecer_com_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CacheOCR(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.fechar()
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio que avança 1 s a cada leitura: a ordem de acesso do LRU fica determinística."""
+    tempos = itertools.count(1000)
+    monkeypatch.setattr(cache_ocr.time, "time", lambda: float(next(tempos)))
+
+
+class MotorContador(MotorOCR):
+    nome = "contador"
+    idioma_padrao = "pt"
+
+    def __init__(self):
+        super().__init__()
+        self.lotes = []
+
+    def reconhecer(self, img):
+        return [f"texto {int(img.sum())}"], [[0, 0, 1, 1]], [0.9]
+
+    def reconhecer_lote(self, imgs):
+        self.lotes.append(len(imgs))
+        return [self.reconhecer(img) for img in imgs]
+
+
+def test_hash_imagem_depende_do_conteudo_e_do_formato():
+    img = np.zeros((4, 6), np.uint8)
+    assert hash_imagem(img) == hash_imagem(img.copy())
+    assert hash_imagem(img) != hash_imagem(img.reshape(6, 4))
+
+    outra = img.copy()
+    outra[0, 0] = 1
+    assert hash_imagem(img) != hash_imagem(outra)
+    # Views não contíguas têm o mesmo hash da cópia contígua
+    assert hash_imagem(np.arange(24, dtype=np.uint8).reshape(4, 6)[:, ::2]) == \
+        hash_imagem(np.ascontiguousarray(np.arange(24, dtype=np.uint8).reshape(4, 6)[:, ::2]))
+
+
+def test_chave_muda_com_motor_idioma_e_parametros():
+    chave = gerar_chave("abc", "tesseract", "por")
+    assert chave == gerar_chave("abc", "tesseract", "por", {})
+    assert chave != gerar_chave("abc", "paddleocr", "por")
+    assert chave != gerar_chave("abc", "tesseract", "eng")
+    assert chave != gerar_chave("abc", "tesseract", "por", {"config": "--psm 6"})
+
+
+def test_obter_ausente_e_presente(cache):
+    assert cache.obter("nao-existe") is None
+
+    cache.salvar("k", "linha 1\nlinha 2", [[1, 2, 3, 4]], [0.5])
+    assert cache.obter("k") == {"texto": "linha 1\nlinha 2", "caixas": [[1, 2, 3, 4]], "confiancas": [0.5]}
+
+
+def test_persiste_entre_instancias(tmp_path):
+    caminho = str(tmp_path / "cache.sqlite")
+    primeiro = CacheOCR(caminho)
+    primeiro.salvar("k", "texto")
+    primeiro.fechar()
+
+    segundo = CacheOCR(caminho)
+    assert segundo.obter("k")["texto"] == "texto"
+    segundo.fechar()
+
+
+def test_reconhecer_com_cache_so_envia_as_faltantes(cache):
+    motor = MotorContador()
+    imgs = [np.full((2, 2), v, np.uint8) for v in (1, 2, 3)]
+
+    primeira = reconhecer_com_cache(motor, imgs, cache)
+    assert motor.lotes == [3]
+
+    segunda = reconhecer_com_cache(motor, imgs + [np.full((2, 2), 4, np.uint8)], cache)
+    assert motor.lotes == [3, 1]
+    assert segunda[:3] == primeira
+    assert segunda[3] == motor.reconhecer(np.full((2, 2), 4, np.uint8))
+
+
+def test_despejo_remove_as_menos_usadas(cache, relogio):
+    for chave in "abcd":
+        cache.salvar(chave, "x" * 100)
+    # "a" foi usada por último: passa a ser a mais recente
+    assert cache.obter("a") is not None
+
+    cache.tamanho_maximo_bytes = 250
+    removidas = cache.despejar()
+
+    # Reduz até FRACAO_APOS_DESPEJO do máximo (225 bytes): sobram as duas mais recentes
+    assert removidas == 2
+    assert cache.obter("b") is None and cache.obter("c") is None
+    assert cache.obter("d") is not None and cache.obter("a") is not None
+    assert cache.tamanho_total() == 200
+
+
+def test_despejo_nao_remove_abaixo_do_maximo(cache):
+    cache.salvar("a", "x" * 100)
+    assert cache.despejar() == 0
+    assert cache.obter("a") is not None
+
+
+def test_despejo_automatico_a_cada_intervalo(cache, relogio, monkeypatch):
+    monkeypatch.setattr(cache_ocr, "INTERVALO_VERIFICACAO", 5)
+    cache.tamanho_maximo_bytes = 300
+    for i in range(5):
+        cache.salvar(f"k{i}", "x" * 100)
+
+    assert cache.tamanho_total() <= 300
+    assert cache.obter("k4") is not None
+    assert cache.obter("k0") is None
@@ -0,0 +1,135 @@
+import pandas as pd
+import pytest
+
+from escritor_saida import anexar_linhas_csv, remover_linhas_substituidas
+
+
+def _linha(caminho, valor):
+    return {"nome_arquivo": caminho.rsplit("/", 1)[-1], "caminho": caminho, "valor": valor}
+
+
+def test_anexar_csv_segue_o_cabecalho_existente(tmp_path):
+    caminho = str(tmp_path / "saida.csv")
+    anexar_linhas_csv([{"a": 1, "b": 2, "c": 3}], caminho, "utf-8-sig")
+    anexar_linhas_csv([{"c": 6, "a": 4}], caminho, "utf-8-sig")
+    anexar_linhas_csv({"b": [8], "a": [7], "c": [9]}, caminho, "utf-8-sig")
+
+    tabela = pd.read_csv(caminho, encoding="utf-8-sig")
+    assert list(tabela.columns) == ["a", "b", "c"]
+    assert tabela.fillna(0).astype(int).values.tolist() == [[1, 2, 3], [4, 0, 6], [7, 8, 9]]
+
+
+def test_anexar_csv_rejeita_coluna_fora_do_cabecalho(tmp_path):
+    caminho = str(tmp_path / "saida.csv")
+    anexar_linhas_csv([{"a": 1}], caminho)
+    with pytest.raises(ValueError, match="z"):
+        anexar_linhas_csv([{"a": 2, "z": 3}], caminho)
+    assert pd.read_csv(caminho)["a"].tolist() == [1]
+
+
+def test_remover_substituidas_csv_chaveado_pelo_caminho(tmp_path):
+    caminho = str(tmp_path / "saida.csv")
+    # Mesmo nome de arquivo em duas pastas; só o da frente mudou e foi reprocessado
+    anexar_linhas_csv([_linha("/F/x_1.jpg", 1), _linha("/T/x_1.jpg", 2), _linha("/F/x_2.jpg", 3)], caminho)
+    anexar_linhas_csv([_linha("/F/x_1.jpg", 10)], caminho)
+
+    assert remover_linhas_substituidas(caminho, "caminho", {"/F/x_1.jpg"}) == 1
+    tabela = pd.read_csv(caminho)
+    assert sorted(zip(tabela.caminho, tabela.valor)) == [("/F/x_1.jpg", 10), ("/F/x_2.jpg", 3), ("/T/x_1.jpg", 2)]
+
+
+def test_remover_substituidas_sem_coluna_ou_sem_chaves(tmp_path):
+    caminho = str(tmp_path / "saida.csv")
+    anexar_linhas_csv([{"nome_arquivo": "x_1.jpg"}, {"nome_arquivo": "x_1.jpg"}], caminho)
+
+    assert remover_linhas_substituidas(caminho, "caminho", {"/F/x_1.jpg"}) == 0
+    assert remover_linhas_substituidas(caminho, "nome_arquivo", set()) == 0
+    assert remover_linhas_substituidas(str(tmp_path / "nao_existe.csv"), "caminho", {"x"}) == 0
+    assert len(pd.read_csv(caminho)) == 2
+
+
+@pytest.mark.parametrize("extensao", ["parquet", "arrow"])
+def test_remover_substituidas_entre_partes_colunares(tmp_path, extensao):
+    pytest.importorskip("pyarrow")
+    from escritor_saida import abrir_escritor
+
+    caminho = str(tmp_path / f"saida.{extensao}")
+    # Duas execuções no mesmo processo (e provavelmente no mesmo segundo): as partes não podem colidir
+    for linhas in ([_linha("/F/x_1.jpg", 1), _linha("/T/x_1.jpg", 2)], [_linha("/F/x_1.jpg", 10)]):
+        escritor = abrir_escritor(caminho, {"valor": "int32"}, tamanho_grupo=2)
+        for linha in linhas:
+            escritor.escrever(linha)
+        escritor.fechar()
+
+    assert remover_linhas_substituidas(caminho, "caminho", {"/F/x_1.jpg"}, tamanho_grupo=2) == 1
+    tabela = pd.read_parquet(caminho) if extensao == "parquet" else _ler_arrow(caminho)
+    assert sorted(zip(tabela.caminho, tabela.valor)) == [("/F/x_1.jpg", 10), ("/T/x_1.jpg", 2)]
+
+
+def _ler_arrow(caminho):
+    import pyarrow.dataset as ds
+    return ds.dataset(caminho, format="arrow").to_table().to_pandas()
+
+
+@pytest.fixture(params=["parquet", "arrow"])
+def saida_colunar(request, tmp_path):
+    pytest.importorskip("pyarrow")
+    return str(tmp_path / f"saida.{request.param}")
+
+
+def _ler_colunar(caminho):
+    return pd.read_parquet(caminho) if caminho.endswith(".parquet") else _ler_arrow(caminho)
+
+
+def test_esquema_e_a_uniao_das_chaves_do_primeiro_grupo(saida_colunar):
+    from escritor_saida import abrir_escritor
+
+    escritor = abrir_escritor(saida_colunar, {"n": "int16"}, tamanho_grupo=3)
+    escritor.escrever({"a": "x"})
+    escritor.escrever({"a": "y", "n": 3})
+    escritor.escrever({"n": 4})
+    escritor.escrever_lote({"a": ["z"]})
+    escritor.fechar()
+
+    assert [campo.name for campo in escritor.esquema] == ["a", "n"]
+    assert str(escritor.esquema.field("n").type) == "int16"
+    tabela = _ler_colunar(saida_colunar)
+    assert tabela.a.fillna("").tolist() == ["x", "y", "", "z"]
+    assert tabela.n.fillna(-1).astype(int).tolist() == [-1, 3, 4, -1]
+
+
+def test_coluna_fora_do_esquema_gera_erro(saida_colunar):
+    from escritor_saida import abrir_escritor
+
+    escritor = abrir_escritor(saida_colunar, tamanho_grupo=1)
+    escritor.escrever({"a": "x"})
+    with pytest.raises(ValueError, match="novo"):
+        escritor.escrever({"a": "y", "novo": 1})
+    with pytest.raises(ValueError, match="novo"):
+        escritor.escrever_lote({"novo": [1]})
+
+
+def test_checkpoint_fecha_a_parte_legivel(saida_colunar):
+    import os
+
+    from escritor_saida import abrir_escritor
+
+    escritor = abrir_escritor(saida_colunar, tamanho_grupo=2)
+    for i in range(3):
+        escritor.escrever({"i": i})
+    escritor.checkpoint()
+    assert _ler_colunar(saida_colunar).i.tolist() == [0, 1, 2]
+
+    escritor.escrever({"i": 3})
+    escritor.fechar()
+    assert len(os.listdir(saida_colunar)) == 2
+    assert _ler_colunar(saida_colunar).i.tolist() == [0, 1, 2, 3]
+
+
+def test_intervalo_checkpoint_multiplo_do_grupo(saida_colunar):
+    from escritor_saida import EscritorCSV, abrir_escritor
+
+    escritor = abrir_escritor(saida_colunar, tamanho_grupo=500)
+    assert escritor.intervalo_checkpoint(100) == 500
+    assert escritor.intervalo_checkpoint(501) == 1000
+    assert EscritorCSV("x.csv", tamanho_grupo=500).intervalo_checkpoint(100) == 100
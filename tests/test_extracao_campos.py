@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+from benchmark_extracao_campos import _legado_rg, _legado_rg_antigo, _novo_rg_antigo, textos_de_teste
+from extracao_campos import PADROES_RG, PADROES_RG_ANTIGO, ExtratorCampos, extrair_campos_rg
+
+# Casos de borda: sobreposição entre campos e entre ocorrências do mesmo campo, nada encontrado,
+# separadores variados, dígito verificador com letra
+TEXTOS_BORDA = [
+    "",
+    "SEM NUMEROS AQUI\nNOME COMPLETO",
+    "12.345.678-9 01/02/1990 03/04/2010",
+    "rg 12345678x nascido em 01-02-1990 emitido 03.04.2010 e 05/06/2020",
+    "12/12/2012/12/2012 1234567890123 123456789",
+    "CPF 12345678901 RG 987654321 01/01/2000",
+    "11.111.111 1 e 22 222 222-x\n33/33/3333",
+    "0101/01/20001 12/34/5678",
+    "NOME\nJOAO DA SILVA\nFILIACAO\nMaria\n",
+]
+
+
+@pytest.fixture(scope="module")
+def textos():
+    return textos_de_teste(quantidade=300) + TEXTOS_BORDA
+
+
+def test_rg_antigo_igual_ao_legado(textos):
+    for texto in textos:
+        assert _novo_rg_antigo(texto) == _legado_rg_antigo(texto), texto
+
+
+def test_rg_igual_ao_legado(textos):
+    for texto in textos:
+        assert extrair_campos_rg(texto) == _legado_rg(texto), texto
+
+
+@pytest.mark.parametrize("padroes, flags", [(PADROES_RG_ANTIGO, re.IGNORECASE), (PADROES_RG, 0)])
+@pytest.mark.parametrize("combinar", [True, False])
+def test_varrer_igual_ao_findall_por_campo(textos, padroes, flags, combinar):
+    extrator = ExtratorCampos(padroes, flags, combinar=combinar)
+    for texto in textos:
+        esperado = {campo: re.findall(padrao, texto, flags) for campo, padrao in padroes.items()}
+        assert extrator.varrer(texto) == esperado, texto
+
+
+def test_primeira_devolve_so_a_primeira_ocorrencia():
+    extrator = ExtratorCampos(PADROES_RG, combinar=False, primeira=("numero_rg",))
+    ocorrencias = extrator.varrer("123456789 01/01/2000 9876543210 02/02/2002")
+    assert ocorrencias == {"data": ["01/01/2000", "02/02/2002"], "numero_rg": ["123456789"]}
@@ -0,0 +1,79 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from gera_dados_sinteticos import (
+    ESPACO_CPF, _feistel, calcular_digito_verificador, calcular_digitos_cpf, construir_pools,
+    formatar_cpfs, gerar_lote, intervalo_shard, permutar_indices,
+)
+
+CHAVES = np.random.default_rng(7).integers(0, 2 ** 32, 4, dtype=np.uint64)
+
+
+def _cpf_valido(cpf):
+    """Validação independente, com a função escalar original."""
+    digitos = [int(c) for c in cpf if c.isdigit()]
+    d1 = calcular_digito_verificador(digitos[:9])
+    d2 = calcular_digito_verificador(digitos[:9] + [d1])
+    return len(cpf) == 14 and cpf[3] == cpf[7] == "." and cpf[11] == "-" and digitos[9:] == [d1, d2]
+
+
+def test_feistel_e_uma_permutacao():
+    valores = np.arange(2 ** 16, dtype=np.uint64)
+    permutados = _feistel(valores, CHAVES, bits_metade=8)
+    assert np.array_equal(np.sort(permutados), valores)
+
+
+def test_permutar_indices_distintos_e_dentro_do_espaco():
+    indices = np.arange(200_000)
+    bases = permutar_indices(indices, CHAVES)
+    assert bases.min() >= 0 and bases.max() < ESPACO_CPF
+    assert len(np.unique(bases)) == len(indices)
+    # Determinística pelas chaves, e chaves diferentes dão outra permutação
+    assert np.array_equal(bases, permutar_indices(indices, CHAVES))
+    assert not np.array_equal(bases, permutar_indices(indices, CHAVES[::-1]))
+
+
+def test_permutar_indices_no_fim_do_espaco():
+    # Índices perto do limite também passam pelo cycle-walking e continuam distintos
+    indices = np.arange(ESPACO_CPF - 50_000, ESPACO_CPF)
+    bases = permutar_indices(indices, CHAVES)
+    assert bases.max() < ESPACO_CPF
+    assert len(np.unique(bases)) == len(indices)
+
+
+def test_digitos_vetorizados_iguais_aos_escalares():
+    bases = np.random.default_rng(0).integers(0, 10, (5000, 9))
+    digitos = calcular_digitos_cpf(bases)
+    for base, linha in zip(bases.tolist(), digitos.tolist()):
+        d1 = calcular_digito_verificador(base)
+        assert linha == base + [d1, calcular_digito_verificador(base + [d1])]
+
+
+def test_formatar_cpfs():
+    digitos = np.array([[1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 9], [0] * 11])
+    assert formatar_cpfs(digitos).tolist() == ["123.456.789-09", "000.000.000-00"]
+
+
+@pytest.fixture(scope="module")
+def pools():
+    return construir_pools(0, 200)
+
+
+def test_lote_gera_cpfs_validos_e_unicos(pools):
+    rng = np.random.default_rng(1)
+    lote = gerar_lote(rng, np.arange(20_000), CHAVES, pools, date(2026, 1, 31))
+    assert len(set(lote["cpf"].tolist())) == 20_000
+    assert all(_cpf_valido(cpf) for cpf in lote["cpf"].tolist())
+
+
+def test_shards_nao_repetem_cpfs(pools):
+    total, shards = 10_000, 7
+    cpfs = []
+    for shard in range(shards):
+        inicio, fim = intervalo_shard(total, shard, shards)
+        rng = np.random.default_rng(np.random.SeedSequence([0, shard]))
+        cpfs.extend(gerar_lote(rng, np.arange(inicio, fim), CHAVES, pools, date(2026, 1, 31))["cpf"].tolist())
+    assert len(cpfs) == total
+    assert len(set(cpfs)) == total
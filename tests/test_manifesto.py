@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from manifesto import Manifesto, caminho_manifesto
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    (tmp_path / "F").mkdir()
+    (tmp_path / "T").mkdir()
+    return tmp_path
+
+
+def _escrever(caminho, conteudo, mtime_ns=None):
+    caminho.write_bytes(conteudo)
+    if mtime_ns is not None:
+        os.utime(caminho, ns=(mtime_ns, mtime_ns))
+    return str(caminho)
+
+
+def test_retoma_a_partir_do_manifesto_salvo(pasta):
+    arquivos = [_escrever(pasta / "F" / f"x_{i}.jpg", bytes([i]) * 10) for i in range(3)]
+    caminho = str(pasta / "saida.csv.manifesto.csv")
+
+    manifesto = Manifesto(caminho)
+    assert all(manifesto.precisa_processar(a) for a in arquivos)
+    manifesto.registrar(arquivos[0])
+    manifesto.registrar(arquivos[1])
+    manifesto.salvar()
+    # Registrado mas não salvo: a execução "caiu" antes do checkpoint
+    manifesto.registrar(arquivos[2])
+
+    retomado = Manifesto(caminho)
+    assert len(retomado) == 2
+    assert [retomado.precisa_processar(a) for a in arquivos] == [False, False, True]
+    assert not retomado.substituidos
+
+
+def test_tamanho_diferente_marca_substituido(pasta):
+    arquivo = _escrever(pasta / "F" / "x_1.jpg", b"a" * 10)
+    manifesto = Manifesto(str(pasta / "m.csv"))
+    manifesto.registrar(arquivo)
+
+    _escrever(pasta / "F" / "x_1.jpg", b"a" * 11)
+    assert manifesto.precisa_processar(arquivo)
+    assert manifesto.substituidos == {arquivo}
+
+
+def test_mesmo_tamanho_conteudo_diferente_decide_pelo_hash(pasta):
+    arquivo = _escrever(pasta / "F" / "x_1.jpg", b"a" * 10, mtime_ns=1_000_000_000)
+    manifesto = Manifesto(str(pasta / "m.csv"))
+    manifesto.registrar(arquivo)
+
+    _escrever(pasta / "F" / "x_1.jpg", b"b" * 10, mtime_ns=2_000_000_000)
+    assert manifesto.precisa_processar(arquivo)
+    assert manifesto.substituidos == {arquivo}
+
+
+def test_mtime_novo_com_mesmo_conteudo_so_atualiza_o_registro(pasta):
+    arquivo = _escrever(pasta / "F" / "x_1.jpg", b"a" * 10, mtime_ns=1_000_000_000)
+    manifesto = Manifesto(str(pasta / "m.csv"))
+    manifesto.registrar(arquivo)
+    manifesto.salvar()
+
+    os.utime(arquivo, ns=(2_000_000_000, 2_000_000_000))
+    assert not manifesto.precisa_processar(arquivo)
+    assert not manifesto.substituidos
+    assert manifesto.entradas[arquivo]["mtime_ns"] == 2_000_000_000
+    assert len(manifesto.pendentes) == 1
+
+
+def test_ultima_linha_do_manifesto_prevalece(pasta):
+    arquivo = _escrever(pasta / "F" / "x_1.jpg", b"a" * 10)
+    caminho = str(pasta / "m.csv")
+    manifesto = Manifesto(caminho)
+    manifesto.registrar(arquivo)
+    manifesto.salvar()
+
+    _escrever(pasta / "F" / "x_1.jpg", b"a" * 12)
+    manifesto.registrar(arquivo)
+    manifesto.salvar()
+
+    retomado = Manifesto(caminho)
+    assert len(retomado) == 1
+    assert not retomado.precisa_processar(arquivo)
+
+
+def test_mesmo_nome_em_pastas_diferentes(pasta):
+    frente = _escrever(pasta / "F" / "x_1.jpg", b"a" * 10)
+    verso = _escrever(pasta / "T" / "x_1.jpg", b"b" * 10)
+    manifesto = Manifesto(str(pasta / "m.csv"))
+    manifesto.registrar(frente)
+    manifesto.registrar(verso)
+
+    _escrever(pasta / "F" / "x_1.jpg", b"a" * 20)
+    assert manifesto.precisa_processar(frente)
+    assert not manifesto.precisa_processar(verso)
+    assert manifesto.substituidos == {frente}
+
+
+def test_caminho_manifesto_normaliza_a_saida():
+    assert caminho_manifesto("saida.parquet/") == "saida.parquet.manifesto.csv"
+    assert caminho_manifesto("saida.csv") == "saida.csv.manifesto.csv"